@@ -0,0 +1,489 @@
+"""
+Benchmark harness for the ingest (fill_sql.py) and codegen (owl_to_c#.py)
+paths.
+
+Synthetic CIM RDF/XML models are generated from the tables of an SQL
+profile (TestProfile.sql by default) at the requested scales, then every
+stage is timed in a fresh process so its peak memory can be measured in
+isolation. Each run appends one JSON record per scale to the results file
+and is compared against the previous record for the same model, so
+regressions between versions show up in the printed report.
+
+Example:
+    python benchmark.py --scales 10k,100k
+    python benchmark.py --scales 1M --stages stream --workers 4
+"""
+import os
+import sys
+import json
+import time
+import random
+import hashlib
+import argparse
+import platform
+import subprocess
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from cim_schema import load_schema
+
+WORK_DIR = ".bench"
+RESULTS_FILE = "benchmark_results.jsonl"  # in the work directory
+OWL_FILE_PATH = "data/TestProfile.owl"
+
+INGEST_STAGES = ["extract", "insert", "dump", "stream", "pipeline"]
+CODEGEN_STAGES = ["parse_owl", "codegen"]
+ALL_STAGES = INGEST_STAGES + CODEGEN_STAGES
+
+# Share of the objects that belong to tables other tables refer to
+# (containers, base voltages, limit sets, ...)
+REFERENCED_TABLE_SHARE = 0.05
+
+RDF_NS = "http://www.w3.org/1999/02/22-rdf-syntax-ns#"
+CIM_NS = "http://iec.ch/TC57/2006/CIM-schema-cim10#"
+
+
+def parse_scale(text):
+    """Parses an object count such as '10000', '10k' or '10M'."""
+    text = text.strip().lower()
+    factor = {"k": 1000, "m": 1000000}.get(text[-1:], 1)
+    if factor != 1:
+        text = text[:-1]
+    return int(float(text) * factor)
+
+
+def format_scale(objects):
+    for suffix, factor in (("M", 1000000), ("k", 1000)):
+        if objects >= factor and objects % factor == 0:
+            return f"{objects // factor}{suffix}"
+    return str(objects)
+
+
+def _peak_rss_mb():
+    """Peak resident set size of this process in MiB, if available."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and KiB elsewhere
+    return round(peak / (1 << 20) if sys.platform == "darwin" else peak / 1024, 1)
+
+
+# ---------------------------------------------------------------------------
+# Synthetic model generator
+# ---------------------------------------------------------------------------
+
+def _object_counts(schema, objects):
+    """
+    Splits the object count over the schema tables: tables that are the
+    target of a foreign key get REFERENCED_TABLE_SHARE of the objects
+    between them, the remaining tables share the rest evenly.
+    """
+    referenced = {fk.ref_table for _table, fk in schema.foreign_keys()
+                  if fk.ref_table in schema.tables}
+    others = [name for name in schema.tables if name not in referenced]
+    if not others:
+        others, referenced = list(schema.tables), set()
+
+    counts = {}
+    if referenced:
+        share = max(len(referenced), int(objects * REFERENCED_TABLE_SHARE))
+        for i, name in enumerate(sorted(referenced)):
+            counts[name] = share // len(referenced) + (i < share % len(referenced))
+        objects = max(objects - share, 0)
+    for i, name in enumerate(others):
+        counts[name] = objects // len(others) + (i < objects % len(others))
+    return {name: counts[name] for name in schema.tables}
+
+
+def _table_generators(schema, counts):
+    """
+    Returns, per table, the (child tag, kind, argument) entries to emit for
+    each object: kind is 'ref' (argument: referenced table) or a value kind
+    derived from the column affinity.
+    """
+    generators = {}
+    for name, table in schema.tables.items():
+        ref_columns = {}
+        for fk in table.foreign_keys:
+            if len(fk.columns) == 1 and counts.get(fk.ref_table):
+                ref_columns[fk.columns[0]] = fk.ref_table
+        entries = []
+        for column in table.columns.values():
+            if column.name == "mRID":
+                continue
+            tag = f"cim:{name}.{column.name}"
+            if column.name in ref_columns:
+                entries.append((tag, "ref", ref_columns[column.name]))
+            elif column.sql_type.upper().startswith("CHAR(1)"):
+                entries.append((tag, "bool", None))
+            else:
+                entries.append((tag, column.affinity, None))
+        generators[name] = entries
+    return generators
+
+
+def generate_model(path, schema, objects, reference_density=0.5,
+                   attribute_density=0.6, seed=0):
+    """
+    Writes a synthetic CIM RDF/XML model for the schema tables.
+
+    Args:
+        path (str): Output XML file.
+        schema (Schema): Schema whose tables the objects belong to.
+        objects (int): Total number of objects.
+        reference_density (float): Probability that a foreign-key column
+            holds an rdf:resource reference to an object of its table.
+        attribute_density (float): Probability that any other column is set.
+        seed (int): Seed for the random generator.
+
+    Returns:
+        counts (dict): Number of objects written per table.
+    """
+    rng = random.Random(seed)
+    counts = _object_counts(schema, objects)
+    generators = _table_generators(schema, counts)
+
+    with open(path, "w", encoding="utf-8", buffering=1 << 20) as out:
+        out.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+        out.write(f'<rdf:RDF xmlns:rdf="{RDF_NS}" xmlns:cim="{CIM_NS}">\n')
+        for name, count in counts.items():
+            entries = generators[name]
+            for i in range(count):
+                lines = [f'  <cim:{name} rdf:ID="_{name}_{i}">']
+                for tag, kind, arg in entries:
+                    if kind == "ref":
+                        if rng.random() < reference_density:
+                            target = rng.randrange(counts[arg])
+                            lines.append(f'    <{tag} rdf:resource="#_{arg}_{target}"/>')
+                        continue
+                    if rng.random() >= attribute_density:
+                        continue
+                    if kind == "REAL":
+                        value = f"{rng.uniform(0.0, 500.0):.6g}"
+                    elif kind == "INTEGER":
+                        value = str(rng.randrange(100000))
+                    elif kind == "bool":
+                        value = "true" if rng.random() < 0.5 else "false"
+                    else:
+                        value = f"{name} {i}"[:30]
+                    lines.append(f"    <{tag}>{value}</{tag}>")
+                lines.append(f"  </cim:{name}>\n")
+                out.write("\n".join(lines))
+        out.write("</rdf:RDF>\n")
+    return counts
+
+
+def ensure_model(work_dir, schema_file, objects, reference_density,
+                 attribute_density, seed):
+    """
+    Returns the path of the synthetic model for these parameters, generating
+    it first unless an identical one is already in work_dir.
+    """
+    with open(schema_file, "rb") as f:
+        schema_digest = hashlib.sha256(f.read()).hexdigest()[:12]
+    key = f"{schema_digest}-{objects}-{reference_density}-{attribute_density}-{seed}"
+    path = os.path.join(work_dir, f"model-{format_scale(objects)}-"
+                                  f"{hashlib.sha256(key.encode()).hexdigest()[:12]}.xml")
+    if not os.path.exists(path):
+        os.makedirs(work_dir, exist_ok=True)
+        partial = path + ".part"
+        start = time.perf_counter()
+        generate_model(partial, load_schema(schema_file), objects,
+                       reference_density, attribute_density, seed)
+        os.replace(partial, path)
+        print(f"Generated {format_scale(objects)} object model in "
+              f"{time.perf_counter() - start:.1f}s: {path}")
+    return path
+
+
+# ---------------------------------------------------------------------------
+# Stages (each one runs in a fresh process)
+# ---------------------------------------------------------------------------
+
+def _fresh_db(work_dir, name):
+    path = os.path.join(work_dir, f"{name}-{os.getpid()}.db")
+    if os.path.exists(path):
+        os.remove(path)
+    return path
+
+
+def run_stage(stage, xml_file, schema_file, owl_file, work_dir, workers,
+              column_plan="dynamic", value_types="schema", xml_backend="auto"):
+    """
+    Runs one benchmark stage and returns its measurements. Work a stage
+    depends on (e.g. extracting the rows before timing the insert) is done
+    first and not timed, but does count towards the peak memory.
+    """
+    import fill_sql
+
+    baseline_rss = _peak_rss_mb()
+    result = {}
+    clock = time.perf_counter
+
+    if stage in INGEST_STAGES:
+        tables, create_script = fill_sql.parse_sql_schema(schema_file)
+        plan = None
+        if column_plan != "dynamic":
+            plan = fill_sql.build_column_plan(
+                tables, xml_file if column_plan == "prescan" else None)
+        converter = None
+        if value_types == "schema":
+            converter = fill_sql.ValueConverter(load_schema(schema_file), plan)
+
+    if stage == "extract":
+        start = clock()
+        data = fill_sql.extract_data_from_xml(xml_file, tables, plan, converter,
+                                              xml_backend)
+        result["seconds"] = clock() - start
+        result["rows"] = sum(len(rows) for rows in data.values())
+    elif stage == "insert":
+        data = fill_sql.extract_data_from_xml(xml_file, tables, plan, converter,
+                                              xml_backend)
+        db_file = _fresh_db(work_dir, "insert")
+        conn = fill_sql.create_sqlite_db(db_file, create_script)
+        if plan is not None:
+            fill_sql.apply_column_plan(conn, plan)
+        start = clock()
+        fill_sql.insert_data_into_db(conn, data)
+        result["seconds"] = clock() - start
+        result["rows"] = sum(len(rows) for rows in data.values())
+        conn.close()
+        os.remove(db_file)
+    elif stage == "dump":
+        data = fill_sql.extract_data_from_xml(xml_file, tables, plan, converter,
+                                              xml_backend)
+        sql_file = os.path.join(work_dir, f"dump-{os.getpid()}.sql")
+        start = clock()
+        fill_sql.generate_sql_insert_statements(data, sql_file)
+        result["seconds"] = clock() - start
+        result["rows"] = sum(len(rows) for rows in data.values())
+        result["output_bytes"] = os.path.getsize(sql_file)
+        os.remove(sql_file)
+    elif stage in ("stream", "pipeline"):
+        db_file = _fresh_db(work_dir, stage)
+        sql_file = os.path.join(work_dir, f"{stage}-{os.getpid()}.sql")
+        conn = fill_sql.create_sqlite_db(db_file, create_script)
+        if plan is not None:
+            fill_sql.apply_column_plan(conn, plan)
+        timer = fill_sql.StageTimer()
+        start = clock()
+        result["rows"] = fill_sql.stream_xml_into_db(
+            conn, xml_file, tables, sql_file, plan=plan, workers=workers, timer=timer,
+            converter=converter, pipeline=stage == "pipeline", backend=xml_backend)
+        result["seconds"] = clock() - start
+        result["breakdown"] = {name: round(seconds, 6)
+                               for name, seconds in timer.stages.items()}
+        conn.close()
+        os.remove(db_file)
+        os.remove(sql_file)
+    elif stage == "parse_owl":
+        owl = fill_sql._load_owl_module()
+        start = clock()
+        classes, _graph = owl.parse_owl(owl_file, quiet=True)
+        result["seconds"] = clock() - start
+        result["classes"] = len(classes)
+    elif stage == "codegen":
+        owl = fill_sql._load_owl_module()
+        classes, _graph = owl.parse_owl(owl_file, quiet=True)
+        start = clock()
+        code = owl.generate_csharp_code(classes)
+        result["seconds"] = clock() - start
+        result["classes"] = len(classes)
+        result["output_bytes"] = len(code.encode("utf-8"))
+    else:
+        raise ValueError(f"Unknown stage: {stage}")
+
+    result["seconds"] = round(result["seconds"], 6)
+    if result.get("rows") and result["seconds"]:
+        result["rows_per_second"] = round(result["rows"] / result["seconds"], 1)
+    result["peak_rss_mb"] = _peak_rss_mb()
+    result["baseline_rss_mb"] = baseline_rss
+    return result
+
+
+def run_isolated(stage, *args):
+    """Runs a stage in a newly spawned process so peak memory is its own."""
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+        return executor.submit(run_stage, stage, *args).result()
+
+
+# ---------------------------------------------------------------------------
+# Results
+# ---------------------------------------------------------------------------
+
+def current_version():
+    """Short git revision of the tree, with '-dirty' for uncommitted changes."""
+    try:
+        revision = subprocess.run(["git", "rev-parse", "--short", "HEAD"],
+                                  capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"],
+                               capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    return revision + ("-dirty" if dirty else "")
+
+
+def load_results(results_file):
+    if not os.path.exists(results_file):
+        return []
+    with open(results_file, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def _settings(record):
+    return (record.get("model"), record.get("workers"), record.get("column_plan", "dynamic"),
+            record.get("value_types", "guess"), record.get("xml_backend", "etree"))
+
+
+def previous_result(history, record, stage):
+    """
+    Most recent earlier record that ran the stage on the same model with
+    the same settings.
+    """
+    for old in reversed(history):
+        if _settings(old) == _settings(record) and stage in old.get("stages", {}):
+            return old
+    return None
+
+
+def print_report(record, history, tolerance):
+    """
+    Prints the stage timings of a record next to the previous run on the
+    same model; stages slower (or hungrier) by more than tolerance are
+    flagged. Returns the number of regressions.
+    """
+    regressions = 0
+    print(f"\n{format_scale(record['objects'])} objects "
+          f"({record['xml_bytes'] / 1048576:,.1f} MiB), {record['column_plan']} column plan, "
+          f"version {record['version']}")
+    print(f"  {'stage':<10} {'seconds':>10} {'rows/s':>12} {'peak MiB':>9}   vs previous")
+    for stage, result in record["stages"].items():
+        line = (f"  {stage:<10} {result['seconds']:>10.3f} "
+                f"{result.get('rows_per_second', 0):>12,.0f} "
+                f"{result['peak_rss_mb'] or 0:>9.1f}")
+        old = previous_result(history, record, stage)
+        if old is not None:
+            old_result = old["stages"][stage]
+            time_delta = result["seconds"] / old_result["seconds"] - 1 if old_result["seconds"] else 0.0
+            line += f"   {time_delta:+.1%} time"
+            if result["peak_rss_mb"] and old_result.get("peak_rss_mb"):
+                memory_delta = result["peak_rss_mb"] / old_result["peak_rss_mb"] - 1
+                line += f", {memory_delta:+.1%} memory"
+            else:
+                memory_delta = 0.0
+            line += f" ({old['version']})"
+            if time_delta > tolerance or memory_delta > tolerance:
+                line += "  REGRESSION"
+                regressions += 1
+        print(line)
+        for name, seconds in result.get("breakdown", {}).items():
+            print(f"    {name:<8} {seconds:>10.3f}")
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Benchmark the CIM ingest and codegen stages on synthetic models.")
+    parser.add_argument("--scales", default="10k",
+                        help="Comma-separated object counts, e.g. 10k,100k,1M,10M")
+    parser.add_argument("--stages", default=",".join(ALL_STAGES),
+                        help=f"Comma-separated stages to run ({', '.join(ALL_STAGES)})")
+    parser.add_argument("--schema", default="TestProfile.sql",
+                        help="SQL profile the synthetic model follows")
+    parser.add_argument("--owl", default=OWL_FILE_PATH,
+                        help="OWL profile for the codegen stages")
+    parser.add_argument("--reference-density", type=float, default=0.5,
+                        help="Probability that a foreign-key column holds a reference")
+    parser.add_argument("--attribute-density", type=float, default=0.6,
+                        help="Probability that any other column is set")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="Seed of the synthetic model generator")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Parse workers for the stream stage")
+    parser.add_argument("--column-plan", choices=["dynamic", "schema", "prescan"],
+                        default="dynamic",
+                        help="Column plan of the ingest stages (see fill_sql.py)")
+    parser.add_argument("--value-types", choices=["schema", "guess"], default="schema",
+                        help="Value typing of the ingest stages (see fill_sql.py)")
+    parser.add_argument("--xml-backend", choices=["auto", "lxml", "expat", "etree"],
+                        default="auto",
+                        help="XML parser of the ingest stages (see fill_sql.py)")
+    parser.add_argument("--repeat", type=int, default=1,
+                        help="Run each stage this many times and keep the fastest")
+    parser.add_argument("--work-dir", default=WORK_DIR,
+                        help="Directory for the generated models and scratch files")
+    parser.add_argument("--results",
+                        help="JSON-lines file the results are appended to (default: "
+                             f"{RESULTS_FILE} in the work directory)")
+    parser.add_argument("--tolerance", type=float, default=0.10,
+                        help="Relative slowdown reported as a regression")
+    parser.add_argument("--generate-only", action="store_true",
+                        help="Only generate the synthetic models")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    stages = [s.strip() for s in args.stages.split(",") if s.strip()]
+    unknown = [s for s in stages if s not in ALL_STAGES]
+    if unknown:
+        print(f"Error: unknown stages: {', '.join(unknown)}")
+        return 2
+
+    import fill_sql
+    try:
+        xml_backend = fill_sql.resolve_xml_backend(args.xml_backend)
+    except RuntimeError as e:
+        print(f"Error: {e}")
+        return 2
+
+    results_file = args.results or os.path.join(args.work_dir, RESULTS_FILE)
+    history = load_results(results_file)
+    version = current_version()
+    regressions = 0
+    for scale in args.scales.split(","):
+        objects = parse_scale(scale)
+        xml_file = ensure_model(args.work_dir, args.schema, objects, args.reference_density,
+                                args.attribute_density, args.seed)
+        if args.generate_only:
+            continue
+
+        record = {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "version": version,
+            "python": platform.python_version(),
+            "objects": objects,
+            "xml_bytes": os.path.getsize(xml_file),
+            "model": os.path.basename(xml_file),
+            "workers": args.workers,
+            "column_plan": args.column_plan,
+            "value_types": args.value_types,
+            "xml_backend": xml_backend,
+            "stages": {},
+        }
+        for stage in stages:
+            runs = [run_isolated(stage, xml_file, args.schema, args.owl,
+                                 args.work_dir, args.workers, args.column_plan,
+                                 args.value_types, xml_backend)
+                    for _ in range(max(args.repeat, 1))]
+            record["stages"][stage] = min(runs, key=lambda run: run["seconds"])
+
+        regressions += print_report(record, history, args.tolerance)
+        with open(results_file, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, sort_keys=True) + "\n")
+        history.append(record)
+
+    if regressions:
+        print(f"\n{regressions} stage(s) regressed by more than {args.tolerance:.0%}.")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
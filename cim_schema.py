@@ -0,0 +1,354 @@
+"""
+Schema model for the CIMTool-generated SQL profile (e.g. TestProfile.sql).
+
+The file is tokenized once and turned into Table/Column/ForeignKey objects,
+including the FOREIGN KEY constraints declared inline in CREATE TABLE and
+the ones added afterwards with ALTER TABLE ... ADD FOREIGN KEY. Both
+fill_sql.py and show_table_entry.py load their schema through load_schema(),
+which caches the parsed model per file.
+"""
+import os
+import re
+from collections import OrderedDict
+
+# One alternative per token kind; whitespace and -- comments are skipped
+_TOKEN_RE = re.compile(r"""
+      (?P<space>\s+)
+    | (?P<comment>--[^\n]*)
+    | "(?P<ident>[^"]*)"
+    | '(?P<string>(?:[^']|'')*)'
+    | (?P<number>\d+(?:\.\d+)?)
+    | (?P<word>[A-Za-z_][\w$]*)
+    | (?P<punct>.)
+""", re.VERBOSE | re.DOTALL)
+
+# Keywords that end a column's type and start its constraints
+_CONSTRAINT_WORDS = {"NOT", "NULL", "UNIQUE", "PRIMARY", "DEFAULT", "REFERENCES",
+                     "CHECK", "CONSTRAINT", "COLLATE"}
+
+
+class Column:
+    """A single column definition."""
+    def __init__(self, name, sql_type="", not_null=False, unique=False, primary_key=False):
+        self.name = name
+        self.sql_type = sql_type
+        self.not_null = not_null
+        self.unique = unique
+        self.primary_key = primary_key
+
+    @property
+    def affinity(self):
+        """SQLite type affinity of the declared type (TEXT, INTEGER, REAL, NUMERIC or BLOB)."""
+        declared = self.sql_type.upper()
+        if "INT" in declared:
+            return "INTEGER"
+        if "CHAR" in declared or "CLOB" in declared or "TEXT" in declared:
+            return "TEXT"
+        if "BLOB" in declared or not declared:
+            return "BLOB"
+        if "REAL" in declared or "FLOA" in declared or "DOUB" in declared:
+            return "REAL"
+        return "NUMERIC"
+
+    def definition(self):
+        parts = [f'"{self.name}"']
+        if self.sql_type:
+            parts.append(self.sql_type)
+        if self.primary_key:
+            parts.append("PRIMARY KEY")
+        if self.not_null:
+            parts.append("NOT NULL")
+        if self.unique and not self.primary_key:
+            parts.append("UNIQUE")
+        return " ".join(parts)
+
+    def __repr__(self):
+        return f"Column({self.definition()})"
+
+
+class ForeignKey:
+    """A FOREIGN KEY constraint; inline is False for ALTER TABLE ones."""
+    def __init__(self, columns, ref_table, ref_columns, inline=True):
+        self.columns = tuple(columns)
+        self.ref_table = ref_table
+        self.ref_columns = tuple(ref_columns)
+        self.inline = inline
+
+    def definition(self):
+        columns = ", ".join(f'"{c}"' for c in self.columns)
+        ref_columns = ", ".join(f'"{c}"' for c in self.ref_columns)
+        return f'FOREIGN KEY ({columns}) REFERENCES "{self.ref_table}" ({ref_columns})'
+
+    def __repr__(self):
+        return f"ForeignKey({self.definition()}, inline={self.inline})"
+
+
+class Table:
+    """A table with its ordered columns and foreign keys."""
+    def __init__(self, name):
+        self.name = name
+        self.columns = OrderedDict()
+        self.foreign_keys = []
+
+    @property
+    def column_names(self):
+        return list(self.columns)
+
+    def create_statement(self, foreign_keys=None):
+        """
+        CREATE TABLE statement for SQLite. By default only the inline
+        foreign keys are included, as in the original schema file.
+        """
+        if foreign_keys is None:
+            foreign_keys = [fk for fk in self.foreign_keys if fk.inline]
+        lines = [f"    {col.definition()}" for col in self.columns.values()]
+        lines += [f"    {fk.definition()}" for fk in foreign_keys]
+        return f'CREATE TABLE "{self.name}"\n(\n' + ",\n".join(lines) + "\n);"
+
+
+class Schema:
+    """All tables of a schema file, in file order."""
+    def __init__(self):
+        self.tables = OrderedDict()
+
+    def column_map(self):
+        """Dictionary mapping table names to a list of their column names."""
+        return {name: table.column_names for name, table in self.tables.items()}
+
+    def foreign_keys(self):
+        """Yields (table name, ForeignKey) for every foreign key, inline or ALTER."""
+        for name, table in self.tables.items():
+            for fk in table.foreign_keys:
+                yield name, fk
+
+    def create_script(self):
+        """Combined CREATE TABLE statements for SQLite."""
+        return "\n\n".join(table.create_statement() for table in self.tables.values())
+
+
+def tokenize(text):
+    """
+    Returns the significant tokens of an SQL text as (kind, value, key)
+    triples, where key is the upper-cased value for words and the value
+    itself otherwise.
+    """
+    tokens = []
+    for match in _TOKEN_RE.finditer(text):
+        kind = match.lastgroup
+        if kind == "space" or kind == "comment":
+            continue
+        value = match.group(kind)
+        if kind == "word":
+            tokens.append((kind, value, value.upper()))
+            continue
+        if kind == "string":
+            value = value.replace("''", "'")
+        tokens.append((kind, value, value))
+    return tokens
+
+
+class _Parser:
+    """Recursive-descent reader over the token list."""
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.pos = 0
+        self.schema = Schema()
+
+    def peek(self, offset=0):
+        pos = self.pos + offset
+        return self.tokens[pos] if pos < len(self.tokens) else (None, None, None)
+
+    def next(self):
+        token = self.peek()
+        self.pos += 1
+        return token
+
+    def accept(self, value):
+        if self.peek()[2] == value:
+            self.pos += 1
+            return True
+        return False
+
+    def expect(self, value):
+        if not self.accept(value):
+            raise ValueError(f"Expected {value!r} but found {self.peek()[1]!r} "
+                             f"at token {self.pos}")
+
+    def name(self):
+        kind, value, _key = self.next()
+        if kind not in ("ident", "word"):
+            raise ValueError(f"Expected a name but found {value!r} at token {self.pos - 1}")
+        return value
+
+    def name_list(self):
+        self.expect("(")
+        names = [self.name()]
+        while self.accept(","):
+            names.append(self.name())
+        self.expect(")")
+        return names
+
+    def skip_statement(self):
+        depth = 0
+        while self.pos < len(self.tokens):
+            value = self.next()[2]
+            if value == "(":
+                depth += 1
+            elif value == ")":
+                depth -= 1
+            elif value == ";" and depth <= 0:
+                return
+
+    def skip_group(self):
+        """Skips a balanced parenthesised group starting at the current token."""
+        self.expect("(")
+        depth = 1
+        while depth and self.pos < len(self.tokens):
+            value = self.next()[2]
+            if value == "(":
+                depth += 1
+            elif value == ")":
+                depth -= 1
+
+    def parse(self):
+        while self.pos < len(self.tokens):
+            if self.peek()[2] == "CREATE" and self.peek(1)[2] == "TABLE":
+                self.pos += 2
+                self.create_table()
+            elif self.peek()[2] == "ALTER" and self.peek(1)[2] == "TABLE":
+                self.pos += 2
+                self.alter_table()
+            else:
+                self.skip_statement()
+        return self.schema
+
+    def create_table(self):
+        if self.accept("IF"):
+            self.expect("NOT")
+            self.expect("EXISTS")
+        table = Table(self.name())
+        self.schema.tables[table.name] = table
+        self.expect("(")
+        while True:
+            self.table_element(table)
+            if self.accept(","):
+                continue
+            self.expect(")")
+            break
+        self.accept(";")
+
+    def table_element(self, table):
+        if self.accept("CONSTRAINT"):
+            self.name()
+        word = self.peek()[2] if self.peek()[0] == "word" else None
+        if word == "FOREIGN":
+            self.pos += 1
+            self.expect("KEY")
+            table.foreign_keys.append(self.references(self.name_list(), inline=True))
+        elif word == "PRIMARY":
+            self.pos += 1
+            self.expect("KEY")
+            for name in self.name_list():
+                if name in table.columns:
+                    table.columns[name].primary_key = True
+        elif word == "UNIQUE":
+            self.pos += 1
+            names = self.name_list()
+            if len(names) == 1 and names[0] in table.columns:
+                table.columns[names[0]].unique = True
+        elif word == "CHECK":
+            self.pos += 1
+            self.skip_group()
+        else:
+            self.column(table)
+
+    def column(self, table):
+        column = Column(self.name())
+        table.columns[column.name] = column
+
+        # Type: words and parenthesised arguments until a constraint or separator
+        type_parts = []
+        while True:
+            kind, value, key = self.peek()
+            if kind == "word" and key not in _CONSTRAINT_WORDS:
+                type_parts.append(key)
+                self.pos += 1
+            elif value == "(" and type_parts:
+                self.pos += 1
+                args = []
+                while not self.accept(")"):
+                    args.append(self.next()[1])
+                type_parts[-1] += "(" + "".join(args) + ")"
+            else:
+                break
+        column.sql_type = " ".join(type_parts)
+
+        # Constraints
+        while True:
+            value = self.peek()[2]
+            if value in (",", ")") or value is None:
+                return
+            self.pos += 1
+            if value == "NOT":
+                self.expect("NULL")
+                column.not_null = True
+            elif value == "UNIQUE":
+                column.unique = True
+            elif value == "PRIMARY":
+                self.expect("KEY")
+                column.primary_key = True
+            elif value == "REFERENCES":
+                self.pos -= 1
+                table.foreign_keys.append(self.references([column.name], inline=True))
+            elif value == "(":
+                # DEFAULT (...) / CHECK (...): skip the balanced group
+                self.pos -= 1
+                self.skip_group()
+
+    def references(self, columns, inline):
+        self.expect("REFERENCES")
+        ref_table = self.name()
+        ref_columns = self.name_list() if self.peek()[2] == "(" else ["mRID"]
+        return ForeignKey(columns, ref_table, ref_columns, inline=inline)
+
+    def alter_table(self):
+        table_name = self.name()
+        table = self.schema.tables.get(table_name)
+        if self.accept("ADD"):
+            if self.accept("CONSTRAINT"):
+                self.name()
+            if self.accept("FOREIGN"):
+                self.expect("KEY")
+                fk = self.references(self.name_list(), inline=False)
+                if table is not None:
+                    table.foreign_keys.append(fk)
+        self.skip_statement()
+
+
+def parse_schema(text):
+    """Parses SQL schema text into a Schema."""
+    return _Parser(tokenize(text)).parse()
+
+
+_schema_cache = {}
+
+
+def load_schema(schema_file):
+    """
+    Parses the SQL schema file, reusing the previous result as long as the
+    file's size and modification time are unchanged.
+
+    Returns:
+        schema (Schema): Parsed schema model.
+    """
+    path = os.path.abspath(schema_file)
+    stat = os.stat(path)
+    key = (stat.st_mtime_ns, stat.st_size)
+    cached = _schema_cache.get(path)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+
+    with open(path, "r", encoding="utf-8") as file:
+        schema = parse_schema(file.read())
+    _schema_cache[path] = (key, schema)
+    return schema
@@ -1,355 +1,3234 @@
 import xml.etree.ElementTree as ET
 import os
+import sys
 import sqlite3
 import re
+import io
+import argparse
+import importlib.util
+import hashlib
+import csv
+import gzip
+import json
+import time
+import queue
+import logging
+import threading
+from contextlib import ExitStack, contextmanager
+from xml.parsers import expat
+from functools import lru_cache
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain, islice
+
+from cim_schema import Column, load_schema
+
+# Namespaces used by the CIM RDF/XML network model
+NAMESPACES = {
+    'cim': 'http://iec.ch/TC57/2006/CIM-schema-cim10#',
+    'rdf': 'http://www.w3.org/1999/02/22-rdf-syntax-ns#',
+    'etx': 'http://www.ercot.com/CIM11R0/2008/2.0/extension#',
+    'spc': 'http://www.siemens-ptd/SHIMM1.0#'
+}
+RDF_ID = f'{{{NAMESPACES["rdf"]}}}ID'
+RDF_ABOUT = f'{{{NAMESPACES["rdf"]}}}about'
+RDF_RESOURCE = f'{{{NAMESPACES["rdf"]}}}resource'
+# The same attribute names as expat reports them (namespace_separator='}')
+EXPAT_RDF_ID = f'{NAMESPACES["rdf"]}}}ID'
+EXPAT_RDF_ABOUT = f'{NAMESPACES["rdf"]}}}about'
+EXPAT_RDF_RESOURCE = f'{NAMESPACES["rdf"]}}}resource'
+
+# XML parsers rows can be extracted with, fastest first (see resolve_xml_backend)
+XML_BACKENDS = ("lxml", "expat", "etree")
+
+log = logging.getLogger("fill_sql")
+progress_log = logging.getLogger("fill_sql.progress")
+
+# Rows per executemany batch, and rows per committed transaction
+DEFAULT_BATCH_SIZE = 10000
+DEFAULT_TRANSACTION_SIZE = 200000
+
+# Rows per multi-row INSERT statement in SQL dumps
+DEFAULT_ROWS_PER_STATEMENT = 500
+
+# Rows per multi-row INSERT statement executed by BulkInserter, and the
+# bound-parameter limit that caps it (999 before SQLite 3.32)
+INSERT_ROWS_PER_STATEMENT = 64
+SQLITE_MAX_VARIABLES = 32766 if sqlite3.sqlite_version_info >= (3, 32, 0) else 999
+
+# Rows per row group in Parquet exports
+DEFAULT_ROW_GROUP_SIZE = 65536
+
+# Rows per batch handed between the pipeline threads, and batches each
+# queue holds before the parser has to wait
+DEFAULT_PIPELINE_BATCH = 1000
+DEFAULT_QUEUE_SIZE = 8
+
+# Bytes handed to the XML parser per call
+READ_SIZE = 1 << 20
+
+# Approximate size of the byte ranges parsed by each worker in parallel mode
+DEFAULT_SHARD_SIZE = 32 * 1024 * 1024
+
+
+class StageTimer:
+    """
+    Accumulates wall-clock seconds per ingest stage (parse, extract,
+    insert, dump, ...) for the end-of-run timing summary.
+    """
+
+    def __init__(self):
+        self.stages = {}
+        self.started = time.perf_counter()
+
+    def add(self, stage, seconds):
+        self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def summary(self, **extra):
+        """Returns the timings as a JSON-serialisable dictionary."""
+        result = {
+            "total_seconds": round(time.perf_counter() - self.started, 6),
+            "stages": {name: round(seconds, 6) for name, seconds in self.stages.items()},
+        }
+        result.update(extra)
+        return result
+
+
+class ProgressReporter:
+    """
+    Logs ingest throughput on the fill_sql.progress logger at most every
+    interval seconds: objects/s, rows/s per table, bytes read and, when the
+    input size is known, the ETA.
+    """
+
+    def __init__(self, total_bytes=None, interval=5.0):
+        self.total_bytes = total_bytes
+        self.interval = interval
+        self.bytes_read = 0
+        self.rows = 0
+        self.table_rows = {}
+        self.started = self._last = time.perf_counter()
+        self._next_check = 1024
+
+    def row(self, table):
+        self.rows += 1
+        self.table_rows[table] = self.table_rows.get(table, 0) + 1
+        if self.rows >= self._next_check:
+            self._next_check = self.rows + 1024
+            now = time.perf_counter()
+            if now - self._last >= self.interval:
+                self._last = now
+                self.report()
+
+    def report(self, final=False):
+        if not progress_log.isEnabledFor(logging.INFO):
+            return
+        elapsed = max(time.perf_counter() - self.started, 1e-9)
+        message = (f"{'Done' if final else 'Progress'}: {self.rows} objects "
+                   f"({self.rows / elapsed:,.0f}/s), {self.bytes_read / 1048576:,.1f} MiB read "
+                   f"({self.bytes_read / 1048576 / elapsed:,.1f} MiB/s)")
+        if self.total_bytes and not final and self.bytes_read:
+            remaining = (self.total_bytes - self.bytes_read) * elapsed / self.bytes_read
+            message += f", {100.0 * self.bytes_read / self.total_bytes:.1f}%, ETA {remaining:,.0f}s"
+        progress_log.info(message)
+        for table, count in sorted(self.table_rows.items()):
+            progress_log.info("  %s: %d rows (%.0f rows/s)", table, count, count / elapsed)
+
+    def summary(self):
+        return {"objects": self.rows, "bytes_read": self.bytes_read,
+                "rows_per_table": dict(self.table_rows)}
+
+
+class _CountingReader:
+    """Binary file wrapper that reports the bytes read to a ProgressReporter."""
+
+    def __init__(self, f, progress):
+        self._file = f
+        self._progress = progress
+
+    def read(self, size=-1):
+        data = self._file.read(size)
+        self._progress.bytes_read += len(data)
+        return data
+
+    def seek(self, offset):
+        self._file.seek(offset)
+        self._progress.bytes_read = self._file.tell()
+
 
 def parse_sql_schema(schema_file):
     """
     Parses the SQL schema file to extract table names, their columns,
     and handle FOREIGN KEY constraints for SQLite compatibility.
+    The parsing itself is shared with show_table_entry.py (see cim_schema).
 
     Returns:
         tables (dict): Dictionary mapping table names to a list of their columns.
         create_script (str): Combined and adjusted CREATE TABLE statements.
     """
-    tables = {}
-    create_statements = []
-    current_table = None
-    current_statement_lines = []
-    current_columns = []
-    foreign_keys = []
-
-    with open(schema_file, 'r') as file:
-        lines = file.readlines()
-
-    in_create_table = False
-
-    for line in lines:
-        line_stripped = line.strip()
-
-        # Detect the start of a CREATE TABLE statement
-        if line_stripped.upper().startswith("CREATE TABLE"):
-            in_create_table = True
-            current_statement_lines = [line]  # Start collecting lines for this table
-
-            # Extract table name from CREATE TABLE "TableName"
-            parts = line_stripped.split('"')
-            if len(parts) >= 2:
-                current_table = parts[1]
-                tables[current_table] = []
-                current_columns = []
-                foreign_keys = []
-            else:
-                current_table = None
-                print(f"Warning: Could not parse table name in line: {line}")
-
-        elif in_create_table:
-            current_statement_lines.append(line)
-
-            # Check if the line ends the CREATE TABLE block
-            if line_stripped.endswith(");"):
-                in_create_table = False
-                # Combine the collected lines into one CREATE TABLE statement
-                statement = "".join(current_statement_lines)
-
-                # Extract column names and FOREIGN KEY constraints
-                for col_line in current_statement_lines:
-                    col_line_stripped = col_line.strip()
-                    # Match column definitions, allowing dots in column names
-                    col_match = re.match(r'^"([^"]+)"\s*([\w.\s()]+)', col_line_stripped)
-                    if col_match:
-                        column_name = col_match.group(1)
-                        tables[current_table].append(column_name)
-                    # Match FOREIGN KEY constraints
-                    fk_match = re.match(
-                        r'^FOREIGN KEY\s*\(([^)]+)\)\s*REFERENCES\s+"([^"]+)"\s*\(([^)]+)\)',
-                        col_line_stripped,
-                        re.IGNORECASE
-                    )
-                    if fk_match:
-                        fk_columns = fk_match.group(1).strip()
-                        ref_table = fk_match.group(2).strip()
-                        ref_columns = fk_match.group(3).strip()
-                        foreign_keys.append((fk_columns, ref_table, ref_columns))
-
-                # Modify the CREATE TABLE statement for SQLite
-                adjusted_statement_lines = []
-                for col_line in current_statement_lines:
-                    if not re.match(r'^FOREIGN KEY', col_line.strip(), re.IGNORECASE):
-                        adjusted_statement_lines.append(col_line)
-
-                # Reconstruct the CREATE TABLE statement
-                adjusted_statement = "".join(adjusted_statement_lines)
-
-                # Append FOREIGN KEY constraints at the end of column definitions
-                if foreign_keys:
-                    fk_constraints = []
-                    for fk in foreign_keys:
-                        fk_columns, ref_table, ref_columns = fk
-                        fk_constraints.append(
-                            f'    FOREIGN KEY ({fk_columns}) REFERENCES "{ref_table}" ({ref_columns})'
-                        )
-                    adjusted_statement = adjusted_statement.rstrip(");") \
-                        + ",\n" + ",\n".join(fk_constraints) + "\n);"
-
-                create_statements.append(adjusted_statement)
-
-                # Reset for the next table
-                current_table = None
-                current_statement_lines = []
-                current_columns = []
-                foreign_keys = []
-
-    # Combine all adjusted CREATE TABLE statements into a single script
-    create_script = "\n".join(create_statements)
-    return tables, create_script
-
-
-def create_sqlite_db(db_file, create_script):
+    schema = load_schema(schema_file)
+    return schema.column_map(), schema.create_script()
+
+
+def create_sqlite_db(db_file, create_script, keep_existing=False):
     """
     Creates (or overwrites) a SQLite database at db_file,
     then executes the create_script to build the schema.
+    With keep_existing=True an existing database is opened as it is.
 
     Returns:
         conn (sqlite3.Connection): SQLite database connection object.
     """
+    if keep_existing and os.path.exists(db_file):
+        conn = sqlite3.connect(db_file, check_same_thread=False)
+        conn.execute("PRAGMA foreign_keys = ON;")
+        log.info("Opened existing SQLite database '%s'.", db_file)
+        return conn
+
     if os.path.exists(db_file):
         os.remove(db_file)
-        print(f"Existing database '{db_file}' removed.")
+        log.info("Existing database '%s' removed.", db_file)
 
-    conn = sqlite3.connect(db_file)
+    # The pipelined load writes from a thread of its own (one at a time)
+    conn = sqlite3.connect(db_file, check_same_thread=False)
     cursor = conn.cursor()
 
     # Enable foreign key support in SQLite
     cursor.execute("PRAGMA foreign_keys = ON;")
 
-    # Debug: Print the CREATE TABLE script
-    print("=== CREATE TABLE Script ===")
-    print(create_script)
-    print("=== End of CREATE TABLE Script ===\n")
+    log.debug("CREATE TABLE script:\n%s", create_script)
 
     try:
         cursor.executescript(create_script)
         conn.commit()
-        print(f"SQLite database '{db_file}' created and tables defined successfully.\n")
+        log.info("SQLite database '%s' created and tables defined successfully.", db_file)
     except sqlite3.OperationalError as e:
-        print(f"Error executing CREATE TABLE script: {e}")
+        log.error("Error executing CREATE TABLE script: %s", e)
         conn.close()
         raise
 
     return conn
 
 
-def extract_data_from_xml(xml_file, tables):
+def _child_value(child, raw=False):
     """
-    Parses the XML file and extracts data for the specified tables.
+    Returns the value carried by a property element: the local id of an
+    rdf:resource reference, or its text converted to a number where possible.
+    With raw=True the text is returned unconverted, for a ValueConverter to
+    type later.
+    """
+    # Handle references (attributes with resource)
+    if RDF_RESOURCE in child.attrib:
+        ref_resource = child.attrib[RDF_RESOURCE].strip()
+        if '#' in ref_resource:
+            ref = ref_resource.split('#')[-1]
+        else:
+            ref = ref_resource
+        return ref if ref else None
+
+    child_text = child.text.strip() if child.text else None
+    if raw:
+        return child_text or None
+    return guess_value(child_text)
+
+
+# First characters a number can start with; anything else stays text
+# without paying for a failed int()/float()
+_NUMBER_START = frozenset("0123456789+-.")
+
+
+def guess_value(text):
+    """
+    Converts text to an int or float if it looks like a number (including
+    exponents such as 1e-5), otherwise returns it unchanged. Used for
+    columns whose type the schema does not give.
+    """
+    if not text:
+        return None
+    if text[0] not in _NUMBER_START:
+        return text
+    try:
+        return int(text)
+    except ValueError:
+        pass
+    try:
+        return float(text)
+    except ValueError:
+        return text
+
+
+def _element_mrid(elem):
+    """Returns the mRID from an element's rdf:ID (or rdf:about) attribute, or None."""
+    mRID = elem.attrib.get(RDF_ID, '').strip()
+    if not mRID:
+        mRID = elem.attrib.get(RDF_ABOUT, '').strip().lstrip('#')
+    return mRID if mRID else None  # Use None for NULL
+
+
+class RowLayout:
+    """
+    Column layout shared by rows. Rows are plain tuples of values, one per
+    column, and travel paired with their layout, so the table and column
+    names are held once per layout instead of once per row. There is one
+    instance per table and column tuple (see row_layout()).
+    """
+
+    __slots__ = ("table", "columns")
+
+    def __init__(self, table, columns):
+        self.table = table
+        self.columns = columns
+
+    def as_dict(self, row):
+        return dict(zip(self.columns, row))
+
+    def __repr__(self):
+        return f"RowLayout({self.table!r}, {self.columns!r})"
+
+
+@lru_cache(maxsize=None)
+def row_layout(table, columns):
+    """Returns the RowLayout of table with the given columns (a tuple)."""
+    return RowLayout(table, columns)
+
+
+def make_row(table, values):
+    """Builds a (layout, row) pair from a {column: value} dictionary."""
+    return row_layout(table, tuple(values)), tuple(values.values())
+
+
+def _projector(layout, columns, column_map=None):
+    """
+    Returns a function laying out rows of one RowLayout as a list of values
+    for the given columns, with None for the columns the rows do not have.
+
+    With column_map (child tag -> column, see ColumnPlan) the row's columns
+    are mapped first; where several map onto one column, the last non-null
+    value wins.
+    """
+    sources = {}
+    for index, column in enumerate(layout.columns):
+        if column_map is not None:
+            column = column_map[column]
+        if column is not None:
+            sources.setdefault(column, []).append(index)
+    picks = [sources.get(column, ()) for column in columns]
+    if all(len(pick) <= 1 for pick in picks):
+        positions = [pick[0] if pick else None for pick in picks]
+        return lambda row: [None if index is None else row[index] for index in positions]
+
+    def project(row):
+        values = []
+        for pick in picks:
+            value = None
+            for index in pick:
+                if row[index] is not None:
+                    value = row[index]
+            values.append(value)
+        return values
+    return project
+
+
+class _TagMap(dict):
+    """
+    Qualified element tag ("{namespace}ACLineSegment") -> table name, or
+    None for elements that are not table rows. Tags are resolved on first
+    sight, so the namespace is split off once per tag rather than once per
+    element.
+
+    Attributes:
+        routes (dict): Class name -> table its objects are loaded into;
+            by default each table takes the elements named after it (see
+            ClassHierarchy.routes for the subclasses).
+    """
+
+    def __init__(self, tables, routes=None):
+        super().__init__()
+        self.routes = routes if routes is not None else {table: table for table in tables}
+
+    def __missing__(self, tag):
+        table = self.routes.get(tag.rpartition('}')[2])
+        self[tag] = table
+        return table
+
+
+class _TableLayout(dict):
+    """
+    Qualified child tag -> column index for one table, resolved on first
+    sight of each tag. Attributes of the table's classes go to their
+    column (see ClassHierarchy.attribute_columns). With a ColumnPlan
+    column map, other tags without a column map to None; without one,
+    every new child tag is appended to the columns as a column of its own
+    (the dynamic column mode).
+    """
+
+    def __init__(self, table, columns, column_map=None, attributes=None):
+        super().__init__()
+        self.table = table
+        self.columns = list(columns)
+        self.column_map = column_map
+        self.attributes = attributes or {}
+        self._positions = {column: i for i, column in enumerate(self.columns)}
+        self.row_layout = row_layout(table, tuple(self.columns))
+        self.mrid = self.position('mRID')
+
+    def position(self, column):
+        index = self._positions.get(column)
+        if index is None:
+            index = self._positions[column] = len(self.columns)
+            self.columns.append(column)
+            self.row_layout = row_layout(self.table, tuple(self.columns))
+        return index
+
+    def __missing__(self, tag):
+        local = tag.rpartition('}')[2]
+        if local in self.attributes:
+            index = self.position(self.attributes[local])
+        elif self.column_map is not None:
+            column = self.column_map[local]
+            index = None if column is None else self.position(column)
+        else:
+            index = self.position(local)
+        self[tag] = index
+        return index
+
+
+class IngestPlan:
+    """
+    Lookup tables for the extract loop, compiled once per load.
+
+    Element and child tags are dispatched on their fully qualified form, so
+    no tag is split per element, and every table has a column layout that
+    rows are built in as plain tuples (see RowLayout). Without a ColumnPlan
+    a table's layout grows as new child tags turn up, only ever by
+    appending, so a shorter row of the table is a prefix of its latest
+    layout. mRIDs and references are interned, so each id string is held
+    once however often it is referenced.
 
     Args:
-        xml_file (str): Path to the XML file.
         tables (dict): Dictionary mapping table names to column lists.
+        plan (ColumnPlan, optional): Column layout and child tag mapping;
+            without it, unknown child tags become columns of their own.
+        hierarchy (ClassHierarchy, optional): Routes the elements of
+            subclasses to their ancestor's table and maps the attributes
+            of a table's classes onto its columns.
 
-    Returns:
-        data (dict): Dictionary mapping table names to lists of row dictionaries.
-    """
-    # Define namespaces
-    namespaces = {
-        'cim': 'http://iec.ch/TC57/2006/CIM-schema-cim10#',
-        'rdf': 'http://www.w3.org/1999/02/22-rdf-syntax-ns#',
-        'etx': 'http://www.ercot.com/CIM11R0/2008/2.0/extension#',
-        'spc': 'http://www.siemens-ptd/SHIMM1.0#'
-    }
-
-    data = {table: [] for table in tables}
-
-    # Initialize parser
-    context = ET.iterparse(xml_file, events=("end",))
-    for event, elem in context:
-        # Get the tag without namespace
-        tag = elem.tag.split('}')[-1]
-        
-        if tag in tables:
-            row = {}
-            # Extract mRID from rdf:ID attribute
-            mRID = elem.attrib.get(f'{{{namespaces["rdf"]}}}ID', '').strip()
-            row['mRID'] = mRID if mRID else None  # Use None for NULL
-
-            # Iterate through all child elements to extract data
-            for child in elem:
-                child_tag = child.tag.split('}')[-1]
-                child_text = child.text.strip() if child.text else None
-
-                # Handle references (attributes with resource)
-                if child.tag.startswith(f'{{{namespaces["rdf"]}}}resource'):
-                    ref_resource = child.attrib.get(f'{{{namespaces["rdf"]}}}resource', '').strip()
-                    if '#' in ref_resource:
-                        ref = ref_resource.split('#')[-1]
-                    else:
-                        ref = ref_resource
-                    row[child_tag] = ref if ref else None
-                else:
-                    # Convert numeric values where possible
-                    if child_text:
-                        try:
-                            if '.' in child_text:
-                                row[child_tag] = float(child_text)
-                            else:
-                                row[child_tag] = int(child_text)
-                        except ValueError:
-                            row[child_tag] = child_text
-                    else:
-                        row[child_tag] = None
-
-            # Handle all other columns that might not be present in the XML
-            for col in tables[tag]:
-                if col not in row:
-                    row[col] = None  # Set missing columns to NULL
-
-            # Debug: Print the extracted row
-            #print(f"Extracted Row for table '{tag}': {row}")
-
-            # Append to data
-            data[tag].append(row)
-
-            # Clear the element to save memory
-            elem.clear()
+    Attributes:
+        tables (dict): Qualified element tag -> table name or None.
+        layouts (dict): Table name -> {qualified child tag: column index or None}.
+    """
 
-    return data
+    def __init__(self, tables, plan=None, hierarchy=None):
+        routes = None if hierarchy is None else hierarchy.routes(tables)
+        self.tables = _TagMap(tables, routes)
+
+        def attributes(table):
+            if hierarchy is None:
+                return None
+            return hierarchy.attribute_columns(table, tables[table], routes)
+
+        if plan is None:
+            self.layouts = {table: _TableLayout(table, columns, None, attributes(table))
+                            for table, columns in tables.items()}
+        else:
+            self.layouts = {table: _TableLayout(table, plan.columns[table],
+                                                plan.column_maps[table], attributes(table))
+                            for table in tables}
 
+    def build_row(self, table, elem, raw=False):
+        """
+        Builds the (layout, row) pair of one matched element. Property texts
+        are kept unconverted with raw=True (see ValueConverter), and
+        otherwise converted by guess_value().
+        """
+        layout = self.layouts[table]
+        values = [None] * len(layout.columns)
+        intern = sys.intern
+        mRID = elem.get(RDF_ID, '').strip()
+        if not mRID:
+            mRID = elem.get(RDF_ABOUT, '').strip().lstrip('#')
+        values[layout.mrid] = intern(mRID) if mRID else None
 
-def generate_sql_insert_statements(data, output_file):
+        for child in elem:
+            index = layout[child.tag]
+            if index is None:
+                continue
+            resource = child.get(RDF_RESOURCE)
+            if resource is not None:
+                ref = resource.strip().rpartition('#')[2]
+                value = intern(ref) if ref else None
+            elif raw:
+                text = child.text
+                value = (text.strip() or None) if text else None
+            else:
+                text = child.text
+                value = guess_value(text.strip() if text else None)
+            if index >= len(values):
+                # A column the layout gained from this element
+                values.extend([None] * (index + 1 - len(values)))
+            values[index] = value
+        return layout.row_layout, tuple(values)
+
+
+def _load_owl_module():
     """
-    Generates SQL INSERT statements from the extracted data.
+    Imports owl_to_c#.py, whose file name is not a valid module name, as
+    owl_to_csharp. It is registered in sys.modules, so its functions can be
+    sent to worker processes.
+    """
+    if "owl_to_csharp" in sys.modules:
+        return sys.modules["owl_to_csharp"]
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "owl_to_c#.py")
+    spec = importlib.util.spec_from_file_location("owl_to_csharp", path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules["owl_to_csharp"] = module
+    try:
+        spec.loader.exec_module(module)
+    except ImportError as e:
+        del sys.modules["owl_to_csharp"]
+        raise RuntimeError(f"Reading an OWL profile requires the '{e.name}' package "
+                           f"(pip install {e.name})") from None
+    return module
+
+
+class ClassHierarchy:
+    """
+    Class hierarchy of a CIM profile, as parsed from its OWL file by
+    owl_to_c#.py.
+
+    Objects of a class without a table of their own are loaded into the
+    table of its nearest ancestor that has one, so a cim:Substation goes
+    to EquipmentContainer instead of being dropped. Attributes qualified by
+    any class on a table's line ("IdentifiedObject.name", and
+    "Substation.name" in EquipmentContainer) are mapped onto the table's
+    schema columns. Both maps are computed once per load.
 
     Args:
-        data (dict): Dictionary mapping table names to lists of row dictionaries.
-        output_file (str): Path to the output SQL file.
+        parents (dict): Class name -> parent class name, or None for the roots.
     """
-    with open(output_file, 'w', encoding='utf-8') as f:
-        for table, rows in data.items():
-            for row in rows:
-                columns = ', '.join([f'"{col}"' for col in row.keys()])
-                values = []
-                for col, val in row.items():
-                    if val is None:
-                        values.append("NULL")
-                    elif isinstance(val, (int, float)):
-                        values.append(f"{val}")
-                    else:
-                        # Escape single quotes in strings
-                        escaped_val = val.replace("'", "''")
-                        values.append(f"'{escaped_val}'")
-                values_str = ', '.join(values)
-                insert_stmt = f'INSERT INTO "{table}" ({columns}) VALUES ({values_str});\n'
-                
-                # Debug: Print the SQL statement
-                print(f"Generated SQL: {insert_stmt.strip()}")
-                
-                # Write to file
-                f.write(insert_stmt)
-
-
-def insert_data_into_db(conn, data):
+
+    def __init__(self, parents):
+        self.parents = dict(parents)
+
+    @classmethod
+    def from_owl(cls, owl_file, cache_dir=None):
+        """
+        Reads the hierarchy from an OWL profile, through the parsed-ontology
+        cache of owl_to_c#.py (in its default directory unless cache_dir is
+        given). Nothing is printed, so stdout stays free for --timings-json -.
+        """
+        owl = _load_owl_module()
+        stats = {}
+        classes = owl.load_owl_classes(owl_file, cache_dir or owl.CACHE_DIR, stats, quiet=True)
+        log.debug("Read %d OWL classes from %s%s.", len(classes), owl_file,
+                  " (cached)" if stats["cached"] else "")
+        return cls({name: info.parent_name for name, info in classes.items()})
+
+    def lineage(self, name):
+        """Yields the class and then its ancestors, nearest first."""
+        seen = set()
+        while name is not None and name not in seen:
+            seen.add(name)
+            yield name
+            name = self.parents.get(name)
+
+    def routes(self, tables):
+        """
+        Returns {class name: table} for every table and every class with
+        an ancestor that has a table, mapped to the nearest one.
+        """
+        routes = {table: table for table in tables}
+        for name in self.parents:
+            if name in routes:
+                continue
+            for ancestor in self.lineage(name):
+                if ancestor in tables:
+                    routes[name] = ancestor
+                    break
+        return routes
+
+    def attribute_columns(self, table, columns, routes):
+        """
+        Returns {"Class.attribute": column} for one table, for every class
+        on its line (the table's class, its ancestors and the classes
+        routed to it) and every plain schema column but mRID, which rows
+        take from rdf:ID.
+        """
+        classes = set(self.lineage(table))
+        classes.update(name for name, target in routes.items() if target == table)
+        plain = [column for column in columns if '.' not in column and column != 'mRID']
+        return {f"{name}.{column}": column for name in classes for column in plain}
+
+
+def is_gzip_file(path):
+    """True if the file starts with the gzip magic bytes."""
+    with open(path, 'rb') as f:
+        return f.read(2) == b'\x1f\x8b'
+
+
+@contextmanager
+def open_model(path, progress=None):
     """
-    Inserts the extracted data into the SQLite database.
-    If a column doesn't exist in the table, this function dynamically
-    adds that column (as TEXT) to allow storing all data.
+    Opens a model file for parsing. Gzip-compressed files are recognised by
+    their magic bytes, whatever their name, and decompressed on the fly.
+    The parsers read the file in READ_SIZE chunks, so memory use does not
+    grow with the file size.
+
+    Args:
+        path (str): Path to the model file.
+        progress (ProgressReporter, optional): Told the bytes read from the
+            file (the compressed bytes for a gzip file).
+
+    Yields:
+        A binary file object.
     """
-    cursor = conn.cursor()
+    with open(path, 'rb') as f:
+        compressed = f.read(2) == b'\x1f\x8b'
+        f.seek(0)
+        source = f if progress is None else _CountingReader(f, progress)
+        if compressed:
+            with gzip.GzipFile(fileobj=source, mode='rb') as unzipped:
+                yield unzipped
+        else:
+            yield source
 
-    # Helper function to add a missing column as TEXT
-    def ensure_column_exists(table_name, column_name):
-        try:
-            cursor.execute(f'ALTER TABLE "{table_name}" ADD COLUMN "{column_name}" TEXT;')
-            print(f'Added missing column "{column_name}" as TEXT in table "{table_name}"')
-        except sqlite3.OperationalError as e:
-            # If it's "duplicate column name", ignore
-            if "duplicate column name" not in str(e).lower():
-                print(f"Error adding column '{column_name}' to '{table_name}': {e}")
-
-    for table, rows_ in data.items():
-        # Retrieve existing columns from PRAGMA table_info
-        cursor.execute(f'PRAGMA table_info("{table}");')
-        existing_cols = [row_[1] for row_ in cursor.fetchall()]
-
-        for row in rows_:
-            # Ensure all columns exist in the DB; if not, create them as TEXT
-            for col in row.keys():
-                if col not in existing_cols:
-                    ensure_column_exists(table, col)
-                    existing_cols.append(col)
-
-            columns = ', '.join([f'"{col}"' for col in row.keys()])
-            placeholders = ', '.join(['?' for _ in row.keys()])
-            insert_sql = f'INSERT INTO "{table}" ({columns}) VALUES ({placeholders})'
-
-            # Prepare the parameters tuple
-            params = tuple(row[col] for col in row.keys())
 
+@contextmanager
+def _model_source(xml_file):
+    """Opens xml_file with open_model() if it is a path, else uses the file object as it is."""
+    if isinstance(xml_file, str):
+        with open_model(xml_file) as source:
+            yield source
+    else:
+        yield xml_file
+
+
+@lru_cache(maxsize=None)
+def resolve_xml_backend(name="auto"):
+    """
+    Returns the XML backend to parse with: name itself, after checking that
+    it is available, or for 'auto' the first available one in XML_BACKENDS.
+    """
+    if name == "auto":
+        for backend in XML_BACKENDS:
             try:
-                cursor.execute(insert_sql, params)
-            except sqlite3.IntegrityError as e:
-                print(f"IntegrityError while inserting into '{table}': {e}. Row data: {row}")
-                continue  # Skip this row
-            except sqlite3.OperationalError as e:
-                print(f"OperationalError while inserting into '{table}': {e}. Row data: {row}")
-                continue  # Skip this row
+                return resolve_xml_backend(backend)
+            except RuntimeError:
+                continue
+    if name == "lxml":
+        _import_lxml()
+    elif name not in XML_BACKENDS:
+        raise ValueError(f"Unknown XML backend '{name}'")
+    return name
 
-    # Commit all inserts
-    conn.commit()
-    print(f"\nAll data inserted into the SQLite database successfully.\n")
 
+def _import_lxml():
+    try:
+        from lxml import etree
+    except ImportError:
+        raise RuntimeError("The lxml XML backend requires the 'lxml' package "
+                           "(pip install lxml)") from None
+    return etree
 
-def main():
-    # Define file paths
-    sql_schema_file = "TestProfile.sql"    # Path to your SQL schema
-    xml_file = "test.xml"                  # Path to your XML file
-    xml_file = "NMMS_Model_CIM_Sep_ML1_1_09122023.xml"
-    output_sql_file = "output_filled.sql"  # Path for the generated SQL
-    db_file = "output.db"                  # SQLite database file to create
 
-    # Check if files exist
-    if not os.path.isfile(sql_schema_file):
-        print(f"Error: SQL schema file '{sql_schema_file}' not found.")
-        return
-    if not os.path.isfile(xml_file):
-        print(f"Error: XML file '{xml_file}' not found.")
-        return
+def _iter_matched_elements(source, tag_tables):
+    """
+    Yields (table, element) for every element whose tag names a table,
+    tag_tables mapping qualified tags to tables (see IngestPlan.tables),
+    parsing source (a binary file object) with xml.etree.
 
-    # 1. Parse the SQL schema to get tables and columns
-    print("Parsing SQL schema...")
-    tables, create_script = parse_sql_schema(sql_schema_file)
-    print("\nParsed SQL schema tables and columns:")
-    for table, columns in tables.items():
-        print(f"  Table: {table}, Columns: {columns}")
+    Each matched element is cleared once the consumer moves on, and the
+    root's already-processed children are dropped after every top-level
+    element, so memory use does not grow with the input size.
+    """
+    parser = ET.XMLPullParser(events=("start", "end"))
+    root = None
+    depth = 0
+    while True:
+        data = source.read(READ_SIZE)
+        if data:
+            parser.feed(data)
+        else:
+            parser.close()
+        for event, elem in parser.read_events():
+            if event == "start":
+                if root is None:
+                    root = elem
+                depth += 1
+                continue
 
-    # 2. Create the SQLite database and execute CREATE TABLE statements
-    print("\nCreating SQLite database and setting up tables...")
+            depth -= 1
+            table = tag_tables[elem.tag]
+
+            if table is not None:
+                yield table, elem
+                # Clear the element to save memory
+                elem.clear()
+
+            # Drop finished top-level elements so the root does not keep growing
+            if depth == 1:
+                root.clear()
+        if not data:
+            break
+
+
+def _iter_matched_elements_lxml(source, tag_tables):
+    """
+    The lxml version of _iter_matched_elements(): lxml only reports the
+    elements whose local name is routed to a table, and huge_tree lifts
+    its limits on text size and tree depth for very large models.
+    """
+    etree = _import_lxml()
+    context = etree.iterparse(source, events=("end",),
+                              tag=[f"{{*}}{name}" for name in tag_tables.routes],
+                              huge_tree=True, remove_comments=True, remove_pis=True)
+    for _event, elem in context:
+        yield tag_tables[elem.tag], elem
+        elem.clear(keep_tail=True)
+        # Drop the finished top-level elements before this one, matched or not
+        parent = elem.getparent()
+        if parent is not None and parent.getparent() is None:
+            while elem.getprevious() is not None:
+                del parent[0]
+
+
+class _ExpatRows:
+    """
+    Builds rows straight from expat events, without creating Element
+    objects (the 'expat' backend). The start tag of an element naming a
+    table starts a row and each of its child elements fills one column,
+    by the same rules as IngestPlan.build_row(). Rows are finished at their
+    end tag, so, as with the element backends, an object nested in another
+    comes out first, and the enclosing row sees it as an empty property.
+
+    Finished rows are collected in rows as (layout, row) pairs.
+    """
+
+    def __init__(self, ingest, raw=False):
+        self.ingest = ingest
+        self.raw = raw
+        self.rows = []
+        self._open = []  # Enclosing rows (and their property state) while in a nested one
+        self._depth = 0
+        self._row_depth = -2  # Depth of the current row's element
+        self._layout = None
+        self._values = None
+        self._index = None
+        self._resource = None
+        self._text = []
+        self._collect = False
+
+    def parser(self):
+        """Returns an expat parser wired to this builder."""
+        parser = expat.ParserCreate(namespace_separator='}')
+        parser.buffer_text = True
+        parser.buffer_size = 1 << 16
+        parser.StartElementHandler = self._start
+        parser.EndElementHandler = self._end
+        parser.CharacterDataHandler = self._data
+        return parser
+
+    def _start(self, name, attrs):
+        depth = self._depth = self._depth + 1
+        if depth == self._row_depth + 1:
+            index = self._index = self._layout[name]
+            self._resource = attrs.get(EXPAT_RDF_RESOURCE)
+            self._text = []
+            self._collect = index is not None
+        else:
+            # A property's text ends where a nested element starts (as Element.text)
+            self._collect = False
+
+        table = self.ingest.tables[name]
+        if table is None:
+            return
+        if self._values is not None:
+            index = self._index
+            if depth == self._row_depth + 1 and index is not None:
+                values = self._values
+                if index >= len(values):
+                    values.extend([None] * (index + 1 - len(values)))
+                self._index = None
+            self._open.append((self._layout, self._values, self._row_depth,
+                               self._index, self._resource, self._text))
+        layout = self._layout = self.ingest.layouts[table]
+        values = self._values = [None] * len(layout.columns)
+        mRID = attrs.get(EXPAT_RDF_ID, '').strip()
+        if not mRID:
+            mRID = attrs.get(EXPAT_RDF_ABOUT, '').strip().lstrip('#')
+        values[layout.mrid] = sys.intern(mRID) if mRID else None
+        self._row_depth = depth
+        self._collect = False
+
+    def _data(self, text):
+        if self._collect:
+            self._text.append(text)
+
+    def _end(self, name):
+        depth = self._depth
+        self._depth = depth - 1
+        if depth == self._row_depth + 1:
+            self._collect = False
+            index = self._index
+            if index is None:
+                return
+            resource = self._resource
+            if resource is not None:
+                ref = resource.strip().rpartition('#')[2]
+                value = sys.intern(ref) if ref else None
+            elif self.raw:
+                value = ''.join(self._text).strip() or None
+            else:
+                value = guess_value(''.join(self._text).strip())
+            values = self._values
+            if index >= len(values):
+                # A column the layout gained from this element
+                values.extend([None] * (index + 1 - len(values)))
+            values[index] = value
+        elif depth == self._row_depth:
+            self.rows.append((self._layout.row_layout, tuple(self._values)))
+            if self._open:
+                (self._layout, self._values, self._row_depth,
+                 self._index, self._resource, self._text) = self._open.pop()
+            else:
+                self._layout = self._values = None
+                self._row_depth = -2
+            self._collect = False
+
+
+def _iter_rows_expat(source, ingest, raw):
+    builder = _ExpatRows(ingest, raw)
+    parser = builder.parser()
+    rows = builder.rows
+    while True:
+        data = source.read(READ_SIZE)
+        parser.Parse(data, not data)
+        if rows:
+            yield from rows
+            rows.clear()
+        if not data:
+            break
+
+
+def iter_rows_from_xml(xml_file, tables, plan=None, timer=None, converter=None,
+                       backend="auto", hierarchy=None):
+    """
+    Streams rows out of the XML file without building the document tree.
+
+    Args:
+        xml_file (str or file): Path to (or binary file object of) the XML
+            file; paths are opened with open_model(), so gzip files work.
+        tables (dict): Dictionary mapping table names to column lists.
+        plan (ColumnPlan, optional): Fixed column layout to build rows with.
+        timer (StageTimer, optional): Receives the time spent building rows
+            from parsed elements, as the 'extract' stage, and converting
+            their values, as the 'convert' stage. The expat backend builds
+            rows while parsing, so its row building counts as parsing.
+        converter (ValueConverter, optional): Types the values from the
+            schema column types, in batches; without it numbers are guessed
+            cell by cell.
+        backend (str): XML parser, one of XML_BACKENDS or 'auto' (see
+            resolve_xml_backend). All of them yield the same rows.
+        hierarchy (ClassHierarchy, optional): Also loads the objects of
+            subclasses into their ancestor's table (see IngestPlan).
+
+    Yields:
+        (layout, row) pairs in document order: a RowLayout and the tuple
+        of values in its columns.
+    """
+    rows = _iter_raw_rows(xml_file, tables, plan, timer, converter is not None,
+                          resolve_xml_backend(backend), hierarchy)
+    if converter is None:
+        yield from rows
+    else:
+        yield from converter.convert_stream(rows, timer)
+
+
+def _iter_raw_rows(xml_file, tables, plan, timer, raw, backend, hierarchy=None):
+    ingest = IngestPlan(tables, plan, hierarchy)
+    build_row = ingest.build_row
+
+    with _model_source(xml_file) as source:
+        if backend == "expat":
+            yield from _iter_rows_expat(source, ingest, raw)
+            return
+        if backend == "lxml":
+            elements = _iter_matched_elements_lxml(source, ingest.tables)
+        else:
+            elements = _iter_matched_elements(source, ingest.tables)
+
+        if timer is None:
+            for table, elem in elements:
+                yield build_row(table, elem, raw)
+            return
+
+        clock = time.perf_counter
+        for table, elem in elements:
+            start = clock()
+            item = build_row(table, elem, raw)
+            timer.add("extract", clock() - start)
+            yield item
+
+
+def verify_xml_backends(xml_file, tables, plan=None, converter=None, hierarchy=None):
+    """
+    Extracts the model with every available XML backend and checks that
+    they all yield the same rows, in the same order, with the same values
+    and value types. Prints one line per backend.
+
+    Returns:
+        bool: True if every backend agreed.
+    """
+    results = {}
+    for backend in XML_BACKENDS:
+        try:
+            resolve_xml_backend(backend)
+        except RuntimeError as e:
+            print(f"{backend:<6} skipped: {e}")
+            continue
+        digest = hashlib.sha256()
+        count = 0
+        start = time.perf_counter()
+        for layout, row in iter_rows_from_xml(xml_file, tables, plan, converter=converter,
+                                              backend=backend, hierarchy=hierarchy):
+            values = [(column, value) for column, value in zip(layout.columns, row)
+                      if value is not None]
+            digest.update(repr((layout.table, values)).encode() + b"\n")
+            count += 1
+        results[backend] = digest.hexdigest()
+        print(f"{backend:<6} {count:>10,} rows  {time.perf_counter() - start:8.2f}s  "
+              f"{results[backend][:16]}")
+
+    agreed = len(set(results.values())) <= 1
+    print("All backends agree." if agreed else "Backends DISAGREE.")
+    return agreed
+
+
+class _ColumnMap(dict):
+    """
+    Child tag -> column lookup for one table. Tags not seen before are
+    resolved on first use (see ColumnPlan.resolve) and remembered.
+    """
+
+    def __init__(self, columns):
+        super().__init__((col, col) for col in columns)
+        self._columns = set(columns)
+
+    def __missing__(self, tag):
+        column = ColumnPlan.resolve(tag, self._columns)
+        self[tag] = column
+        return column
+
+
+class ColumnPlan:
+    """
+    Final column layout of every table, worked out before the load starts.
+
+    Child tags are mapped to schema columns either directly or by their
+    attribute name ("ACLineSegment.r" and "IdentifiedObject.name" go to the
+    "r" and "name" columns). Tags with no schema column are dropped, unless
+    a pre-scan of the XML found them, in which case they become extra
+    columns typed from the values seen.
+
+    Attributes:
+        columns (dict): Table name -> ordered list of column names.
+        column_maps (dict): Table name -> {child tag: column name or None}.
+        added (dict): Table name -> list of (column, SQL type) to add to the schema.
+    """
+
+    def __init__(self, tables):
+        self.columns = {table: list(columns) for table, columns in tables.items()}
+        self.column_maps = {table: _ColumnMap(columns) for table, columns in tables.items()}
+        self.added = {table: [] for table in tables}
+
+    @staticmethod
+    def resolve(tag, columns):
+        """Returns the schema column for a child tag, or None if there is none."""
+        if tag in columns:
+            return tag
+        attribute = tag.rsplit('.', 1)[-1]
+        if attribute in columns:
+            return attribute
+        return None
+
+    def add_column(self, table, column, sql_type):
+        self.columns[table].append(column)
+        self.column_maps[table][column] = column
+        self.column_maps[table]._columns.add(column)
+        self.added[table].append((column, sql_type))
+
+
+# Type widening order for pre-scanned extra columns
+_SQL_TYPE_RANK = {"INTEGER": 0, "REAL": 1, "TEXT": 2}
+
+
+def _infer_sql_type(child):
+    """Returns the narrowest SQL type able to hold a property element's value."""
+    if RDF_RESOURCE in child.attrib:
+        return "TEXT"
+    value = _child_value(child)
+    if isinstance(value, int):
+        return "INTEGER"
+    if isinstance(value, float):
+        return "REAL"
+    if value is None:
+        return None
+    return "TEXT"
+
+
+def build_column_plan(tables, xml_file=None, hierarchy=None):
+    """
+    Works out the final column set of every table before loading.
+
+    Args:
+        tables (dict): Dictionary mapping table names to column lists.
+        xml_file (str, optional): If given, the XML is pre-scanned once and
+            every child tag without a schema column is planned as an extra
+            column, typed INTEGER, REAL or TEXT from the values seen.
+        hierarchy (ClassHierarchy, optional): Also scans the objects of
+            subclasses, as part of their ancestor's table.
+
+    Returns:
+        plan (ColumnPlan): Column layout to pass to apply_column_plan() and
+        the extract/stream functions.
+    """
+    plan = ColumnPlan(tables)
+    if xml_file is None:
+        return plan
+
+    extras = {table: {} for table in tables}
+    tag_tables = _TagMap(tables, None if hierarchy is None else hierarchy.routes(tables))
+    with open_model(xml_file) as source:
+        for tag, elem in _iter_matched_elements(source, tag_tables):
+            column_map = plan.column_maps[tag]
+            table_extras = extras[tag]
+            for child in elem:
+                child_tag = child.tag.split('}')[-1]
+                if column_map[child_tag] is not None:
+                    continue
+                sql_type = _infer_sql_type(child)
+                current = table_extras.get(child_tag)
+                if current is None or (sql_type is not None
+                                       and _SQL_TYPE_RANK[sql_type] > _SQL_TYPE_RANK[current]):
+                    table_extras[child_tag] = sql_type
+                else:
+                    table_extras.setdefault(child_tag, None)
+
+    for table, table_extras in extras.items():
+        for column, sql_type in table_extras.items():
+            plan.add_column(table, column, sql_type or "TEXT")
+    return plan
+
+
+def apply_column_plan(conn, plan):
+    """
+    Applies all of the plan's schema changes up front, in one transaction,
+    so that no DDL runs while rows are being loaded.
+    """
+    cursor = conn.cursor()
+    for table, added in plan.added.items():
+        existing_cols = set(_table_columns(cursor, table)) if added else ()
+        for column, sql_type in added:
+            if column in existing_cols:
+                continue
+            cursor.execute(f'ALTER TABLE "{table}" ADD COLUMN "{column}" {sql_type};')
+            log.info('Added column "%s" as %s in table "%s"', column, sql_type, table)
+    conn.commit()
+
+
+def _to_real(text):
     try:
-        conn = create_sqlite_db(db_file, create_script)
-    except sqlite3.OperationalError:
-        print("Failed to create the SQLite database due to schema errors.")
-        return
+        return float(text)
+    except ValueError:
+        return text
 
-    # 3. Extract data from XML
-    print("\nExtracting data from XML...")
-    data = extract_data_from_xml(xml_file, tables)
 
-    # 4. Insert data into the database
-    print("\nInserting data into the SQLite database...")
-    insert_data_into_db(conn, data)
+def _to_integer(text):
+    try:
+        return int(text)
+    except ValueError:
+        return _to_real(text)
 
-    # 5. Generate SQL INSERT statements
-    print("\nGenerating SQL INSERT statements...")
-    generate_sql_insert_statements(data, output_sql_file)
 
-    print(f"\nSQL INSERT statements have been written to '{output_sql_file}'.")
-    print(f"SQLite database '{db_file}' has been populated with the extracted data.")
+# CIM booleans stored in CHAR(1) columns
+_FLAG_VALUES = {"true": "1", "false": "0"}
 
-    # 6. Close the database connection
-    conn.close()
-    print("\nDatabase connection closed.")
-    print("\nProcess completed successfully.")
+
+def _to_flag(text):
+    return _FLAG_VALUES.get(text.lower(), text)
+
+
+def column_converter(sql_type):
+    """
+    Returns the function converting property text for a column of the
+    given SQL type, or None if the text is stored as it is.
+
+    DOUBLE PRECISION and other REAL/NUMERIC types become floats and INTEGER
+    types ints; CHAR(1) columns hold CIM booleans as '1'/'0'; character
+    types keep the text, so numeric-looking names and mRIDs stay strings.
+    """
+    declared = sql_type.upper().replace(" ", "")
+    if declared in ("CHAR(1)", "CHARACTER(1)", "BOOLEAN"):
+        return _to_flag
+    affinity = Column("", sql_type).affinity
+    if affinity == "INTEGER":
+        return _to_integer
+    if affinity in ("REAL", "NUMERIC"):
+        return _to_real
+    if affinity == "TEXT":
+        return None
+    return guess_value
+
+
+class _ConverterMap(dict):
+    """
+    Column -> converter lookup for one table. Columns not in the schema
+    (such as raw child tags like "ACLineSegment.r") are resolved on first
+    use by their attribute name, and otherwise fall back to guess_value.
+    """
+
+    def __init__(self, converters):
+        super().__init__(converters)
+        self._schema = dict(converters)
+
+    def __missing__(self, column):
+        schema_column = ColumnPlan.resolve(column, self._schema)
+        converter = self._schema[schema_column] if schema_column else guess_value
+        self[column] = converter
+        return converter
+
+
+class ValueConverter:
+    """
+    Schema-driven value typing for the extracted rows.
+
+    Converter tables are built once per table from the declared column
+    types (see column_converter) and applied column by column to batches of
+    rows with the same layout, so text columns cost nothing and numeric
+    columns are converted with one float()/int() pass per batch. Extra
+    columns planned by a pre-scan use their planned type.
+
+    Args:
+        schema (Schema): Parsed schema (cim_schema.load_schema).
+        plan (ColumnPlan, optional): Column plan, for its added columns.
+        use_numpy (bool): Convert REAL columns through numpy arrays.
+        batch_size (int): Rows converted together by convert_stream().
+    """
+
+    def __init__(self, schema, plan=None, use_numpy=False, batch_size=1024):
+        self.converters = {}
+        for name, table in schema.tables.items():
+            converters = {column.name: column_converter(column.sql_type)
+                          for column in table.columns.values()}
+            converters['mRID'] = None
+            if plan is not None:
+                for column, sql_type in plan.added.get(name, ()):
+                    converters[column] = column_converter(sql_type)
+            self.converters[name] = _ConverterMap(converters)
+        self.batch_size = batch_size
+        self._steps = {}  # RowLayout -> [(column index, converter)]
+        self._numpy = None
+        if use_numpy:
+            try:
+                import numpy
+            except ImportError:
+                raise RuntimeError("NumPy value conversion requires the 'numpy' package "
+                                   "(pip install numpy)") from None
+            self._numpy = numpy
+
+    def convert_rows(self, layout, rows):
+        """Returns the rows of one layout with their values converted, in order."""
+        steps = self._steps.get(layout)
+        if steps is None:
+            converters = self.converters[layout.table]
+            steps = self._steps[layout] = [
+                (index, converters[column]) for index, column in enumerate(layout.columns)
+                if converters[column] is not None]
+        if not steps or not rows:
+            return rows
+        columns = list(zip(*rows))
+        for index, converter in steps:
+            columns[index] = self._convert_column(converter, columns[index])
+        return list(zip(*columns))
+
+    def _convert_column(self, converter, values):
+        if converter is _to_real:
+            if self._numpy is not None:
+                try:
+                    array = self._numpy.array(values, dtype=self._numpy.float64)
+                except (ValueError, TypeError):
+                    pass
+                else:
+                    # None becomes NaN in the array; both are stored as NULL
+                    return [None if value != value else value for value in array.tolist()]
+            try:
+                return [float(value) if value is not None else None for value in values]
+            except ValueError:
+                pass
+        return [converter(value) if value is not None else None for value in values]
+
+    def convert_stream(self, rows, timer=None):
+        """
+        Converts a stream of (layout, row) pairs batch by batch and yields
+        them in their original order.
+        """
+        batch = []
+        for item in rows:
+            batch.append(item)
+            if len(batch) >= self.batch_size:
+                self._convert_batch(batch, timer)
+                yield from batch
+                batch = []
+        if batch:
+            self._convert_batch(batch, timer)
+            yield from batch
+
+    def _convert_batch(self, batch, timer):
+        start = time.perf_counter()
+        by_layout = {}
+        for i, (layout, _row) in enumerate(batch):
+            positions = by_layout.get(layout)
+            if positions is None:
+                positions = by_layout[layout] = []
+            positions.append(i)
+        for layout, positions in by_layout.items():
+            rows = self.convert_rows(layout, [batch[i][1] for i in positions])
+            for i, row in zip(positions, rows):
+                batch[i] = (layout, row)
+        if timer is not None:
+            timer.add("convert", time.perf_counter() - start)
+
+
+def extract_data_from_xml(xml_file, tables, plan=None, converter=None, backend="auto",
+                          hierarchy=None):
+    """
+    Parses the XML file and extracts data for the specified tables.
+
+    Args:
+        xml_file (str): Path to the XML file.
+        tables (dict): Dictionary mapping table names to column lists.
+        plan (ColumnPlan, optional): Fixed column layout to build rows with.
+        converter (ValueConverter, optional): Schema-driven value typing.
+        backend (str): XML parser (see iter_rows_from_xml).
+        hierarchy (ClassHierarchy, optional): Subclass routing (see IngestPlan).
+
+    Returns:
+        data (dict): Dictionary mapping the RowLayout of each table to the
+        list of its rows (tuples of values in the layout's columns).
+    """
+    rows = {table: [] for table in tables}
+    layouts = {}
+    for layout, row in iter_rows_from_xml(xml_file, tables, plan, converter=converter,
+                                          backend=backend, hierarchy=hierarchy):
+        rows[layout.table].append(row)
+        layouts[layout.table] = layout
+
+    data = {}
+    for table, table_rows in rows.items():
+        layout = layouts.get(table)
+        if layout is None:
+            columns = plan.columns[table] if plan is not None else tables[table]
+            layout = row_layout(table, tuple(columns))
+        # Rows built before the layout grew lack its last columns
+        width = len(layout.columns)
+        if any(len(row) < width for row in table_rows):
+            table_rows[:] = [row + (None,) * (width - len(row)) for row in table_rows]
+        data[layout] = table_rows
+    return data
+
+
+# Opening tag of the rdf:RDF document element, and the start tag of a
+# top-level CIM object (<prefix:Class rdf:ID=...> or rdf:about=...)
+_ROOT_START_RE = re.compile(rb'<((?:[\w.-]+:)?RDF)\b[^>]*>')
+_OBJECT_START_RE = re.compile(rb'<[A-Za-z_][\w.-]*:[A-Za-z_][\w.-]*\s+rdf:(?:ID|about)\s*=')
+
+
+def _read_document_frame(xml_file, probe_size=1 << 20):
+    """
+    Locates the body of the rdf:RDF document element.
+
+    Returns:
+        header (bytes): Everything up to and including the root start tag,
+            so that every shard sees the same namespace declarations.
+        body_start (int), body_end (int): Byte range of the root's content.
+        closing (bytes): The root end tag.
+    """
+    size = os.path.getsize(xml_file)
+    with open(xml_file, 'rb') as f:
+        head = f.read(probe_size)
+        match = _ROOT_START_RE.search(head)
+        if match is None:
+            raise ValueError(f"Could not find the rdf:RDF start tag in '{xml_file}'")
+        closing = b'</' + match.group(1) + b'>'
+
+        f.seek(max(0, size - probe_size))
+        tail = f.read()
+        tail_pos = tail.rfind(closing)
+        if tail_pos < 0:
+            raise ValueError(f"Could not find the {closing.decode()} end tag in '{xml_file}'")
+    body_end = max(0, size - probe_size) + tail_pos
+    return head[:match.end()], match.end(), body_end, closing
+
+
+def _find_shard_ranges(xml_file, body_start, body_end, shard_size):
+    """
+    Splits the document body into byte ranges that start on top-level
+    object boundaries, each roughly shard_size bytes long.
+
+    A boundary is the start tag of the next element carrying rdf:ID or
+    rdf:about, which in CIM RDF/XML only appears on top-level objects.
+    """
+    starts = [body_start]
+    window = 1 << 20
+    with open(xml_file, 'rb') as f:
+        target = body_start + shard_size
+        while target < body_end:
+            f.seek(target)
+            chunk = f.read(min(window, body_end - target))
+            match = _OBJECT_START_RE.search(chunk)
+            if match is None:
+                if target + len(chunk) >= body_end:
+                    break
+                target += len(chunk)  # No object start in this window, look further
+                continue
+            boundary = target + match.start()
+            starts.append(boundary)
+            target = boundary + shard_size
+    return list(zip(starts, starts[1:] + [body_end]))
+
+
+# Per-process state of the shard parsing workers
+_shard_state = {}
+
+
+def _init_shard_worker(xml_file, header, closing, tables, plan, converter, backend,
+                       hierarchy):
+    _shard_state.update(xml_file=xml_file, header=header, closing=closing,
+                        tables=tables, plan=plan, converter=converter, backend=backend,
+                        hierarchy=hierarchy)
+
+
+def _parse_shard(byte_range):
+    """
+    Parses one byte range of the model and returns its rows in order, as
+    (table, columns, row) so the parent can look up its own RowLayouts.
+    """
+    start, end = byte_range
+    with open(_shard_state['xml_file'], 'rb') as f:
+        f.seek(start)
+        body = f.read(end - start)
+    document = io.BytesIO(_shard_state['header'] + body + _shard_state['closing'])
+    rows = iter_rows_from_xml(document, _shard_state['tables'], _shard_state['plan'],
+                              converter=_shard_state['converter'],
+                              backend=_shard_state['backend'],
+                              hierarchy=_shard_state['hierarchy'])
+    return [(layout.table, layout.columns, row) for layout, row in rows]
+
+
+def iter_rows_parallel(xml_file, tables, plan=None, workers=None,
+                       shard_size=DEFAULT_SHARD_SIZE, progress=None, converter=None,
+                       backend="auto", hierarchy=None):
+    """
+    Parses the XML file on several processes and yields its rows.
+
+    The document body is cut into byte ranges on top-level object
+    boundaries, and each range is parsed in a ProcessPoolExecutor worker.
+    Shard results are yielded strictly in file order, so the output is the
+    same as iter_rows_from_xml() whatever the number of workers. At most
+    two shards per worker are in flight, which bounds memory use.
+
+    Args:
+        xml_file (str): Path to the XML file.
+        tables (dict): Dictionary mapping table names to column lists.
+        plan (ColumnPlan, optional): Fixed column layout to build rows with.
+        workers (int, optional): Worker processes (default: CPU count).
+        shard_size (int): Approximate shard size in bytes.
+        progress (ProgressReporter, optional): Told the bytes consumed as
+            shards are delivered.
+        converter (ValueConverter, optional): Schema-driven value typing,
+            applied in the workers.
+        backend (str): XML parser of the workers (see iter_rows_from_xml).
+        hierarchy (ClassHierarchy, optional): Subclass routing (see IngestPlan).
+
+    Yields:
+        (layout, row) pairs, in document order.
+    """
+    header, body_start, body_end, closing = _read_document_frame(xml_file)
+    ranges = _find_shard_ranges(xml_file, body_start, body_end, shard_size)
+    workers = workers or os.cpu_count() or 1
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_shard_worker,
+                             initargs=(xml_file, header, closing, tables, plan,
+                                       converter, resolve_xml_backend(backend),
+                                       hierarchy)) as executor:
+        in_flight = deque()
+        pending_ranges = iter(ranges)
+
+        def submit(byte_range):
+            future = executor.submit(_parse_shard, byte_range)
+            future.byte_range = byte_range
+            in_flight.append(future)
+
+        for byte_range in islice(pending_ranges, 2 * workers):
+            submit(byte_range)
+        while in_flight:
+            future = in_flight.popleft()
+            rows = future.result()
+            for byte_range in islice(pending_ranges, 1):
+                submit(byte_range)
+            if progress is not None:
+                progress.bytes_read = future.byte_range[1]
+            for table, columns, row in rows:
+                yield row_layout(table, columns), row
+
+
+def format_sql_value(val):
+    """Formats a Python value as an SQL literal."""
+    if val is None:
+        return "NULL"
+    elif isinstance(val, (int, float)):
+        return f"{val}"
+    else:
+        # Escape single quotes in strings
+        escaped_val = val.replace("'", "''")
+        return f"'{escaped_val}'"
+
+
+def open_dump_file(path, compression=None):
+    """
+    Opens a text file for writing, optionally compressed.
+
+    Args:
+        path (str): Output path.
+        compression (str, optional): 'gzip', 'zstd' or None. If None, it is
+            taken from the file suffix (.gz / .zst).
+    """
+    if compression is None:
+        if path.endswith('.gz'):
+            compression = 'gzip'
+        elif path.endswith('.zst'):
+            compression = 'zstd'
+    if compression == 'gzip':
+        return gzip.open(path, 'wt', encoding='utf-8', compresslevel=6)
+    if compression == 'zstd':
+        try:
+            import zstandard
+        except ImportError:
+            raise RuntimeError("zstd output requires the 'zstandard' package "
+                               "(pip install zstandard)")
+        raw = zstandard.ZstdCompressor(level=3).stream_writer(open(path, 'wb'))
+        return io.TextIOWrapper(raw, encoding='utf-8')
+    return open(path, 'w', encoding='utf-8', buffering=1 << 20)
+
+
+def _compressed_path(path, compression):
+    suffix = {'gzip': '.gz', 'zstd': '.zst'}.get(compression, '')
+    return path if path.endswith(suffix) else path + suffix
+
+
+class SqlDumpWriter:
+    """
+    Streams rows into an SQL dump file.
+
+    Rows are grouped by table and column signature and written as
+    multi-row INSERT ... VALUES (...),(...) statements of up to
+    rows_per_statement rows, and the statements are wrapped in
+    BEGIN/COMMIT blocks of about rows_per_transaction rows. Only the rows of
+    unfinished statements are held in memory.
+    """
+
+    def __init__(self, output_file, compression=None,
+                 rows_per_statement=DEFAULT_ROWS_PER_STATEMENT,
+                 rows_per_transaction=DEFAULT_TRANSACTION_SIZE):
+        self.output_file = output_file
+        self.rows_per_statement = rows_per_statement
+        self.rows_per_transaction = rows_per_transaction
+        self.rows_written = 0
+        self._file = open_dump_file(output_file, compression)
+        self._pending = {}  # RowLayout -> list of formatted VALUES tuples
+        self._in_transaction = 0
+
+    def add(self, layout, row):
+        """Queues one row of the given RowLayout."""
+        group = self._pending.get(layout)
+        if group is None:
+            group = self._pending[layout] = []
+        group.append('(' + ', '.join([format_sql_value(val) for val in row]) + ')')
+        if len(group) >= self.rows_per_statement:
+            self._write(layout, group)
+            group.clear()
+
+    def _write(self, layout, group):
+        if self._in_transaction == 0:
+            self._file.write("BEGIN TRANSACTION;\n")
+        column_list = ', '.join([f'"{col}"' for col in layout.columns])
+        self._file.write(f'INSERT INTO "{layout.table}" ({column_list}) VALUES\n'
+                         + ',\n'.join(group) + ';\n')
+        self.rows_written += len(group)
+        self._in_transaction += len(group)
+        if self._in_transaction >= self.rows_per_transaction:
+            self._file.write("COMMIT;\n")
+            self._in_transaction = 0
+
+    def close(self):
+        """Writes the remaining rows and closes the file."""
+        for layout, group in self._pending.items():
+            if group:
+                self._write(layout, group)
+        self._pending.clear()
+        if self._in_transaction:
+            self._file.write("COMMIT;\n")
+            self._in_transaction = 0
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class CsvBundleWriter:
+    """
+    Streams rows into one CSV file per table, plus a load.sql script of
+    psql \\copy commands for bulk loading the bundle into PostgreSQL.
+
+    Each table's CSV has a fixed header: the columns of the table's layout
+    (the ColumnPlan's when one is used, the schema's otherwise). Without a
+    plan, child tags are mapped onto the schema columns as ColumnPlan does
+    (column_maps). Values of columns outside that layout are dropped, so
+    use --column-plan prescan to keep unknown attributes. NULL is written
+    as an unquoted empty field.
+    """
+
+    def __init__(self, directory, columns, compression=None, added=None, column_maps=None):
+        self.directory = directory
+        self.columns = columns
+        self.compression = compression
+        self.added = added or {}
+        self._column_maps = column_maps
+        self.rows_written = 0
+        self._writers = {}  # table -> (file, csv writer, columns)
+        self._projectors = {}  # RowLayout -> row to CSV values
+        os.makedirs(directory, exist_ok=True)
+
+    def _file_name(self, table):
+        return _compressed_path(f"{table}.csv", self.compression)
+
+    def add(self, layout, row):
+        """Writes one row of the given RowLayout."""
+        table = layout.table
+        entry = self._writers.get(table)
+        if entry is None:
+            columns = self.columns[table]
+            f = open_dump_file(os.path.join(self.directory, self._file_name(table)),
+                               self.compression)
+            writer = csv.writer(f, lineterminator='\n')
+            writer.writerow(columns)
+            entry = self._writers[table] = (f, writer, columns)
+        project = self._projectors.get(layout)
+        if project is None:
+            column_map = self._column_maps[table] if self._column_maps is not None else None
+            project = self._projectors[layout] = _projector(layout, entry[2], column_map)
+        entry[1].writerow(project(row))
+        self.rows_written += 1
+
+    def close(self):
+        """Closes the CSV files and writes load.sql."""
+        lines = ["-- Load with: psql -f load.sql (after creating the schema)"]
+        for table, added in self.added.items():
+            for column, sql_type in added:
+                pg_type = "DOUBLE PRECISION" if sql_type == "REAL" else sql_type
+                lines.append(f'ALTER TABLE "{table}" ADD COLUMN IF NOT EXISTS "{column}" {pg_type};')
+        for table, (f, _writer, columns) in self._writers.items():
+            f.close()
+            column_list = ', '.join([f'"{col}"' for col in columns])
+            file_name = self._file_name(table)
+            if self.compression == 'gzip':
+                source = f"PROGRAM 'gzip -dc {file_name}'"
+            elif self.compression == 'zstd':
+                source = f"PROGRAM 'zstd -dc {file_name}'"
+            else:
+                source = f"'{file_name}'"
+            lines.append(f'\\copy "{table}" ({column_list}) FROM {source} '
+                         f'WITH (FORMAT csv, HEADER true)')
+        self._writers.clear()
+        with open(os.path.join(self.directory, 'load.sql'), 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lines) + '\n')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise RuntimeError("Parquet output requires the 'pyarrow' package "
+                           "(pip install pyarrow)") from None
+    return pyarrow, pyarrow.parquet
+
+
+def _coerce_value(value, kind):
+    """Best-effort conversion of a value the column type cannot hold as is."""
+    if kind == "TEXT":
+        return str(value)
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    if kind == "INTEGER":
+        return int(number) if number.is_integer() else None
+    return number
+
+
+class ParquetBundleWriter:
+    """
+    Streams rows into one Parquet file per table, for column-oriented
+    analysis of the extracted model.
+
+    Columns are typed from the schema (INTEGER -> int64, REAL and other
+    numeric types -> float64, everything else -> string); foreign-key
+    columns, which hold mRID references, are dictionary-encoded. Rows are
+    buffered per table and written as a row group every row_group_size
+    rows, so memory use is bounded by one row group per table.
+
+    Each file has the columns of the table's layout (the ColumnPlan's when
+    one is used, the schema's otherwise). Without a plan, child tags are
+    mapped onto the schema columns as ColumnPlan does; values of other
+    columns are dropped. Values a column type cannot hold are converted
+    where possible and stored as null otherwise.
+    """
+
+    def __init__(self, directory, schema, plan=None, compression=None,
+                 row_group_size=DEFAULT_ROW_GROUP_SIZE):
+        self.pa, self.pq = _import_pyarrow()
+        self.directory = directory
+        self.compression = compression or 'snappy'
+        self.row_group_size = row_group_size
+        self.rows_written = 0
+        self.values_dropped = 0
+        self._layouts = {}
+        # Rows keyed on raw child tags (no plan) are mapped onto the schema columns
+        self._column_maps = None
+        if plan is None:
+            self._column_maps = ColumnPlan(schema.column_map()).column_maps
+        for name, table in schema.tables.items():
+            kinds = {column.name: column.affinity for column in table.columns.values()}
+            if plan is not None:
+                kinds.update(plan.added.get(name, ()))
+            # mRID can itself be a foreign key (to the superclass table) but is unique
+            references = {fk.columns[0] for fk in table.foreign_keys
+                          if len(fk.columns) == 1 and fk.columns[0] != 'mRID'}
+            columns = plan.columns[name] if plan is not None else table.column_names
+            self._layouts[name] = [(column, self._kind(kinds.get(column, "TEXT")),
+                                    column in references) for column in columns]
+        self._buffers = {}  # table -> list of value lists, one per column
+        self._writers = {}  # table -> pyarrow.parquet.ParquetWriter
+        self._projectors = {}  # RowLayout -> row to file column values
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def _kind(affinity):
+        if affinity == "INTEGER":
+            return "INTEGER"
+        if affinity in ("REAL", "NUMERIC"):
+            return "REAL"
+        return "TEXT"
+
+    def _arrow_type(self, kind, reference):
+        pa = self.pa
+        if reference:
+            return pa.dictionary(pa.int32(), pa.string())
+        return {"INTEGER": pa.int64(), "REAL": pa.float64()}.get(kind, pa.string())
+
+    def add(self, layout, row):
+        """Queues one row of the given RowLayout."""
+        table = layout.table
+        buffers = self._buffers.get(table)
+        if buffers is None:
+            buffers = self._buffers[table] = [[] for _ in self._layouts[table]]
+        project = self._projectors.get(layout)
+        if project is None:
+            columns = [column for column, _kind, _reference in self._layouts[table]]
+            column_map = self._column_maps[table] if self._column_maps is not None else None
+            project = self._projectors[layout] = _projector(layout, columns, column_map)
+        for value, values in zip(project(row), buffers):
+            values.append(value)
+        if len(buffers[0]) >= self.row_group_size:
+            self._write(table, buffers)
+
+    def _array(self, values, kind, reference):
+        pa = self.pa
+        value_type = self._arrow_type(kind, False)
+        try:
+            array = pa.array(values, type=value_type)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            coerced = [_coerce_value(v, kind) if v is not None else None for v in values]
+            self.values_dropped += sum(1 for old, new in zip(values, coerced)
+                                       if old is not None and new is None)
+            array = pa.array(coerced, type=value_type)
+        return array.dictionary_encode() if reference else array
+
+    def _write(self, table, buffers):
+        layout = self._layouts[table]
+        writer = self._writers.get(table)
+        if writer is None:
+            schema = self.pa.schema([(column, self._arrow_type(kind, reference))
+                                     for column, kind, reference in layout])
+            path = os.path.join(self.directory, f"{table}.parquet")
+            writer = self._writers[table] = self.pq.ParquetWriter(
+                path, schema, compression=self.compression)
+        arrays = [self._array(values, kind, reference)
+                  for values, (_column, kind, reference) in zip(buffers, layout)]
+        writer.write_table(self.pa.Table.from_arrays(arrays, schema=writer.schema))
+        self.rows_written += len(buffers[0])
+        for values in buffers:
+            values.clear()
+
+    def close(self):
+        """Writes the remaining rows and closes the Parquet files."""
+        for table, buffers in self._buffers.items():
+            if buffers[0]:
+                self._write(table, buffers)
+        for writer in self._writers.values():
+            writer.close()
+        self._writers.clear()
+        if self.values_dropped:
+            log.warning("%d values did not fit their Parquet column type and were "
+                        "written as null.", self.values_dropped)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def generate_sql_insert_statements(data, output_file, compression=None):
+    """
+    Generates SQL INSERT statements from the extracted data.
+
+    Args:
+        data (dict): Dictionary mapping RowLayouts to lists of rows.
+        output_file (str): Path to the output SQL file.
+        compression (str, optional): 'gzip' or 'zstd'.
+    """
+    with SqlDumpWriter(output_file, compression) as writer:
+        for layout, rows in data.items():
+            for row in rows:
+                writer.add(layout, row)
+
+
+def _table_columns(cursor, table):
+    """Returns the current column names of a table via PRAGMA table_info."""
+    cursor.execute(f'PRAGMA table_info("{table}");')
+    return [row_[1] for row_ in cursor.fetchall()]
+
+
+def _stored_columns(columns, fk_columns):
+    """
+    Returns the column sets of a table that hold the values of a foreign
+    key: the key's own columns, and for a single-column key also the
+    qualified child-tag columns of a dynamic load ("ACLineSegment.BaseVoltage"
+    for BaseVoltage), as show_table_entry.py resolves them.
+
+    Args:
+        columns (list): Current columns of the table.
+        fk_columns (tuple): Columns of the foreign key.
+
+    Returns:
+        list: One tuple of columns per set present in the table.
+    """
+    if len(fk_columns) > 1:
+        return [tuple(fk_columns)] if set(fk_columns) <= set(columns) else []
+    return [(column,) for column in columns if column.rsplit('.', 1)[-1] == fk_columns[0]]
+
+
+def _has_values(cursor, table, columns):
+    """True if any row of the table has a value in one of the columns."""
+    present = " OR ".join(f'"{col}" IS NOT NULL' for col in columns)
+    cursor.execute(f'SELECT 1 FROM "{table}" WHERE {present} LIMIT 1')
+    return cursor.fetchone() is not None
+
+
+def apply_fast_load_profile(conn, journal_mode="WAL"):
+    """
+    Switches the connection to an unsafe-but-fast bulk load profile.
+
+    Durability is traded for speed (synchronous=OFF, journal_mode WAL or OFF)
+    and foreign key enforcement is suspended; references are checked in one
+    go by check_references() after the load.
+    """
+    cursor = conn.cursor()
+    cursor.execute(f"PRAGMA journal_mode = {journal_mode};")
+    cursor.execute("PRAGMA synchronous = OFF;")
+    cursor.execute("PRAGMA temp_store = MEMORY;")
+    cursor.execute("PRAGMA cache_size = -262144;")  # 256 MiB
+    cursor.execute("PRAGMA foreign_keys = OFF;")
+
+
+def finish_fast_load(conn):
+    """Restores the default safety settings after a fast load."""
+    conn.commit()
+    cursor = conn.cursor()
+    cursor.execute("PRAGMA journal_mode = DELETE;")
+    cursor.execute("PRAGMA synchronous = FULL;")
+
+
+def check_references(conn, schema, delete=False, samples=3):
+    """
+    Checks every foreign key of the schema, inline or ALTER TABLE, against
+    the loaded data, and logs one report of the references whose target row
+    is missing.
+
+    Loads run with foreign key enforcement off (see main), so rows are
+    never rejected because a row they reference comes later in the file or
+    is part of a reference cycle; this check replaces the per-row errors.
+    References stored in qualified columns by a dynamic load are checked
+    like the schema column (see _stored_columns). Foreign keys on mRID
+    alone tie a table to the table of its parent class, where the objects
+    of the subclass are not stored, and are skipped, as are foreign keys
+    to tables outside the database.
+
+    Args:
+        conn (sqlite3.Connection): Loaded database.
+        schema (Schema): Schema whose foreign keys are checked.
+        delete (bool): Delete the rows with missing references, repeatedly
+            until none are left (deleting a row can orphan the rows that
+            reference it).
+        samples (int): mRIDs listed per foreign key in the report.
+
+    Returns:
+        violations (dict): (table, column, referenced table) -> number of rows.
+    """
+    conn.commit()
+    cursor = conn.cursor()
+    existing = {name for (name,) in cursor.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table'")}
+    columns = {}
+    checks = []
+    for table, fk in schema.foreign_keys():
+        if fk.columns == ('mRID',):
+            continue
+        if table not in existing or fk.ref_table not in existing:
+            continue
+        if table not in columns:
+            columns[table] = _table_columns(cursor, table)
+        if fk.ref_table not in columns:
+            columns[fk.ref_table] = _table_columns(cursor, fk.ref_table)
+        if not set(fk.ref_columns) <= set(columns[fk.ref_table]):
+            continue
+        for stored in _stored_columns(columns[table], fk.columns):
+            match = " AND ".join(f'p."{ref}" = c."{col}"'
+                                 for col, ref in zip(stored, fk.ref_columns))
+            present = " AND ".join(f'c."{col}" IS NOT NULL' for col in stored)
+            condition = (f'{present} AND NOT EXISTS '
+                         f'(SELECT 1 FROM "{fk.ref_table}" p WHERE {match})')
+            checks.append((table, stored, fk.ref_table, condition))
+
+    violations, examples, deleted = {}, {}, {}
+    while True:
+        removed = 0
+        for table, stored, ref_table, condition in checks:
+            key = (table, ", ".join(stored), ref_table)
+            cursor.execute(f'SELECT c.rowid, c."mRID" FROM "{table}" c WHERE {condition}')
+            rows = cursor.fetchall()
+            if not rows:
+                continue
+            violations[key] = violations.get(key, 0) + len(rows)
+            examples.setdefault(key, [mRID for _rowid, mRID in rows[:samples]])
+            if delete:
+                cursor.executemany(f'DELETE FROM "{table}" WHERE rowid = ?',
+                                   [(rowid,) for rowid, _mRID in rows])
+                deleted[table] = deleted.get(table, 0) + len(rows)
+                removed += len(rows)
+        if not removed:
+            break
+    conn.commit()
+
+    if violations:
+        lines = [f"Reference check: {sum(violations.values())} missing reference(s) "
+                 f"in {len(violations)} foreign key(s)"]
+        for (table, column, ref_table), count in violations.items():
+            lines.append(f"  {table}.{column} -> {ref_table}: {count} row(s), e.g. "
+                         + ", ".join(str(mRID) for mRID in examples[(table, column, ref_table)]))
+        for table, count in deleted.items():
+            lines.append(f"  deleted {count} row(s) from {table}")
+        log.warning("\n".join(lines))
+    else:
+        log.info("Reference check: all %d foreign key(s) resolved.", len(checks))
+    return violations
+
+
+def parse_index_spec(spec):
+    """
+    Parses a covering index given as 'Table(col1,col2,...)' into
+    (table, [columns]).
+    """
+    match = re.fullmatch(r'\s*([^()\s]+)\s*\(([^()]*)\)\s*', spec)
+    columns = [col.strip() for col in match.group(2).split(',')] if match else []
+    if not match or not all(columns):
+        raise ValueError(f"Invalid index specification {spec!r}; expected Table(col1,col2,...)")
+    return match.group(1), columns
+
+
+def build_indexes(conn, schema, covering=(), vacuum=False):
+    """
+    Post-load indexing stage: creates an index on every foreign-key
+    (reference) column set of the schema, plus any extra covering indexes,
+    then runs ANALYZE and optionally VACUUM.
+
+    Building the indexes once after the bulk load is cheaper than keeping
+    them up to date during the inserts. A dynamic load keeps references in
+    qualified columns ("ACLineSegment.BaseVoltage", see _stored_columns);
+    where a foreign key has several such columns, the ones holding values
+    are indexed. Foreign keys on mRID alone are skipped, as mRID already
+    has its UNIQUE index, as are tables or columns missing from the
+    database.
+
+    Args:
+        conn (sqlite3.Connection): Loaded database.
+        schema (Schema): Schema whose foreign keys are indexed.
+        covering (iterable): (table, [columns]) pairs for hot query
+            patterns; list the filtered columns first and the selected
+            ones after them so the query is answered from the index alone.
+        vacuum (bool): Rebuild the database file afterwards.
+
+    Returns:
+        created (list): Names of the indexes created.
+    """
+    conn.commit()
+    cursor = conn.cursor()
+    existing = {name for (name,) in cursor.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table'")}
+    columns = {}
+
+    wanted = []
+    for table, fk in schema.foreign_keys():
+        if fk.columns != ('mRID',):
+            wanted.append((table, tuple(fk.columns), True))
+    wanted.extend((table, tuple(cols), False) for table, cols in covering)
+
+    created = []
+    for table, cols, reference in wanted:
+        if table not in existing:
+            log.warning("Not indexing '%s': no such table.", table)
+            continue
+        if table not in columns:
+            columns[table] = _table_columns(cursor, table)
+        candidates = [cols]
+        if reference:
+            candidates = _stored_columns(columns[table], cols)
+            if len(candidates) > 1:
+                candidates = [stored for stored in candidates
+                              if _has_values(cursor, table, stored)] or candidates[:1]
+        for stored in candidates:
+            missing = [col for col in stored if col not in columns[table]]
+            if missing:
+                log.warning("Not indexing %s(%s): no column %s.", table, ", ".join(stored),
+                            ", ".join(missing))
+                continue
+            name = "idx_" + "_".join((table,) + stored)
+            if name in created:
+                continue
+            column_list = ', '.join([f'"{col}"' for col in stored])
+            start = time.perf_counter()
+            cursor.execute(f'CREATE INDEX IF NOT EXISTS "{name}" ON "{table}" ({column_list});')
+            log.info("Created index %s in %.2fs", name, time.perf_counter() - start)
+            created.append(name)
+        if not candidates:
+            log.warning("Not indexing %s(%s): no column %s.", table, ", ".join(cols),
+                        ", ".join(cols))
+    conn.commit()
+
+    cursor.execute("ANALYZE;")
+    conn.commit()
+    if vacuum:
+        cursor.execute("VACUUM;")
+    log.info("Built %d index(es), analyzed%s.", len(created), " and vacuumed" if vacuum else "")
+    return created
+
+
+class BulkInserter:
+    """
+    Bulk-load engine for the SQLite database.
+
+    Rows are grouped by RowLayout; each layout gets its INSERT statement
+    built (and its missing columns added) once, and its rows are written
+    with executemany in batches of batch_size rows, several rows per
+    INSERT statement so that SQLite runs one statement per
+    INSERT_ROWS_PER_STATEMENT rows instead of one per row. The open
+    transaction is committed every transaction_size rows, or only by
+    flush() with transaction_size=None.
+
+    If a batch fails, it is rolled back to a savepoint and replayed row by
+    row so that only the offending rows are skipped, as before; the
+    failures are collected and logged once by report_failures(). With
+    ignore_errors=True (needed for journal_mode=OFF, where rollbacks are not
+    possible) failing rows are dropped by INSERT OR IGNORE and only counted.
+    """
+
+    def __init__(self, conn, batch_size=DEFAULT_BATCH_SIZE,
+                 transaction_size=DEFAULT_TRANSACTION_SIZE, ignore_errors=False):
+        self.conn = conn
+        self.cursor = conn.cursor()
+        self.batch_size = batch_size
+        self.transaction_size = transaction_size
+        self.ignore_errors = ignore_errors
+        self.rows_inserted = 0
+        self.rows_skipped = 0
+        self.failures = {}     # (table, error) -> [count, sample mRIDs]
+        self._columns = {}     # table -> columns known to exist
+        self._statements = {}  # RowLayout -> (INSERT, multi-row INSERT, rows per multi-row)
+        self._pending = {}     # RowLayout -> list of rows
+        self._uncommitted = 0
+
+    def add(self, layout, row):
+        """Queues one row of the given RowLayout for insertion."""
+        group = self._pending.get(layout)
+        if group is None:
+            group = self._pending[layout] = []
+        group.append(row)
+        if len(group) >= self.batch_size:
+            self._write(layout, group)
+            group.clear()
+
+    def add_many(self, layout, rows):
+        """Queues an iterable of rows of the given RowLayout for insertion."""
+        for row in rows:
+            self.add(layout, row)
+
+    def flush(self):
+        """Writes every queued row and commits."""
+        for layout, group in self._pending.items():
+            if group:
+                self._write(layout, group)
+        self._pending.clear()
+        self.conn.commit()
+        self._uncommitted = 0
+
+    def _statement(self, layout):
+        statements = self._statements.get(layout)
+        if statements is None:
+            table, columns = layout.table, layout.columns
+            self._ensure_columns(table, columns)
+            column_list = ', '.join([f'"{col}"' for col in columns])
+            placeholders = '(' + ', '.join(['?'] * len(columns)) + ')'
+            verb = "INSERT OR IGNORE" if self.ignore_errors else "INSERT"
+            insert_sql = f'{verb} INTO "{table}" ({column_list}) VALUES '
+            per_statement = max(1, min(INSERT_ROWS_PER_STATEMENT,
+                                       SQLITE_MAX_VARIABLES // max(1, len(columns))))
+            statements = self._statements[layout] = (
+                insert_sql + placeholders,
+                insert_sql + ', '.join([placeholders] * per_statement),
+                per_statement)
+        return statements
+
+    def _execute_batch(self, statements, group):
+        """Runs the multi-row INSERT over group, the last rows one by one."""
+        insert_sql, multi_sql, per_statement = statements
+        full = len(group) - len(group) % per_statement
+        if per_statement > 1 and full:
+            params = [tuple(chain.from_iterable(group[start:start + per_statement]))
+                      for start in range(0, full, per_statement)]
+            self.cursor.executemany(multi_sql, params)
+            group = group[full:]
+        if group:
+            self.cursor.executemany(insert_sql, group)
+
+    def _ensure_columns(self, table, columns):
+        """Adds any column missing from table as TEXT."""
+        existing_cols = self._columns.get(table)
+        if existing_cols is None:
+            existing_cols = self._columns[table] = set(_table_columns(self.cursor, table))
+        for col in columns:
+            if col in existing_cols:
+                continue
+            try:
+                self.cursor.execute(f'ALTER TABLE "{table}" ADD COLUMN "{col}" TEXT;')
+                log.info('Added missing column "%s" as TEXT in table "%s"', col, table)
+            except sqlite3.OperationalError as e:
+                # If it's "duplicate column name", ignore
+                if "duplicate column name" not in str(e).lower():
+                    log.error("Error adding column '%s' to '%s': %s", col, table, e)
+            existing_cols.add(col)
+
+    def _write(self, layout, group):
+        statements = self._statement(layout)
+        if self.ignore_errors:
+            before = self.conn.total_changes
+            self._execute_batch(statements, group)
+            written = self.conn.total_changes - before
+            self.rows_skipped += len(group) - written
+        else:
+            if not self.conn.in_transaction:
+                self.cursor.execute("BEGIN")
+            self.cursor.execute("SAVEPOINT bulk_batch")
+            try:
+                self._execute_batch(statements, group)
+                written = len(group)
+            except (sqlite3.IntegrityError, sqlite3.OperationalError):
+                self.cursor.execute("ROLLBACK TO bulk_batch")
+                written = self._write_row_by_row(layout, statements[0], group)
+            self.cursor.execute("RELEASE bulk_batch")
+        self.rows_inserted += written
+
+        self._uncommitted += len(group)
+        if self.transaction_size is not None and self._uncommitted >= self.transaction_size:
+            self.conn.commit()
+            self._uncommitted = 0
+
+    def _write_row_by_row(self, layout, insert_sql, group):
+        table, columns = layout.table, layout.columns
+        written = 0
+        for params in group:
+            try:
+                self.cursor.execute(insert_sql, params)
+                written += 1
+            except (sqlite3.IntegrityError, sqlite3.OperationalError) as e:
+                row = dict(zip(columns, params))
+                log.debug("%s while inserting into '%s': %s. Row data: %s",
+                          type(e).__name__, table, e, row)
+                failure = self.failures.get((table, str(e)))
+                if failure is None:
+                    failure = self.failures[(table, str(e))] = [0, []]
+                failure[0] += 1
+                if len(failure[1]) < 3:
+                    failure[1].append(row.get('mRID'))
+                self.rows_skipped += 1  # Skip this row
+        return written
+
+    def report_failures(self):
+        """Logs one summary of the rows skipped because of errors."""
+        if not self.failures:
+            return
+        lines = [f"{self.rows_skipped} row(s) could not be inserted:"]
+        for (table, error), (count, mRIDs) in self.failures.items():
+            lines.append(f"  {table}: {error}: {count} row(s), e.g. "
+                         + ", ".join(str(mRID) for mRID in mRIDs))
+        log.warning("\n".join(lines))
+
+
+def insert_data_into_db(conn, data, batch_size=DEFAULT_BATCH_SIZE,
+                        transaction_size=DEFAULT_TRANSACTION_SIZE, ignore_errors=False):
+    """
+    Inserts the extracted data into the SQLite database.
+    If a column doesn't exist in the table, this function dynamically
+    adds that column (as TEXT) to allow storing all data.
+    """
+    inserter = BulkInserter(conn, batch_size, transaction_size, ignore_errors)
+    for layout, rows in data.items():
+        inserter.add_many(layout, rows)
+
+    # Commit all inserts
+    inserter.flush()
+    inserter.report_failures()
+    log.info("All data inserted into the SQLite database successfully "
+             "(%d rows, %d skipped).", inserter.rows_inserted, inserter.rows_skipped)
+
+
+# End-of-input markers for a _BatchWorker queue
+_DONE = object()
+_ABORT = object()
+
+
+class _BatchWorker(threading.Thread):
+    """
+    Pipeline stage running handle(batch) on a thread of its own for every
+    batch put on its bounded queue, then finish() once the input is done.
+
+    put() blocks while the queue is full, which holds the producer back to
+    the pace of the stage. An error in the stage is kept, the rest of the
+    input is drained unhandled, and the error is raised in the producer by
+    the next put() or by close().
+    """
+
+    def __init__(self, name, handle, finish, queue_size=DEFAULT_QUEUE_SIZE):
+        super().__init__(name=name, daemon=True)
+        self.handle = handle
+        self.finish = finish
+        self.queue = queue.Queue(queue_size)
+        self.error = None
+        self.busy = 0.0     # Seconds spent in handle() and finish()
+        self.blocked = 0.0  # Seconds the producer waited on the full queue
+
+    def run(self):
+        clock = time.perf_counter
+        while True:
+            batch = self.queue.get()
+            if batch is _DONE or batch is _ABORT:
+                break
+            if self.error is None:
+                start = clock()
+                try:
+                    self.handle(batch)
+                except BaseException as e:
+                    self.error = e
+                self.busy += clock() - start
+        if batch is _DONE and self.error is None:
+            start = clock()
+            try:
+                self.finish()
+            except BaseException as e:
+                self.error = e
+            self.busy += clock() - start
+
+    def put(self, batch):
+        if self.error is not None:
+            raise self.error
+        start = time.perf_counter()
+        self.queue.put(batch)
+        self.blocked += time.perf_counter() - start
+
+    def close(self, abort=False):
+        """Waits for the stage to finish; with abort=True finish() is skipped."""
+        self.queue.put(_ABORT if abort else _DONE)
+        self.join()
+        if self.error is not None and not abort:
+            raise self.error
+
+
+def _pipeline_rows(rows, inserter, dump, timer, progress,
+                   batch_size=DEFAULT_PIPELINE_BATCH, queue_size=DEFAULT_QUEUE_SIZE):
+    """
+    Feeds (layout, row) pairs to a SQLite writer thread and, if dump is
+    given, a dump writer thread, in batches over bounded queues, so that
+    parsing, the database writes and the dump writes overlap. SQLite and
+    the file and compression libraries release the GIL while they work.
+
+    The writer thread flushes the inserter and the dump thread closes the
+    dump at the end. Adds the busy time of each stage to timer as 'insert'
+    and 'dump', and the time the parser spent waiting, on full queues and
+    for the writers to finish, as 'wait'.
+
+    Returns:
+        row_count (int): Number of rows fed through the pipeline.
+    """
+    def insert(batch):
+        for layout, row in batch:
+            inserter.add(layout, row)
+
+    def write_dump(batch):
+        for layout, row in batch:
+            dump.add(layout, row)
+
+    workers = [_BatchWorker("sqlite-writer", insert, inserter.flush, queue_size)]
+    if dump is not None:
+        workers.append(_BatchWorker("dump-writer", write_dump, dump.close, queue_size))
+    for worker in workers:
+        worker.start()
+
+    row_count = 0
+    finished = False
+    try:
+        batch = []
+        for item in rows:
+            batch.append(item)
+            progress.row(item[0].table)
+            if len(batch) >= batch_size:
+                for worker in workers:
+                    worker.put(batch)
+                row_count += len(batch)
+                batch = []
+        if batch:
+            for worker in workers:
+                worker.put(batch)
+            row_count += len(batch)
+        finished = True
+    finally:
+        start = time.perf_counter()
+        errors = []
+        for worker in workers:
+            try:
+                worker.close(abort=not finished)
+            except BaseException as e:
+                errors.append(e)
+        timer.add("wait", time.perf_counter() - start
+                  + sum(worker.blocked for worker in workers))
+        for worker, stage in zip(workers, ("insert", "dump")):
+            timer.add(stage, worker.busy)
+    if errors:
+        raise errors[0]
+    return row_count
+
+
+def stream_xml_into_db(conn, xml_file, tables, dump=None,
+                       batch_size=DEFAULT_BATCH_SIZE,
+                       transaction_size=DEFAULT_TRANSACTION_SIZE, ignore_errors=False,
+                       plan=None, workers=1, shard_size=DEFAULT_SHARD_SIZE,
+                       timer=None, progress=None, converter=None,
+                       pipeline=False, queue_size=DEFAULT_QUEUE_SIZE, backend="auto",
+                       hierarchy=None):
+    """
+    Streams rows from the XML file straight into the SQLite database.
+
+    Rows go through a BulkInserter, so at most batch_size rows per table and
+    column signature are buffered and memory use stays flat regardless of
+    the model size. If dump is given (an SQL file path, or a writer such as
+    SqlDumpWriter or CsvBundleWriter), every row is also streamed into it,
+    and the writer is closed at the end.
+
+    With workers > 1 the XML is parsed in parallel (see iter_rows_parallel)
+    while this process remains the single writer of the database. With
+    pipeline=True the database and the dump are written on threads of their
+    own, fed through queues of queue_size batches (see _pipeline_rows).
+    backend picks the XML parser (see iter_rows_from_xml). Gzip-compressed
+    models are read transparently, on a single process. With a hierarchy,
+    objects of subclasses are loaded into their ancestor's table (see
+    IngestPlan).
+
+    Values are typed by converter if given (see ValueConverter). The time
+    spent in each stage is added to timer (parse, extract, convert, insert,
+    dump) and throughput is reported through progress, if given.
+
+    Returns:
+        row_count (int): Number of rows extracted from the XML file.
+    """
+    timer = timer or StageTimer()
+    progress = progress or ProgressReporter(os.path.getsize(xml_file))
+    inserter = BulkInserter(conn, batch_size, transaction_size, ignore_errors)
+    row_count = 0
+    if isinstance(dump, str):
+        dump = SqlDumpWriter(dump)
+
+    if workers > 1 and is_gzip_file(xml_file):
+        log.warning("'%s' is compressed and cannot be split into shards; "
+                    "parsing it on a single process", xml_file)
+        workers = 1
+
+    resources = ExitStack()
+    if workers > 1:
+        rows = iter_rows_parallel(xml_file, tables, plan, workers, shard_size, progress,
+                                  converter, backend, hierarchy)
+    else:
+        source = resources.enter_context(open_model(xml_file, progress))
+        rows = iter_rows_from_xml(source, tables, plan, timer, converter, backend, hierarchy)
+
+    clock = time.perf_counter
+    nested_stages = ("extract", "convert")
+    nested_before = sum(timer.stages.get(stage, 0.0) for stage in nested_stages)
+    parse_time = insert_time = dump_time = 0.0
+    try:
+        if pipeline:
+            start = clock()
+            wait_before = timer.stages.get("wait", 0.0)
+            row_count = _pipeline_rows(rows, inserter, dump, timer, progress,
+                                       queue_size=queue_size)
+            dump = None  # Closed by the dump writer thread
+            parse_time = clock() - start - (timer.stages["wait"] - wait_before)
+        else:
+            start = clock()
+            for layout, row in rows:
+                parsed = clock()
+                if dump is not None:
+                    dump.add(layout, row)
+                dumped = clock()
+                inserter.add(layout, row)
+                inserted = clock()
+                parse_time += parsed - start
+                dump_time += dumped - parsed
+                insert_time += inserted - dumped
+                start = inserted
+                row_count += 1
+                progress.row(layout.table)
+            parse_time += clock() - start
+            with timer.stage("insert"):
+                inserter.flush()
+    finally:
+        resources.close()
+        if dump is not None:
+            with timer.stage("dump"):
+                dump.close()
+
+    # Row building and conversion happen inside the parse loop; report them separately
+    nested_time = sum(timer.stages.get(stage, 0.0) for stage in nested_stages) - nested_before
+    timer.add("parse", parse_time - nested_time)
+    inserter.report_failures()
+    timer.add("insert", insert_time)
+    timer.add("dump", dump_time)
+    progress.report(final=True)
+    log.info("Streamed %d rows into the SQLite database successfully "
+             "(%d inserted, %d skipped).", row_count, inserter.rows_inserted,
+             inserter.rows_skipped)
+    return row_count
+
+
+class _CheckpointedRows(_ExpatRows):
+    """
+    _ExpatRows that also marks the start of every top-level object: mark
+    is (byte index, rows collected before it, objects before it) for the
+    last one seen, and objects counts them.
+    """
+
+    def __init__(self, ingest, raw=False):
+        super().__init__(ingest, raw)
+        self.mark = None
+        self.objects = 0
+        self._parser = None
+
+    def parser(self):
+        parser = self._parser = super().parser()
+        return parser
+
+    def _start(self, name, attrs):
+        if self._depth == 1:
+            self.mark = (self._parser.CurrentByteIndex, len(self.rows), self.objects)
+            self.objects += 1
+        super()._start(name, attrs)
+
+
+def iter_checkpointed_rows(xml_file, tables, plan=None, converter=None, hierarchy=None,
+                           offset=0, progress=None, timer=None):
+    """
+    Streams rows out of the XML file like iter_rows_from_xml() (with the
+    expat backend), with checkpoints in between for resumable loads.
+
+    Once per chunk read, a (None, (offset, objects)) pair is yielded
+    between the rows: offset is the byte position where a top-level object
+    starts, and every row of the objects before it (objects of them, since
+    parsing started) has been yielded by then. Parsing can start at such
+    an offset from an earlier run: the document's root start tag is read
+    from the top of the file and the rest of the file from the offset on.
+    A last checkpoint at the end of the file follows the last row.
+
+    Args:
+        xml_file (str): Path to the XML file (gzip files work too, see
+            open_model, but have to be decompressed up to the offset).
+        offset (int): Where to start, 0 or a checkpoint's offset.
+        progress (ProgressReporter, optional): Told the bytes read.
+        timer (StageTimer, optional): Receives the 'convert' time.
+        Other arguments: see iter_rows_from_xml.
+    """
+    builder = _CheckpointedRows(IngestPlan(tables, plan, hierarchy), converter is not None)
+    parser = builder.parser()
+    rows = builder.rows
+    with open_model(xml_file, progress) as source:
+        data = source.read(READ_SIZE)
+        match = _ROOT_START_RE.search(data)
+        if match is None:
+            raise ValueError(f"Could not find the rdf:RDF start tag in '{xml_file}'")
+        base = 0
+        if offset:
+            data = data[:match.end()]
+            base = offset - len(data)
+            source.seek(offset)
+        while True:
+            parser.Parse(data, not data)
+            if converter is not None and rows:
+                converter._convert_batch(rows, timer)
+            mark = builder.mark
+            if mark is None:
+                yield from rows
+            else:
+                index, count, objects = mark
+                yield from islice(rows, count)
+                yield None, (index + base, objects)
+                yield from islice(rows, count, None)
+                builder.mark = None
+            rows.clear()
+            if not data:
+                break
+            data = source.read(READ_SIZE)
+        yield None, (parser.CurrentByteIndex + base, builder.objects)
+
+
+def _model_fingerprint(xml_file):
+    """SHA-256 of the first READ_SIZE bytes of the (decompressed) model, its header."""
+    with open_model(xml_file) as source:
+        return hashlib.sha256(source.read(READ_SIZE)).hexdigest()
+
+
+class ImportCheckpoint:
+    """
+    Where a resumable load of a model file got to (see resume_xml_into_db),
+    kept in the _import_progress table of the database being loaded, so
+    that each checkpoint is committed together with the rows it covers.
+
+    Opening the checkpoint of a database loaded from another model (told
+    apart by its header, see _model_fingerprint) raises ValueError. The
+    part of the file before the checkpoint must not change between runs.
+
+    Attributes:
+        offset (int): Byte position to resume parsing at.
+        objects (int): Top-level objects before the offset.
+        table_rows (dict): Table -> rows loaded.
+        complete (bool): Whether the whole file has been loaded.
+    """
+
+    TABLE = "_import_progress"
+
+    def __init__(self, conn, xml_file):
+        self.conn = conn
+        self.xml_file = xml_file
+        self.fingerprint = _model_fingerprint(xml_file)
+        conn.execute(f'CREATE TABLE IF NOT EXISTS "{self.TABLE}" ('
+                     '"id" INTEGER PRIMARY KEY CHECK ("id" = 1), "xml_file" TEXT, '
+                     '"fingerprint" TEXT, "byte_offset" INTEGER, "objects" INTEGER, '
+                     '"rows" INTEGER, "table_rows" TEXT, "complete" INTEGER, "updated" TEXT)')
+        conn.commit()
+        self.offset = self.objects = 0
+        self.table_rows = {}
+        self.complete = False
+        stored = conn.execute(f'SELECT "fingerprint", "byte_offset", "objects", "table_rows", '
+                              f'"complete" FROM "{self.TABLE}"').fetchone()
+        if stored is not None:
+            fingerprint, self.offset, self.objects, table_rows, complete = stored
+            if fingerprint != self.fingerprint:
+                raise ValueError(f"The database holds a partial load of another model than "
+                                 f"'{xml_file}'; load it without --resume to start over")
+            self.table_rows = json.loads(table_rows)
+            self.complete = bool(complete)
+
+    @classmethod
+    def exists(cls, db_file):
+        """True if db_file is a database with a checkpoint table."""
+        if not os.path.exists(db_file):
+            return False
+        conn = sqlite3.connect(db_file)
+        try:
+            return conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+                                (cls.TABLE,)).fetchone() is not None
+        except sqlite3.DatabaseError:
+            return False
+        finally:
+            conn.close()
+
+    @property
+    def rows(self):
+        return sum(self.table_rows.values())
+
+    def save(self, offset, objects, table_rows, complete=False):
+        """Records a checkpoint, in the open transaction (the caller commits)."""
+        self.offset, self.objects, self.complete = offset, objects, complete
+        self.table_rows = dict(table_rows)
+        self.conn.execute(
+            f'INSERT OR REPLACE INTO "{self.TABLE}" VALUES (1, ?, ?, ?, ?, ?, ?, ?, ?)',
+            (self.xml_file, self.fingerprint, offset, objects, self.rows,
+             json.dumps(self.table_rows, sort_keys=True), int(complete),
+             time.strftime("%Y-%m-%dT%H:%M:%S")))
+
+
+def resume_xml_into_db(conn, xml_file, tables, batch_size=DEFAULT_BATCH_SIZE,
+                       transaction_size=DEFAULT_TRANSACTION_SIZE, ignore_errors=False,
+                       plan=None, timer=None, progress=None, converter=None,
+                       hierarchy=None):
+    """
+    Streams rows from the XML file into the SQLite database resumably.
+
+    Rows are committed in chunks of at least transaction_size rows, each
+    in one transaction with an ImportCheckpoint: the byte offset of the
+    next top-level object, the objects and rows loaded so far and the rows
+    per table. Nothing is committed in between, so after a failure the
+    database holds exactly the rows of the last checkpoint, and running
+    this again on it seeks past them and carries on from there.
+
+    Parsing is done with expat (see iter_checkpointed_rows), on a single
+    process. Values are typed by converter if given; stage times go to
+    timer and throughput to progress, as in stream_xml_into_db().
+
+    Returns:
+        row_count (int): Number of rows loaded, by this run and the ones before it.
+    """
+    timer = timer or StageTimer()
+    checkpoint = ImportCheckpoint(conn, xml_file)
+    if checkpoint.complete:
+        log.info("'%s' was loaded completely already (%d rows).", xml_file, checkpoint.rows)
+        return checkpoint.rows
+    if checkpoint.offset:
+        log.info("Resuming at byte %d of '%s': %d objects and %d rows loaded before.",
+                 checkpoint.offset, xml_file, checkpoint.objects, checkpoint.rows)
+
+    progress = progress or ProgressReporter(os.path.getsize(xml_file))
+    # Commits only happen at the checkpoints
+    inserter = BulkInserter(conn, batch_size, None, ignore_errors)
+    table_rows = dict(checkpoint.table_rows)
+    objects_before = checkpoint.objects
+    rows = iter_checkpointed_rows(xml_file, tables, plan, converter, hierarchy,
+                                  checkpoint.offset, progress, timer)
+
+    clock = time.perf_counter
+    convert_before = timer.stages.get("convert", 0.0)
+    parse_time = insert_time = 0.0
+    pending = 0
+    offset = objects = None
+    start = clock()
+    for layout, row in rows:
+        parsed = clock()
+        parse_time += parsed - start
+        if layout is None:
+            offset, objects = row
+            if pending >= transaction_size:
+                checkpoint.save(offset, objects_before + objects, table_rows)
+                inserter.flush()
+                pending = 0
+                log.debug("Checkpoint at byte %d, %d rows.", offset, checkpoint.rows)
+        else:
+            inserter.add(layout, row)
+            table_rows[layout.table] = table_rows.get(layout.table, 0) + 1
+            pending += 1
+            progress.row(layout.table)
+        start = clock()
+        insert_time += start - parsed
+
+    with timer.stage("insert"):
+        checkpoint.save(offset, objects_before + objects, table_rows, complete=True)
+        inserter.flush()
+
+    timer.add("parse", parse_time - (timer.stages.get("convert", 0.0) - convert_before))
+    timer.add("insert", insert_time)
+    inserter.report_failures()
+    progress.report(final=True)
+    return checkpoint.rows
+
+
+def _row_hash(row):
+    """Content hash of a row, independent of column order and NULL columns."""
+    items = sorted((col, val) for col, val in row.items() if val is not None)
+    return hashlib.blake2b(repr(items).encode('utf-8'), digest_size=16).hexdigest()
+
+
+def _same_value(stored, value):
+    """
+    True if a value read back from the database is the one an incoming
+    value was stored as. Numbers in TEXT columns (all the columns added by
+    a dynamic load) come back as SQLite's text for them, with 15
+    significant digits, and numeric text in numeric columns as numbers.
+    """
+    if stored == value:
+        return True
+    number = (int, float)
+    try:
+        if isinstance(stored, str) and isinstance(value, number):
+            return float(stored) == float(f"{value:.15g}")
+        if isinstance(value, str) and isinstance(stored, number):
+            return float(value) == stored
+    except ValueError:
+        pass
+    return False
+
+
+class IncrementalImporter:
+    """
+    Applies incoming rows to an already loaded database keyed on mRID.
+
+    A content hash of every row written is kept in the _row_hash table, so
+    unchanged objects cost one indexed lookup. Rows not seen before are
+    inserted through a BulkInserter, changed rows are updated in place, and
+    finish() deletes the rows of the imported tables that were not seen.
+
+    Attributes:
+        summary (dict): Table name -> {'inserted', 'updated', 'deleted',
+            'unchanged'} counts.
+    """
+
+    ACTIONS = ('inserted', 'updated', 'deleted', 'unchanged')
+
+    def __init__(self, conn, batch_size=DEFAULT_BATCH_SIZE,
+                 transaction_size=DEFAULT_TRANSACTION_SIZE):
+        self.conn = conn
+        self.cursor = conn.cursor()
+        self.inserter = BulkInserter(conn, batch_size, transaction_size)
+        self.summary = {}
+        self.cursor.execute(
+            'CREATE TABLE IF NOT EXISTS "_row_hash" ('
+            '"tbl" TEXT NOT NULL, "mRID" TEXT NOT NULL, "hash" TEXT NOT NULL, '
+            'PRIMARY KEY ("tbl", "mRID")) WITHOUT ROWID;')
+        self.cursor.execute(
+            'CREATE TEMP TABLE IF NOT EXISTS "_seen" ('
+            '"tbl" TEXT NOT NULL, "mRID" TEXT NOT NULL, '
+            'PRIMARY KEY ("tbl", "mRID")) WITHOUT ROWID;')
+
+    def _count(self, table, action, n=1):
+        counts = self.summary.get(table)
+        if counts is None:
+            counts = self.summary[table] = dict.fromkeys(self.ACTIONS, 0)
+        counts[action] += n
+
+    def _stored_row(self, table, mRID):
+        self.cursor.execute(f'SELECT * FROM "{table}" WHERE "mRID" = ?', (mRID,))
+        values = self.cursor.fetchone()
+        if values is None:
+            return None
+        return dict(zip([d[0] for d in self.cursor.description], values))
+
+    def apply(self, layout, row):
+        """Inserts, updates or skips one incoming row (of a RowLayout) of a full model."""
+        table = layout.table
+        values = layout.as_dict(row)
+        mRID = values.get('mRID')
+        if mRID is None:
+            self.inserter.add(layout, row)
+            self._count(table, 'inserted')
+            return
+        self.cursor.execute('INSERT OR IGNORE INTO temp."_seen" VALUES (?, ?)', (table, mRID))
+
+        new_hash = _row_hash(values)
+        self.cursor.execute('SELECT "hash" FROM "_row_hash" WHERE "tbl" = ? AND "mRID" = ?',
+                            (table, mRID))
+        found = self.cursor.fetchone()
+        if found is not None and found[0] == new_hash:
+            self._count(table, 'unchanged')
+            return
+
+        stored = None if found is not None else self._stored_row(table, mRID)
+        if found is None and stored is None:
+            self.inserter.add(layout, row)
+            self._count(table, 'inserted')
+        elif stored is not None and all(_same_value(stored.get(col), val)
+                                        for col, val in values.items()):
+            # Loaded before hashes were kept: compare against the stored values
+            self._count(table, 'unchanged')
+        else:
+            self.update(table, mRID, values)
+            self._count(table, 'updated')
+        self.cursor.execute('INSERT OR REPLACE INTO "_row_hash" VALUES (?, ?, ?)',
+                            (table, mRID, new_hash))
+
+    def update(self, table, mRID, values):
+        """Overwrites the given columns of an existing row."""
+        columns = [col for col in values if col != 'mRID']
+        if not columns:
+            return
+        self.inserter._ensure_columns(table, columns)
+        assignments = ', '.join([f'"{col}" = ?' for col in columns])
+        self.cursor.execute(f'UPDATE "{table}" SET {assignments} WHERE "mRID" = ?',
+                            tuple(values[col] for col in columns) + (mRID,))
+
+    def delete(self, table, mRID):
+        """Deletes one row and its stored hash."""
+        self.cursor.execute(f'DELETE FROM "{table}" WHERE "mRID" = ?', (mRID,))
+        deleted = self.cursor.rowcount
+        self.cursor.execute('DELETE FROM "_row_hash" WHERE "tbl" = ? AND "mRID" = ?',
+                            (table, mRID))
+        self._count(table, 'deleted', deleted)
+
+    def finish(self, tables=None):
+        """
+        Flushes pending inserts and, for a full model import, deletes the
+        rows of the given tables whose mRID was not in the input.
+        """
+        self.inserter.flush()
+        for table in tables or ():
+            self.cursor.execute(
+                f'DELETE FROM "{table}" WHERE "mRID" IS NOT NULL AND "mRID" NOT IN '
+                f'(SELECT "mRID" FROM temp."_seen" WHERE "tbl" = ?)', (table,))
+            if self.cursor.rowcount > 0:
+                self._count(table, 'deleted', self.cursor.rowcount)
+            self.cursor.execute(
+                'DELETE FROM "_row_hash" WHERE "tbl" = ? AND "mRID" NOT IN '
+                '(SELECT "mRID" FROM temp."_seen" WHERE "tbl" = ?)', (table, table))
+        self.cursor.execute('DELETE FROM temp."_seen"')
+        self.conn.commit()
+
+    def print_summary(self):
+        print("\n=== Incremental import summary ===")
+        for table, counts in self.summary.items():
+            print(f"  {table}: " + ", ".join(f"{counts[a]} {a}" for a in self.ACTIONS))
+        print("=== End of summary ===\n")
+
+
+def import_xml_incrementally(conn, xml_file, tables, plan=None,
+                             batch_size=DEFAULT_BATCH_SIZE,
+                             transaction_size=DEFAULT_TRANSACTION_SIZE, converter=None,
+                             backend="auto", hierarchy=None):
+    """
+    Brings an existing database in line with a full model file, writing
+    only the rows that changed (see IncrementalImporter).
+
+    Returns:
+        summary (dict): Per-table counts of inserted/updated/deleted/unchanged rows.
+    """
+    importer = IncrementalImporter(conn, batch_size, transaction_size)
+    for layout, row in iter_rows_from_xml(xml_file, tables, plan, converter=converter,
+                                          backend=backend, hierarchy=hierarchy):
+        importer.apply(layout, row)
+    importer.finish(tables)
+    importer.print_summary()
+    return importer.summary
+
+
+def _iter_difference_objects(diff_file):
+    """
+    Yields (section, element) for every object description in the
+    forwardDifferences and reverseDifferences parts of a CIM difference model.
+    """
+    with open_model(diff_file) as source:
+        context = ET.iterparse(source, events=("start", "end"))
+        section = None
+        section_depth = None
+        depth = 0
+        for event, elem in context:
+            if event == "start":
+                depth += 1
+                local = elem.tag.split('}')[-1]
+                if section is None and local in ('forwardDifferences', 'reverseDifferences'):
+                    section = local
+                    section_depth = depth
+                continue
+
+            if section is not None:
+                if depth == section_depth + 1:
+                    yield section, elem
+                    elem.clear()
+                elif depth == section_depth:
+                    section = None
+                    elem.clear()
+            depth -= 1
+
+
+def apply_difference_model(conn, diff_file, tables, plan=None, converter=None,
+                           hierarchy=None):
+    """
+    Applies a CIM difference model (IEC 61970-552) to the database.
+
+    Objects only in reverseDifferences are deleted, objects only in
+    forwardDifferences are inserted (or updated if already present), and
+    objects in both are updated with their forward values; properties that
+    are only listed in reverseDifferences are cleared. Generic
+    rdf:Description entries are matched to their table by mRID. With a
+    hierarchy, objects of subclasses go to their ancestor's table and the
+    attributes of its classes to its columns (see ClassHierarchy).
+
+    Returns:
+        summary (dict): Per-table counts of inserted/updated/deleted rows.
+    """
+    importer = IncrementalImporter(conn)
+    tag_tables = _TagMap(tables, None if hierarchy is None else hierarchy.routes(tables))
+    attributes = {}
+    if hierarchy is not None:
+        attributes = {table: hierarchy.attribute_columns(table, columns, tag_tables.routes)
+                      for table, columns in tables.items()}
+    forward, reverse = {}, {}
+    for section, elem in _iter_difference_objects(diff_file):
+        mRID = _element_mrid(elem)
+        if mRID is None:
+            continue
+        properties = {child.tag.split('}')[-1]: _child_value(child, converter is not None)
+                      for child in elem}
+        target = forward if section == 'forwardDifferences' else reverse
+        target[mRID] = (tag_tables[elem.tag], properties)
+
+    def to_columns(table, properties):
+        table_attributes = attributes.get(table)
+        if table_attributes:
+            properties = {table_attributes.get(tag, tag): val for tag, val in properties.items()}
+        if plan is None:
+            return properties
+        column_map = plan.column_maps[table]
+        return {column_map[tag]: val for tag, val in properties.items()
+                if column_map[tag] is not None}
+
+    def locate(mRID, table):
+        if table is not None:
+            return table
+        for candidate in tables:
+            importer.cursor.execute(f'SELECT 1 FROM "{candidate}" WHERE "mRID" = ?', (mRID,))
+            if importer.cursor.fetchone() is not None:
+                return candidate
+        return None
+
+    for mRID, (table, _properties) in reverse.items():
+        if mRID not in forward:
+            table = locate(mRID, table)
+            if table is not None:
+                importer.delete(table, mRID)
+
+    for mRID, (table, properties) in forward.items():
+        table = locate(mRID, table if table is not None else reverse.get(mRID, (None,))[0])
+        if table is None:
+            log.warning("Skipping difference for '%s': no table holds this object.", mRID)
+            continue
+        properties = to_columns(table, properties)
+        if converter is not None:
+            layout, row = make_row(table, properties)
+            properties = layout.as_dict(converter.convert_rows(layout, [row])[0])
+        cleared = to_columns(table, reverse.get(mRID, (None, {}))[1]).keys() - properties.keys()
+        changes = dict(properties, **dict.fromkeys(cleared))
+        if importer._stored_row(table, mRID) is None:
+            importer.inserter.add(*make_row(table, {'mRID': mRID, **changes}))
+            importer._count(table, 'inserted')
+        else:
+            importer.update(table, mRID, changes)
+            importer._count(table, 'updated')
+        # The stored hash no longer describes the row
+        importer.cursor.execute('DELETE FROM "_row_hash" WHERE "tbl" = ? AND "mRID" = ?',
+                                (table, mRID))
+
+    importer.finish()
+    importer.print_summary()
+    return importer.summary
+
+
+def make_dump_writer(args, tables, plan=None):
+    """
+    Creates the dump writer selected on the command line.
+
+    Returns:
+        (writer, description) or (None, None) for --dump-format none.
+    """
+    if args.dump_format == "csv":
+        if plan is not None:
+            writer = CsvBundleWriter(args.csv_dir, plan.columns, args.compress, plan.added)
+        else:
+            # Rows keyed on raw child tags are mapped onto the schema columns
+            writer = CsvBundleWriter(args.csv_dir, tables, args.compress,
+                                     column_maps=ColumnPlan(tables).column_maps)
+        return writer, f"CSV files and load.sql have been written to '{args.csv_dir}'"
+    if args.dump_format == "parquet":
+        writer = ParquetBundleWriter(args.parquet_dir, load_schema(args.schema), plan,
+                                     args.compress, args.row_group_size)
+        return writer, f"Parquet files have been written to '{args.parquet_dir}'"
+    if args.dump_format == "sql":
+        path = _compressed_path(args.output_sql, args.compress)
+        writer = SqlDumpWriter(path, args.compress, args.rows_per_insert, args.transaction_size)
+        return writer, f"SQL INSERT statements have been written to '{path}'"
+    return None, None
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Load a CIM RDF/XML network model into SQLite.")
+    parser.add_argument("xml_file", nargs="?",
+                        default="NMMS_Model_CIM_Sep_ML1_1_09122023.xml",
+                        help="Path to your XML file")
+    parser.add_argument("--schema", default="TestProfile.sql",
+                        help="Path to your SQL schema")
+    parser.add_argument("--output-sql", default="output_filled.sql",
+                        help="Path for the generated SQL")
+    parser.add_argument("--dump-format", choices=["sql", "csv", "parquet", "none"],
+                        default="sql",
+                        help="sql: multi-row INSERT dump in --output-sql; csv: one CSV "
+                             "per table plus a psql load.sql in --csv-dir; parquet: one "
+                             "Parquet file per table in --parquet-dir (needs pyarrow); "
+                             "none: no dump")
+    parser.add_argument("--csv-dir", default="output_csv",
+                        help="Directory for --dump-format csv")
+    parser.add_argument("--parquet-dir", default="output_parquet",
+                        help="Directory for --dump-format parquet")
+    parser.add_argument("--row-group-size", type=int, default=DEFAULT_ROW_GROUP_SIZE,
+                        help="Rows per Parquet row group")
+    parser.add_argument("--compress", choices=["gzip", "zstd"],
+                        help="Compress the dump files")
+    parser.add_argument("--rows-per-insert", type=int, default=DEFAULT_ROWS_PER_STATEMENT,
+                        help="Rows per multi-row INSERT statement in the SQL dump")
+    parser.add_argument("--db", default="output.db",
+                        help="SQLite database file to create")
+    parser.add_argument("--stream", action="store_true",
+                        help="Stream rows from the XML into the database "
+                             "instead of extracting the whole model first")
+    parser.add_argument("--pipeline", action="store_true",
+                        help="Write the database and the dump on threads of their own, "
+                             "fed batches of rows through bounded queues, so parsing "
+                             "and writing overlap (implies --stream)")
+    parser.add_argument("--queue-size", type=int, default=DEFAULT_QUEUE_SIZE,
+                        help=f"Batches of {DEFAULT_PIPELINE_BATCH} rows each --pipeline "
+                             "queue holds before the parser waits")
+    parser.add_argument("--owl", metavar="OWL_FILE",
+                        help="OWL profile whose class hierarchy routes objects of classes "
+                             "without a table (e.g. cim:Substation) to the table of their "
+                             "nearest ancestor (EquipmentContainer), and maps inherited "
+                             "attributes (IdentifiedObject.name) onto the table columns")
+    parser.add_argument("--xml-backend", choices=("auto",) + XML_BACKENDS, default="auto",
+                        help="XML parser: lxml (needs the lxml package), expat (builds "
+                             "rows straight from the parser events) or etree; auto "
+                             "picks the first one available in that order")
+    parser.add_argument("--verify-backends", action="store_true",
+                        help="Parse the model with every available XML backend, check "
+                             "that they all produce the same rows, and exit")
+    parser.add_argument("--resume", action="store_true",
+                        help="Load resumably: commit every --transaction-size rows together "
+                             "with a checkpoint of the position in the XML, and when run "
+                             "again after a failure, continue from the last checkpoint "
+                             "instead of starting over (streams with the expat parser on "
+                             "one process; no dump is written)")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                        help="Rows per executemany batch")
+    parser.add_argument("--transaction-size", type=int, default=DEFAULT_TRANSACTION_SIZE,
+                        help="Rows per committed transaction")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Update an existing database in place, writing only the "
+                             "rows whose content changed (keyed on mRID)")
+    parser.add_argument("--apply-diff", metavar="DIFF_XML",
+                        help="Apply a CIM difference model to an existing database "
+                             "instead of loading a full model")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Parse the XML on this many processes (implies --stream)")
+    parser.add_argument("--shard-size", type=int, default=DEFAULT_SHARD_SIZE,
+                        help="Approximate bytes of XML per parallel parse task")
+    parser.add_argument("--column-plan", choices=["dynamic", "schema", "prescan"],
+                        default="dynamic",
+                        help="dynamic: add a TEXT column for every unknown child tag "
+                             "during the load; schema: map child tags onto the schema "
+                             "columns and drop the rest; prescan: like schema, but scan "
+                             "the XML first and add typed columns for the rest up front")
+    parser.add_argument("--fast-load", action="store_true",
+                        help="Load with synchronous=OFF and journal mode "
+                             "--journal-mode instead of the durable defaults")
+    parser.add_argument("--missing-references", choices=["keep", "delete"], default="keep",
+                        help="What to do with rows whose foreign keys point to missing "
+                             "rows once the load is done: keep them (and report "
+                             "them) or delete them")
+    parser.add_argument("--journal-mode", choices=["WAL", "OFF"], default="WAL",
+                        help="Journal mode used by --fast-load (OFF skips failing "
+                             "rows with INSERT OR IGNORE instead of reporting them)")
+    parser.add_argument("--no-indexes", action="store_true",
+                        help="Skip the post-load indexes on the foreign-key columns "
+                             "(and the ANALYZE that follows them)")
+    parser.add_argument("--covering-index", action="append", default=[],
+                        metavar="TABLE(COL,...)",
+                        help="Also create this (covering) index after the load; "
+                             "may be repeated, e.g. \"Terminal(ConductingEquipment,mRID)\"")
+    parser.add_argument("--vacuum", action="store_true",
+                        help="VACUUM the database after indexing")
+    parser.add_argument("--value-types", choices=["schema", "guess"], default="schema",
+                        help="schema: type values from the declared column types "
+                             "(DOUBLE PRECISION -> REAL, CHAR(1) booleans -> '1'/'0', "
+                             "character columns stay text); guess: convert anything "
+                             "that looks like a number")
+    parser.add_argument("--numpy", action="store_true",
+                        help="Convert REAL columns through NumPy arrays")
+    parser.add_argument("-v", "--verbose", action="count", default=0,
+                        help="Log the pipeline steps (-v) or everything, including "
+                             "the schema details (-vv)")
+    parser.add_argument("--progress", action="store_true",
+                        help="Log throughput (objects/s, rows/s per table, bytes read, "
+                             "ETA) while streaming")
+    parser.add_argument("--progress-interval", type=float, default=5.0,
+                        help="Seconds between progress reports")
+    parser.add_argument("--timings-json", metavar="PATH",
+                        help="Write the per-stage timing summary as JSON to PATH "
+                             "('-' for stdout)")
+    return parser.parse_args(argv)
+
+
+def configure_logging(verbose=0, progress=False):
+    """
+    Sets up the fill_sql loggers: warnings only by default, the pipeline
+    steps with -v and debug output with -vv. Progress reports are enabled
+    independently of the verbosity.
+    """
+    level = logging.WARNING if verbose <= 0 else logging.INFO if verbose == 1 else logging.DEBUG
+    logging.basicConfig(format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    log.setLevel(level)
+    progress_log.setLevel(logging.INFO if progress else logging.WARNING)
+
+
+def write_timings(path, summary):
+    """Writes the timing summary as JSON to path, or stdout for '-'."""
+    text = json.dumps(summary, indent=2, sort_keys=True)
+    if path == "-":
+        print(text)
+        return
+    with open(path, "w", encoding="utf-8") as file:
+        file.write(text + "\n")
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    configure_logging(args.verbose, args.progress)
+    timer = StageTimer()
+    progress = None
+    try:
+        covering = [parse_index_spec(spec) for spec in args.covering_index]
+    except ValueError as e:
+        log.error("%s", e)
+        return
+
+    # Define file paths
+    sql_schema_file = args.schema
+    xml_file = args.xml_file
+    db_file = args.db
+
+    # Check if files exist
+    if not os.path.isfile(sql_schema_file):
+        log.error("SQL schema file '%s' not found.", sql_schema_file)
+        return
+    if args.apply_diff:
+        xml_file = args.apply_diff
+    if not os.path.isfile(xml_file):
+        log.error("XML file '%s' not found.", xml_file)
+        return
+    update_in_place = args.incremental or args.apply_diff is not None
+    try:
+        backend = resolve_xml_backend(args.xml_backend)
+    except RuntimeError as e:
+        log.error("%s", e)
+        return
+
+    # 1. Parse the SQL schema to get tables and columns
+    log.info("Parsing SQL schema...")
+    with timer.stage("schema"):
+        tables, create_script = parse_sql_schema(sql_schema_file)
+    for table, columns in tables.items():
+        log.debug("Table: %s, Columns: %s", table, columns)
+
+    hierarchy = None
+    if args.owl:
+        if not os.path.isfile(args.owl):
+            log.error("OWL file '%s' not found.", args.owl)
+            return
+        log.info("Reading the class hierarchy...")
+        try:
+            with timer.stage("owl"):
+                hierarchy = ClassHierarchy.from_owl(args.owl)
+        except RuntimeError as e:
+            log.error("%s", e)
+            return
+        routed = hierarchy.routes(tables)
+        log.info("%d class(es) load into %d table(s).", len(routed), len(set(routed.values())))
+
+    if args.verify_backends:
+        plan = None
+        if args.column_plan != "dynamic":
+            plan = build_column_plan(tables, xml_file if args.column_plan == "prescan" else None,
+                                     hierarchy)
+        converter = None
+        if args.value_types == "schema":
+            converter = ValueConverter(load_schema(sql_schema_file), plan, args.numpy)
+        return 0 if verify_xml_backends(xml_file, tables, plan, converter, hierarchy) else 1
+
+    # 2. Create the SQLite database and execute CREATE TABLE statements
+    log.info("Creating SQLite database and setting up tables...")
+    resuming = args.resume and not update_in_place and ImportCheckpoint.exists(db_file)
+    try:
+        with timer.stage("create"):
+            conn = create_sqlite_db(db_file, create_script,
+                                    keep_existing=update_in_place or resuming)
+    except sqlite3.OperationalError:
+        log.error("Failed to create the SQLite database due to schema errors.")
+        return
+
+    plan = None
+    if args.column_plan != "dynamic":
+        log.info("Planning table columns...")
+        with timer.stage("plan"):
+            plan = build_column_plan(tables, xml_file if args.column_plan == "prescan" else None,
+                                     hierarchy)
+            apply_column_plan(conn, plan)
+
+    schema = load_schema(sql_schema_file)
+
+    converter = None
+    if args.value_types == "schema":
+        converter = ValueConverter(schema, plan, args.numpy)
+
+    dump, dump_description = None, None
+    if args.resume and not update_in_place:
+        if args.dump_format != "none":
+            log.warning("No dump is written by a resumable load.")
+        if args.workers > 1 or args.pipeline or args.xml_backend not in ("auto", "expat"):
+            log.warning("A resumable load parses with expat on a single process.")
+    elif not update_in_place:
+        try:
+            dump, dump_description = make_dump_writer(args, tables, plan)
+        except RuntimeError as e:
+            log.error("%s", e)
+            conn.close()
+            return
+
+    # References are resolved after the load (see check_references), so
+    # rows may refer to rows further down the file or to each other
+    conn.execute("PRAGMA foreign_keys = OFF;")
+    ignore_errors = False
+    if args.fast_load:
+        apply_fast_load_profile(conn, args.journal_mode)
+        ignore_errors = args.journal_mode == "OFF"
+
+    if args.apply_diff:
+        # 3-4. Apply the difference model to the existing database
+        log.info("Applying difference model...")
+        with timer.stage("apply_diff"):
+            apply_difference_model(conn, xml_file, tables, plan, converter, hierarchy)
+    elif args.incremental:
+        # 3-4. Write only what changed since the last import
+        log.info("Importing changes into the SQLite database...")
+        with timer.stage("incremental"):
+            import_xml_incrementally(conn, xml_file, tables, plan,
+                                     args.batch_size, args.transaction_size, converter,
+                                     backend, hierarchy)
+    elif args.resume:
+        # 3-4. Stream rows into the database, continuing from the last checkpoint
+        log.info("Loading data from XML into the SQLite database resumably...")
+        progress = ProgressReporter(os.path.getsize(xml_file), args.progress_interval)
+        try:
+            resume_xml_into_db(conn, xml_file, tables, args.batch_size, args.transaction_size,
+                               ignore_errors, plan, timer, progress, converter, hierarchy)
+        except ValueError as e:
+            log.error("%s", e)
+            conn.close()
+            return
+    elif args.stream or args.workers > 1 or args.pipeline:
+        # 3-5. Stream rows from the XML into the database and the dump
+        log.info("Streaming data from XML into the SQLite database...")
+        progress = ProgressReporter(os.path.getsize(xml_file), args.progress_interval)
+        stream_xml_into_db(conn, xml_file, tables, dump,
+                           args.batch_size, args.transaction_size, ignore_errors,
+                           plan, args.workers, args.shard_size, timer, progress,
+                           converter, args.pipeline, args.queue_size,
+                           backend, hierarchy)
+    else:
+        # 3. Extract data from XML
+        log.info("Extracting data from XML...")
+        with timer.stage("extract"):
+            data = extract_data_from_xml(xml_file, tables, plan, converter, backend,
+                                         hierarchy)
+
+        # 4. Insert data into the database
+        log.info("Inserting data into the SQLite database...")
+        with timer.stage("insert"):
+            insert_data_into_db(conn, data, args.batch_size, args.transaction_size,
+                                ignore_errors)
+
+        # 5. Write the dump
+        if dump is not None:
+            log.info("Writing the dump...")
+            with timer.stage("dump"), dump:
+                for layout, rows in data.items():
+                    for row in rows:
+                        dump.add(layout, row)
+
+    if args.fast_load:
+        with timer.stage("finish"):
+            finish_fast_load(conn)
+
+    with timer.stage("check"):
+        check_references(conn, schema, delete=args.missing_references == "delete")
+    conn.execute("PRAGMA foreign_keys = ON;")
+
+    if not args.no_indexes:
+        log.info("Building indexes...")
+        with timer.stage("index"):
+            build_indexes(conn, schema, covering, args.vacuum)
+
+    if dump_description:
+        log.info("%s.", dump_description)
+    log.info("SQLite database '%s' has been populated with the extracted data.", db_file)
+
+    # 6. Close the database connection
+    conn.close()
+    log.info("Database connection closed.")
+    log.info("Process completed successfully.")
+
+    if args.timings_json:
+        extra = {"xml_file": xml_file, "xml_bytes": os.path.getsize(xml_file),
+                 "workers": args.workers, "xml_backend": backend}
+        if progress is not None:
+            extra.update(progress.summary())
+        write_timings(args.timings_json, timer.summary(**extra))
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
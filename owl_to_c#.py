@@ -1,9 +1,24 @@
 import re
+import os
+import sys
+import glob
+import json
+import time
+import hashlib
+import argparse
+import pathlib
+import xml.etree.ElementTree as ET
+from urllib.parse import urljoin
 from collections import defaultdict, OrderedDict, deque
-from rdflib import Graph, Namespace, RDF, RDFS, OWL
+from concurrent.futures import ProcessPoolExecutor
+from rdflib import Graph, Namespace, RDF, RDFS, OWL, URIRef
 
 OWL_FILE_PATH = "data/TestProfile.owl"  # Update to your OWL file
 CSHARP_OUTPUT_FILE = "GeneratedClasses.cs"
+CACHE_DIR = ".owl_cache"
+
+# Bump whenever parse_owl's output changes, so cached results are rebuilt
+GENERATOR_VERSION = 2
 
 XSD = Namespace("http://www.w3.org/2001/XMLSchema#")
 
@@ -50,13 +65,63 @@ class OwlClassInfo:
         self.data_properties = OrderedDict()
         self.object_properties = OrderedDict()
 
-def parse_owl(owl_path):
-    """Main parsing function: build a dictionary of real named classes."""
+class OwlIndex:
+    """
+    Plain-dict view of the triples the generator needs, built in a single
+    pass over the graph so that the later steps never query the store.
+    """
+    def __init__(self, graph):
+        self.classes = OrderedDict()       # owl:Class nodes, in graph order
+        self.restrictions = set()          # owl:Restriction nodes
+        self.subclass_of = defaultdict(list)
+        self.on_property = {}
+        self.all_values_from = {}
+        self.equivalent_class = {}
+        self.union_members = {}            # node -> flattened owl:unionOf list
+
+        union_of = {}
+        first = {}
+        rest = {}
+        for s, p, o in graph:
+            if p == RDF.type:
+                if o == OWL.Class:
+                    self.classes[s] = None
+                elif o == OWL.Restriction:
+                    self.restrictions.add(s)
+            elif p == RDFS.subClassOf:
+                self.subclass_of[s].append(o)
+            elif p == OWL.onProperty:
+                self.on_property[s] = o
+            elif p == OWL.allValuesFrom:
+                self.all_values_from[s] = o
+            elif p == OWL.equivalentClass:
+                self.equivalent_class[s] = o
+            elif p == OWL.unionOf:
+                union_of[s] = o
+            elif p == RDF.first:
+                first[s] = o
+            elif p == RDF.rest:
+                rest[s] = o
+
+        for node, list_node in union_of.items():
+            self.union_members[node] = list_of_union_members(first, rest, list_node)
+
+def parse_owl(owl_path, quiet=False, imported=None):
+    """
+    Main parsing function: build a dictionary of real named classes.
+    With quiet=True nothing is printed (for use as a library).
+
+    imported holds the classes of the ontologies this one imports (see
+    load_imported_classes). They serve as parents and property types and
+    their properties are not repeated in subclasses, but only the classes
+    of owl_path itself are returned.
+    """
     g = Graph()
     g.parse(owl_path, format="xml")
+    index = OwlIndex(g)
 
     # Step 1: gather all classes
-    all_class_uris = set(g.subjects(RDF.type, OWL.Class))
+    all_class_uris = index.classes
 
     # Step 2: keep only named classes (skip ephemeral)
     classes = {}
@@ -65,57 +130,104 @@ def parse_owl(owl_path):
         if is_named_class_local_name(local_name):
             classes[local_name] = OwlClassInfo(cls_uri, local_name)
 
-    # Step 3: subClassOf adjacency
-    subclass_map = defaultdict(list)
+    # Step 3: subClassOf adjacency, split into restrictions and superclasses
+    superclass_map = {}
+    restriction_map = {}
     for cls_name, info in classes.items():
-        for superclass in g.objects(subject=info.uri, predicate=RDFS.subClassOf):
-            subclass_map[cls_name].append(superclass)
+        supers = index.subclass_of.get(info.uri, ())
+        superclass_map[cls_name] = [n for n in supers if n not in index.restrictions]
+        restriction_map[cls_name] = [n for n in supers if n in index.restrictions]
+
+    # Classes that can be referred to: the imported ones and our own
+    known = OrderedDict(imported or ())
+    known.update(classes)
 
     # Step 4: pick a single parent if possible
-    for cls_name, super_list in subclass_map.items():
+    for cls_name, super_list in superclass_map.items():
         for candidate in super_list:
-            if (candidate, RDF.type, OWL.Restriction) in g:
-                continue
             parent_local = shorten_uri(candidate)
-            if parent_local in classes and parent_local != cls_name:
+            if parent_local in known and parent_local != cls_name:
                 classes[cls_name].parent_name = parent_local
                 break
 
     # Step 5: gather property restrictions
+    resolver = NamedClassResolver(index, known)
     for cls_name, cls_info in classes.items():
-        for superclass_node in g.objects(subject=cls_info.uri, predicate=RDFS.subClassOf):
-            if (superclass_node, RDF.type, OWL.Restriction) not in g:
-                continue
-            prop = g.value(superclass_node, OWL.onProperty)
-            all_values = g.value(superclass_node, OWL.allValuesFrom)
+        for superclass_node in restriction_map[cls_name]:
+            prop = index.on_property.get(superclass_node)
+            all_values = index.all_values_from.get(superclass_node)
             if prop and all_values:
                 prop_name = make_csharp_identifier(shorten_uri(prop))
-                csharp_type = guess_csharp_type(g, all_values, classes)
+                csharp_type = guess_csharp_type(index, all_values, known, resolver)
                 # Decide data vs object property
                 if csharp_type in ["string","bool","int","float","double","object"]:
                     cls_info.data_properties.setdefault(prop_name, csharp_type)
                 else:
                     cls_info.object_properties.setdefault(prop_name, csharp_type)
 
-    # Step 6: push up inherited properties
-    stabilized = False
-    while not stabilized:
-        stabilized = True
-        for cls_info in classes.values():
-            if cls_info.parent_name and cls_info.parent_name in classes:
-                parent = classes[cls_info.parent_name]
-                for p in list(cls_info.data_properties.keys()):
-                    if p in parent.data_properties:
-                        del cls_info.data_properties[p]
-                        stabilized = False
-                for p in list(cls_info.object_properties.keys()):
-                    if p in parent.object_properties:
-                        del cls_info.object_properties[p]
-                        stabilized = False
+    if not quiet:
+        print(f"[INFO] Type resolution cache: {resolver.hits} hits, {resolver.misses} misses")
+
+    # Step 6: push up inherited properties, parents first, carrying the
+    # properties already declared further up the tree (imported classes
+    # are only read)
+    order, _depth = inheritance_levels(known)
+    inherited_data = {}
+    inherited_object = {}
+    for cls_name in order:
+        cls_info = known[cls_name]
+        parent_name = cls_info.parent_name
+        if parent_name in inherited_data:
+            above_data = inherited_data[parent_name]
+            above_object = inherited_object[parent_name]
+            if cls_name in classes:
+                for p in [p for p in cls_info.data_properties if p in above_data]:
+                    del cls_info.data_properties[p]
+                for p in [p for p in cls_info.object_properties if p in above_object]:
+                    del cls_info.object_properties[p]
+        else:
+            above_data = above_object = frozenset()
+        inherited_data[cls_name] = (above_data | cls_info.data_properties.keys()
+                                    if cls_info.data_properties else above_data)
+        inherited_object[cls_name] = (above_object | cls_info.object_properties.keys()
+                                      if cls_info.object_properties else above_object)
 
     return classes, g
 
-def guess_csharp_type(g, restriction_target, classes):
+def inheritance_levels(classes):
+    """
+    Walk the parent forest once, breadth-first from the root classes.
+
+    Returns:
+        order (list): Class names with every class after its parent.
+        depth (dict): Class name -> number of ancestors within 'classes'.
+    Classes caught in a parent cycle are entered at the first one met.
+    """
+    children = defaultdict(list)
+    roots = []
+    for cls_name, info in classes.items():
+        if info.parent_name in classes and info.parent_name != cls_name:
+            children[info.parent_name].append(cls_name)
+        else:
+            roots.append(cls_name)
+
+    order = []
+    depth = {}
+    for start in roots + list(classes):
+        if start in depth:
+            continue
+        depth[start] = 0
+        queue = deque([start])
+        while queue:
+            current = queue.popleft()
+            order.append(current)
+            for child in children[current]:
+                if child not in depth:
+                    depth[child] = depth[current] + 1
+                    queue.append(child)
+    return order, depth
+
+def guess_csharp_type(index, restriction_target, classes, resolver=None):
     """
     Determine the C# type for 'restriction_target':
       1) If direct match in XSD_TO_CSHARP => returns e.g. 'string', 'bool'.
@@ -129,7 +241,7 @@ def guess_csharp_type(g, restriction_target, classes):
         return XSD_TO_CSHARP[str(restriction_target)]
 
     # Step B: owl:equivalentClass => XSD
-    eq_class = g.value(restriction_target, OWL.equivalentClass)
+    eq_class = index.equivalent_class.get(restriction_target)
     if eq_class and str(eq_class) in XSD_TO_CSHARP:
         return XSD_TO_CSHARP[str(eq_class)]
 
@@ -139,107 +251,567 @@ def guess_csharp_type(g, restriction_target, classes):
         return local_name
 
     # Step D: BFS or DFS to find a named class
-    found = find_named_class(restriction_target, g, classes)
+    found = find_named_class(restriction_target, index, classes, resolver)
     if found is not None:
         return found
 
     # Step E: fallback to 'object'
     return "object"
 
-def find_named_class(start_node, graph, classes):
+def find_named_class(start_node, index, classes, resolver=None):
     """
     Attempt BFS up 'rdfs:subClassOf' and 'owl:unionOf' to see if
     we can find exactly ONE recognized named class among the ancestors.
     If none or more than one => return None.
     """
-    visited = set()
-    queue = deque([start_node])
-    found_named = set()
-
-    while queue:
-        current = queue.popleft()
-        if current in visited:
-            continue
-        visited.add(current)
-
-        # If the local name is recognized, record it
-        loc_name = shorten_uri(current)
-        if loc_name in classes:
-            found_named.add(loc_name)
-
-        # subClassOf edges
-        for sup in graph.objects(current, RDFS.subClassOf):
-            queue.append(sup)
-
-        # unionOf => e.g. <owl:unionOf rdf:nodeID="x123"/>
-        union_node = graph.value(current, OWL.unionOf)
-        if union_node:
-            # union_node is typically an rdf:List => BFS all items in the list
-            items = list_of_union_members(graph, union_node)
-            for i in items:
-                queue.append(i)
+    if resolver is None:
+        resolver = NamedClassResolver(index, classes)
+    found_named = resolver.named_ancestors(start_node)
 
     # If exactly 1 unique named class is found, use it
     if len(found_named) == 1:
-        return found_named.pop()
+        return next(iter(found_named))
     else:
         return None
 
-def list_of_union_members(graph, list_node):
+class NamedClassResolver:
     """
-    Recursively gather rdf:first/rdf:rest items from an RDF list (for unionOf).
+    Memoizing walk up 'rdfs:subClassOf' and 'owl:unionOf'.
+
+    The set of recognized named classes reachable from a node is cached per
+    node, so ancestor chains shared by many restriction targets are walked
+    once per run. Nodes on a subClassOf cycle are only cached once the walk
+    that entered the cycle has completed.
+    """
+    def __init__(self, index, classes):
+        self.index = index
+        self.classes = classes
+        self.hits = 0
+        self.misses = 0
+        self._ancestors = {}
+
+    def named_ancestors(self, start_node):
+        """Returns the frozenset of named class local names reachable from start_node."""
+        found, _complete = self._walk(start_node, set())
+        self._ancestors[start_node] = found
+        return found
+
+    def _walk(self, node, in_progress):
+        cached = self._ancestors.get(node)
+        if cached is not None:
+            self.hits += 1
+            return cached, True
+        if node in in_progress:
+            # Back edge of a cycle: the node on the stack adds its own names
+            return frozenset(), False
+        self.misses += 1
+
+        in_progress.add(node)
+        found = set()
+        complete = True
+        loc_name = shorten_uri(node)
+        if loc_name in self.classes:
+            found.add(loc_name)
+        for successor in self.index.subclass_of.get(node, ()):
+            names, ok = self._walk(successor, in_progress)
+            found |= names
+            complete = complete and ok
+        for successor in self.index.union_members.get(node, ()):
+            names, ok = self._walk(successor, in_progress)
+            found |= names
+            complete = complete and ok
+        in_progress.discard(node)
+
+        found = frozenset(found)
+        if complete:
+            self._ancestors[node] = found
+        return found, complete
+
+def list_of_union_members(first, rest, list_node):
+    """
+    Gather rdf:first/rdf:rest items from an RDF list (for unionOf), given
+    the rdf:first and rdf:rest maps of the graph.
     Returns a list of items in the union.
     """
     items = []
     current = list_node
     while current and current != RDF.nil:
-        first = graph.value(current, RDF.first)
-        rest = graph.value(current, RDF.rest)
-        if first:
-            items.append(first)
-        current = rest
+        item = first.get(current)
+        if item:
+            items.append(item)
+        current = rest.get(current)
     return items
 
-def generate_csharp_code(classes):
-    """Generate final C# code from the class dictionary."""
-    # Sort by inheritance depth
-    def depth(c):
-        d = 0
-        parent = classes[c].parent_name
-        while parent in classes:
-            d += 1
-            parent = classes[parent].parent_name
-        return d
+CSHARP_HEADER = "// Auto-generated from OWL (with BFS resolution) using rdflib in Python"
+CSHARP_NAMESPACE = "CIMProfile"
+MANIFEST_FILE = ".codegen-manifest.json"
 
-    sorted_classes = sorted(classes.keys(), key=depth)
+def sorted_class_names(classes):
+    """Class names by inheritance depth, then name, so output is reproducible."""
+    _order, depth = inheritance_levels(classes)
+    return sorted(classes.keys(), key=lambda name: (depth[name], name))
 
+def class_lines(cls_name, classes, imported=()):
+    """
+    The C# declaration of one class, as indented lines. The parent may be
+    one of the classes or one of the imported class names.
+    """
+    info = classes[cls_name]
+    parent_decl = ""
+    if info.parent_name and (info.parent_name in classes or info.parent_name in imported):
+        parent_decl = f" : {info.parent_name}"
+
+    lines = [f"    public class {cls_name}{parent_decl}", "    {"]
+    for prop_name, prop_type in sorted(info.data_properties.items()):
+        lines.append(f"        public {prop_type} {prop_name} {{ get; set; }}")
+    for prop_name, prop_type in sorted(info.object_properties.items()):
+        lines.append(f"        public {prop_type} {prop_name} {{ get; set; }}")
+    lines.append("    }\n")
+    return lines
+
+def wrap_namespace(body_lines):
+    return "\n".join([CSHARP_HEADER, f"namespace {CSHARP_NAMESPACE}\n{{"] + body_lines + ["}"])
+
+def generate_csharp_code(classes, imported=()):
+    """
+    Generate final C# code from the class dictionary. imported names the
+    classes of imported ontologies, generated elsewhere.
+    """
     lines = []
-    lines.append("// Auto-generated from OWL (with BFS resolution) using rdflib in Python")
-    lines.append("namespace CIMProfile\n{")
-
-    for cls_name in sorted_classes:
-        info = classes[cls_name]
-        parent_decl = ""
-        if info.parent_name and info.parent_name in classes:
-            parent_decl = f" : {info.parent_name}"
-
-        lines.append(f"    public class {cls_name}{parent_decl}")
-        lines.append("    {")
-        for prop_name, prop_type in info.data_properties.items():
-            lines.append(f"        public {prop_type} {prop_name} {{ get; set; }}")
-        for prop_name, prop_type in info.object_properties.items():
-            lines.append(f"        public {prop_type} {prop_name} {{ get; set; }}")
-        lines.append("    }\n")
-
-    lines.append("}")
-    return "\n".join(lines)
-
-def main():
-    classes, graph = parse_owl(OWL_FILE_PATH)
+    for cls_name in sorted_class_names(classes):
+        lines.extend(class_lines(cls_name, classes, imported))
+    return wrap_namespace(lines)
+
+def namespace_partition(uri):
+    """File stem for the namespace of a class URI, e.g. 'CIM-schema-cim16'."""
+    namespace = str(uri).rsplit("#", 1)[0] if "#" in str(uri) else str(uri).rsplit("/", 1)[0]
+    stem = re.sub(r"[^\w.-]+", "_", namespace.rstrip("/").rsplit("/", 1)[-1])
+    return stem or "default"
+
+def generate_csharp_files(classes, partition="class", imported=()):
+    """
+    Generate the C# code split over several files: one per class, or one
+    per namespace of the class URIs (partition="namespace"). imported is
+    as for generate_csharp_code().
+
+    Returns:
+        files (dict): File name -> C# source, in file name order.
+    """
+    groups = defaultdict(list)
+    for cls_name in sorted_class_names(classes):
+        if partition == "namespace":
+            key = namespace_partition(classes[cls_name].uri)
+        else:
+            key = cls_name
+        groups[key].extend(class_lines(cls_name, classes, imported))
+    return {f"{key}.cs": wrap_namespace(lines) + "\n" for key, lines in sorted(groups.items())}
+
+def _content_hash(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+def _file_hash(path):
+    try:
+        with open(path, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except OSError:
+        return None
+
+def _write_atomic(path, text):
+    tmp_file = path + ".tmp"
+    with open(tmp_file, "w", encoding="utf-8", newline="\n") as f:
+        f.write(text)
+    os.replace(tmp_file, path)
+
+def write_if_changed(path, text):
+    """Writes text to path unless the file already holds exactly that. Returns True if written."""
+    if _file_hash(path) == _content_hash(text):
+        return False
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    _write_atomic(path, text)
+    return True
+
+def write_incremental(files, output_dir):
+    """
+    Brings output_dir in line with the generated files, touching only
+    what changed.
+
+    Each file's content hash is kept in a manifest next to the files. A
+    file is rewritten only if its hash differs from the manifest (or the
+    file on disk was changed or removed), and files listed in the previous
+    manifest that are no longer generated, i.e. deleted classes, are
+    removed. Files the manifest never listed are left alone.
+
+    Returns:
+        (written, unchanged, deleted): lists of file names.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    manifest_path = os.path.join(output_dir, MANIFEST_FILE)
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            previous = json.load(f).get("files", {})
+    except (OSError, ValueError):
+        previous = {}
+
+    written, unchanged, deleted = [], [], []
+    hashes = {}
+    for name, text in files.items():
+        path = os.path.join(output_dir, name)
+        digest = hashes[name] = _content_hash(text)
+        if previous.get(name) == digest and _file_hash(path) == digest:
+            unchanged.append(name)
+            continue
+        _write_atomic(path, text)
+        written.append(name)
+
+    for name in sorted(previous.keys() - files.keys()):
+        try:
+            os.remove(os.path.join(output_dir, name))
+        except FileNotFoundError:
+            pass
+        deleted.append(name)
+
+    payload = {"version": GENERATOR_VERSION, "files": hashes}
+    _write_atomic(manifest_path, json.dumps(payload, indent=1, sort_keys=True) + "\n")
+    return written, unchanged, deleted
+
+def _cache_file(owl_path, cache_dir, digest):
+    stem = os.path.splitext(os.path.basename(owl_path))[0]
+    return os.path.join(cache_dir, f"{stem}-{digest[:16]}.json")
+
+def _class_entries(classes):
+    return [
+        [info.name, str(info.uri), info.parent_name,
+         list(info.data_properties.items()), list(info.object_properties.items())]
+        for info in classes.values()
+    ]
+
+def save_class_cache(classes, cache_file, digest):
+    """Writes the parsed classes as plain JSON (atomically)."""
+    entries = _class_entries(classes)
+    payload = {"version": GENERATOR_VERSION, "sha256": digest, "classes": entries}
+    os.makedirs(os.path.dirname(cache_file) or ".", exist_ok=True)
+    tmp_file = cache_file + ".tmp"
+    with open(tmp_file, "w", encoding="utf-8") as f:
+        json.dump(payload, f, separators=(",", ":"))
+    os.replace(tmp_file, cache_file)
+
+def load_class_cache(cache_file, digest):
+    """Returns the cached classes, or None if the entry is missing or stale."""
+    try:
+        with open(cache_file, "r", encoding="utf-8") as f:
+            payload = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if payload.get("version") != GENERATOR_VERSION or payload.get("sha256") != digest:
+        return None
+    classes = {}
+    for name, uri, parent_name, data_props, object_props in payload["classes"]:
+        info = OwlClassInfo(URIRef(uri), name)
+        info.parent_name = parent_name
+        info.data_properties.update(data_props)
+        info.object_properties.update(object_props)
+        classes[name] = info
+    return classes
+
+def _file_digest(path):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+def load_owl_classes(owl_path, cache_dir=CACHE_DIR, stats=None, quiet=False, imported=None):
+    """
+    parse_owl() with an on-disk cache keyed on the OWL file's SHA-256 and
+    GENERATOR_VERSION. Unchanged profiles skip the RDF/XML parse entirely;
+    a changed file or generator gets a fresh parse and a new cache entry.
+    A cache entry made for an identical file under another name is reused.
+    Pass cache_dir=None to always parse.
+
+    imported is passed on to parse_owl(); the classes it holds are part of
+    the cache key, as they change the result.
+
+    If stats is a dict, stats["cached"] tells whether the cache was used.
+    With quiet=True nothing is printed.
+    """
+    stats = {} if stats is None else stats
+    stats["cached"] = False
+    if cache_dir is None:
+        classes, _graph = parse_owl(owl_path, quiet, imported)
+        return classes
+
+    digest = _file_digest(owl_path)
+    if imported:
+        context = json.dumps(_class_entries(imported), separators=(",", ":"))
+        digest = _content_hash(digest + context)
+    cache_file = _cache_file(owl_path, cache_dir, digest)
+    candidates = [cache_file] + sorted(
+        set(glob.glob(os.path.join(glob.escape(cache_dir), f"*-{digest[:16]}.json"))) - {cache_file})
+    for candidate in candidates:
+        classes = load_class_cache(candidate, digest)
+        if classes is not None:
+            if not quiet:
+                print(f"[INFO] Loaded parsed ontology from cache:", candidate)
+            stats["cached"] = True
+            return classes
+
+    classes, _graph = parse_owl(owl_path, quiet, imported)
+    save_class_cache(classes, cache_file, digest)
+    if not quiet:
+        print(f"[INFO] Cached parsed ontology in:", cache_file)
+    return classes
+
+def load_imported_classes(owl_path, imports, cache_dir=CACHE_DIR):
+    """
+    Classes of the ontologies owl_path imports, directly or through their
+    own imports. imports maps each profile to the profiles it imports (see
+    generate_batch). Every imported ontology is resolved in the context of
+    its own imports and goes through load_owl_classes(), so with a cache a
+    base ontology shared by several profiles is parsed once.
+
+    Returns:
+        imported (OrderedDict): Class name -> OwlClassInfo.
+    """
+    imported = OrderedDict()
+    for base in imports.get(owl_path, ()):
+        base_imported = load_imported_classes(base, imports, cache_dir)
+        imported.update(base_imported)
+        imported.update(load_owl_classes(base, cache_dir, quiet=True, imported=base_imported))
+    return imported
+
+def generate_profile(owl_path, output, cache_dir=CACHE_DIR, split=False, partition="class",
+                     imports=None):
+    """
+    Generates the C# for one profile into output (a .cs file, or a
+    directory with split=True) and returns its timings and counts.
+    Classes of the profiles it imports (imports, see generate_batch) are
+    used but not generated. Runs in the batch worker processes.
+    """
+    stats = {"profile": owl_path, "output": output}
+    start = time.perf_counter()
+    imported = load_imported_classes(owl_path, imports or {}, cache_dir)
+    classes = load_owl_classes(owl_path, cache_dir, stats, imported=imported)
+    loaded = time.perf_counter()
+    if split:
+        files = generate_csharp_files(classes, partition, imported)
+        generated = time.perf_counter()
+        written, unchanged, deleted = write_incremental(files, output)
+    else:
+        files = {output: generate_csharp_code(classes, imported)}
+        generated = time.perf_counter()
+        written = [output] if write_if_changed(output, files[output]) else []
+        unchanged, deleted = [name for name in files if name not in written], []
+    finished = time.perf_counter()
+    stats.update(classes=len(classes), written=len(written), unchanged=len(unchanged),
+                 deleted=len(deleted), load_seconds=round(loaded - start, 4),
+                 generate_seconds=round(generated - loaded, 4),
+                 write_seconds=round(finished - generated, 4),
+                 total_seconds=round(finished - start, 4))
+    return stats
+
+def find_profiles(paths):
+    """Expands directories to the .owl files they contain (sorted); files are kept."""
+    profiles = []
+    for path in paths:
+        if os.path.isdir(path):
+            profiles.extend(sorted(glob.glob(os.path.join(glob.escape(path), "*.owl"))))
+        else:
+            profiles.append(path)
+    return profiles
+
+def _normalize_iri(iri):
+    return iri.rstrip("#")
+
+def read_ontology_header(owl_path):
+    """
+    Returns (ontology IRI, [imported IRIs]) of an OWL file from a plain XML
+    parse, without building the RDF graph. Relative IRIs are resolved
+    against xml:base, or else the file's own URI. The IRI is None if the
+    file declares no owl:Ontology.
+    """
+    rdf, owl = str(RDF), str(OWL)
+    root = ET.parse(owl_path).getroot()
+    base = (root.get("{http://www.w3.org/XML/1998/namespace}base")
+            or pathlib.Path(os.path.abspath(owl_path)).as_uri())
+    for elem in root:
+        if elem.tag != f"{{{owl}}}Ontology" and not any(
+                child.tag == f"{{{rdf}}}type" and child.get(f"{{{rdf}}}resource") == f"{owl}Ontology"
+                for child in elem):
+            continue
+        iri = _normalize_iri(urljoin(base, elem.get(f"{{{rdf}}}about", "")))
+        imports = [_normalize_iri(urljoin(base, child.get(f"{{{rdf}}}resource", "")))
+                   for child in elem if child.tag == f"{{{owl}}}imports"]
+        return iri, imports
+    return None, []
+
+def resolve_imports(profiles):
+    """
+    Matches the owl:imports of every profile to the other profiles by
+    ontology IRI. Imports of ontologies outside the batch are ignored.
+
+    Returns:
+        imports (dict): Profile path -> paths of the profiles it imports.
+    """
+    headers = {path: read_ontology_header(path) for path in profiles}
+    by_iri = defaultdict(list)
+    for path, (iri, _imports) in headers.items():
+        if iri is not None:
+            by_iri[iri].append(path)
+    imports = {}
+    for path, (_iri, imported_iris) in headers.items():
+        imports[path] = []
+        for iri in imported_iris:
+            matches = [match for match in by_iri.get(iri, ()) if match != path]
+            if len(matches) > 1:
+                raise ValueError(f"{path} imports {iri}, which several profiles declare: "
+                                 f"{', '.join(matches)}")
+            imports[path].extend(matches)
+    return imports
+
+def import_levels(imports):
+    """
+    Returns {profile: level}: 0 for profiles importing no other profile,
+    otherwise one more than the highest level among their imports.
+    """
+    levels = {}
+    def level(path, stack):
+        if path not in levels:
+            if path in stack:
+                raise ValueError("Profiles import each other: " + " -> ".join(stack + [path]))
+            levels[path] = 1 + max((level(base, stack + [path]) for base in imports[path]),
+                                   default=-1)
+        return levels[path]
+    for path in imports:
+        level(path, [])
+    return levels
+
+def generate_batch(profiles, output_dir, cache_dir=CACHE_DIR, split=False,
+                   partition="class", jobs=None):
+    """
+    Generates the C# for several profiles on a process pool, each into
+    output_dir/<profile name>.cs (or output_dir/<profile name>/ with split).
+
+    A profile that imports another one of the batch (owl:imports of its
+    ontology IRI) is resolved against the classes of that base ontology,
+    and generated after it, so that the base is parsed once and then read
+    from the cache by every profile importing it. Profiles with identical
+    content are parsed once too: the first copy goes to the pool, the
+    others follow once its parse is in the cache. With cache_dir=None
+    every profile parses what it needs itself.
+
+    Returns:
+        results (list): generate_profile() stats per profile, in input order.
+    """
+    stems = [os.path.splitext(os.path.basename(path))[0] for path in profiles]
+    duplicates = {stem for stem in stems if stems.count(stem) > 1}
+    if duplicates:
+        raise ValueError(f"Profiles with the same name would share an output: "
+                         f"{', '.join(sorted(duplicates))}")
+    imports = resolve_imports(profiles)
+    levels = import_levels(imports)
+    outputs = [os.path.join(output_dir, stem if split else stem + ".cs") for stem in stems]
+    os.makedirs(output_dir, exist_ok=True)
+
+    # Each level goes in two waves: unique profiles, then copies of them
+    waves = [[] for _ in range(2 * (max(levels.values()) + 1))]
+    seen = set()
+    for i, path in enumerate(profiles):
+        digest = _file_digest(path) if cache_dir is not None else None
+        if digest is not None and digest in seen:
+            waves[2 * levels[path] + 1].append(i)
+        else:
+            seen.add(digest)
+            waves[2 * levels[path]].append(i)
+
+    results = [None] * len(profiles)
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        for wave in waves:
+            futures = {i: executor.submit(generate_profile, profiles[i], outputs[i],
+                                          cache_dir, split, partition, imports) for i in wave}
+            for i, future in futures.items():
+                results[i] = future.result()
+    return results
+
+def print_batch_report(results, wall_seconds):
+    """Prints the combined per-profile timing report."""
+    print("\n=== Code generation report ===")
+    print(f"{'profile':<40} {'classes':>7} {'load':>8} {'gen':>8} {'write':>8} "
+          f"{'files':>12}")
+    for stats in results:
+        source = " (cache)" if stats["cached"] else ""
+        files = f"{stats['written']}w/{stats['unchanged']}u/{stats['deleted']}d"
+        print(f"{os.path.basename(stats['profile']) + source:<40} {stats['classes']:>7} "
+              f"{stats['load_seconds']:>8.3f} {stats['generate_seconds']:>8.3f} "
+              f"{stats['write_seconds']:>8.3f} {files:>12}")
+    busy = sum(stats["total_seconds"] for stats in results)
+    print(f"{len(results)} profile(s) in {wall_seconds:.2f}s wall, {busy:.2f}s of work")
+    print("=== End of report ===\n")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Generate C# classes from CIM OWL profiles.")
+    parser.add_argument("owl_files", nargs="*", default=[OWL_FILE_PATH],
+                        help="OWL profiles, or directories of .owl files, to generate from")
+    parser.add_argument("-o", "--output", default=CSHARP_OUTPUT_FILE,
+                        help="C# file to write (single profile)")
+    parser.add_argument("--output-dir",
+                        help="Generate every profile into this directory, as "
+                             "<profile>.cs; implied when several profiles are given")
+    parser.add_argument("-j", "--jobs", type=int,
+                        help="Worker processes for several profiles (default: CPU count)")
+    parser.add_argument("--report-json",
+                        help="Also write the batch timing report as JSON to this file")
+    parser.add_argument("--cache-dir", default=CACHE_DIR,
+                        help="Directory of the parsed-ontology cache")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Always re-parse the OWL file")
+    parser.add_argument("--split-dir",
+                        help="Write one file per class (or per namespace) into this "
+                             "directory, rewriting only the files that changed; with "
+                             "several profiles, into one <profile>/ subdirectory of it "
+                             "per profile")
+    parser.add_argument("--partition", choices=["class", "namespace"], default="class",
+                        help="How --split-dir groups the classes into files")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    cache_dir = None if args.no_cache else args.cache_dir
+    profiles = find_profiles(args.owl_files)
+    if not profiles:
+        print("[ERROR] No OWL profiles found in:", ", ".join(args.owl_files))
+        return 1
+
+    if len(profiles) > 1 or args.output_dir:
+        if args.split_dir and args.output_dir and args.split_dir != args.output_dir:
+            print("[ERROR] Give one output directory for several profiles: --output-dir "
+                  "for <profile>.cs files, or --split-dir for <profile>/ directories")
+            return 1
+        start = time.perf_counter()
+        try:
+            results = generate_batch(profiles, args.split_dir or args.output_dir or "generated",
+                                     cache_dir, bool(args.split_dir), args.partition, args.jobs)
+        except ValueError as e:
+            print("[ERROR]", e)
+            return 1
+        wall_seconds = time.perf_counter() - start
+        print_batch_report(results, wall_seconds)
+        if args.report_json:
+            with open(args.report_json, "w", encoding="utf-8") as f:
+                json.dump({"wall_seconds": round(wall_seconds, 4), "profiles": results},
+                          f, indent=2)
+        return 0
+
+    classes = load_owl_classes(profiles[0], cache_dir)
+    if args.split_dir:
+        files = generate_csharp_files(classes, args.partition)
+        written, unchanged, deleted = write_incremental(files, args.split_dir)
+        print(f"[INFO] C# files in {args.split_dir}: {len(written)} written, "
+              f"{len(unchanged)} unchanged, {len(deleted)} deleted")
+        return 0
+
     csharp_code = generate_csharp_code(classes)
-    with open(CSHARP_OUTPUT_FILE, "w", encoding="utf-8") as f:
-        f.write(csharp_code)
-    print(f"[INFO] Wrote C# classes to:", CSHARP_OUTPUT_FILE)
+    if write_if_changed(args.output, csharp_code):
+        print(f"[INFO] Wrote C# classes to:", args.output)
+    else:
+        print(f"[INFO] C# classes in {args.output} are up to date")
+    return 0
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
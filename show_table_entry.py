@@ -1,4 +1,13 @@
-import re
+import os
+import sys
+import sqlite3
+import argparse
+from pathlib import Path
+
+from cim_schema import load_schema
+
+DEFAULT_DB_FILE = "output.db"
+DEFAULT_SCHEMA_FILE = "TestProfile.sql"
 
 def parse_sql_schema(schema_file):
     """
@@ -10,41 +19,14 @@ def parse_sql_schema(schema_file):
     Returns:
         dict: A dictionary mapping table names to a list of their column names.
     """
-    # Read the entire content of the SQL schema file
-    with open(schema_file, 'r', encoding='utf-8') as file:
-        content = file.read()
-
-    # Remove all SQL single-line comments starting with '--'
-    content_no_comments = re.sub(r'--.*', '', content)
-
-    # Regex pattern to match CREATE TABLE statements
-    # It captures the table name and the columns definition block
-    create_table_pattern = re.compile(
-        r'CREATE\s+TABLE\s+"([^"]+)"\s*\((.*?)\);',
-        re.IGNORECASE | re.DOTALL
-    )
-
-    # Find all CREATE TABLE statements
-    matches = create_table_pattern.findall(content_no_comments)
-
-    tables = {}
-
-    for match in matches:
-        table_name = match[0]
-        columns_block = match[1]
-
-        # Use re.findall to extract all column names
-        # Each column starts with "column_name" optionally followed by spaces, then data type
-        # This pattern captures the column name regardless of spacing
-        columns = re.findall(r'"([^"]+)"\s*[^,]+,?', columns_block)
+    tables = load_schema(schema_file).column_map()
 
+    for table_name, columns in tables.items():
         # Debug: Print columns found for each table
         print(f"Table '{table_name}' has {len(columns)} columns.")
         for col in columns:
             print(f"  - Column: {col}")
 
-        tables[table_name] = columns
-
     return tables
 
 def print_tables_and_columns(tables):
@@ -66,23 +48,316 @@ def print_tables_and_columns(tables):
             print(f"  - {column}")
     print("\n=== End of Tables ===\n")
 
-def main():
-    schema_file = "TestProfile.sql"  # Path to your SQL schema file
+class ModelDatabase:
+    """
+    Read-only view of a database loaded by fill_sql.py.
+
+    The connection is opened on first use, read-only, and every query is a
+    parameterized statement with fixed SQL text per table, so SQLite's
+    statement cache prepares it once. Rows are streamed from cursors and
+    tables are paged by rowid (keyset pagination), so no query ever loads a
+    whole table into memory.
+
+    Args:
+        db_file (str): Path to the SQLite database.
+        schema_file (str, optional): SQL schema, for the reference columns
+            (the foreign keys, inline or ALTER TABLE).
+    """
+
+    def __init__(self, db_file, schema_file=None):
+        self.db_file = db_file
+        self.schema_file = schema_file
+        self._conn = None
+        self._tables = None
+        self._references = None
+        self._table_of = {}  # mRID -> table it was found in
+
+    @property
+    def conn(self):
+        if self._conn is None:
+            uri = Path(self.db_file).resolve().as_uri() + "?mode=ro"
+            self._conn = sqlite3.connect(uri, uri=True, cached_statements=256)
+        return self._conn
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def tables(self):
+        """Dictionary mapping the data tables to their column names."""
+        if self._tables is None:
+            self._tables = {}
+            names = [name for (name,) in self.conn.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table' "
+                "AND name NOT LIKE 'sqlite_%' AND name NOT LIKE '\\_%' ESCAPE '\\' "
+                "ORDER BY name")]
+            for name in names:
+                columns = [row[1] for row in self.conn.execute(f'PRAGMA table_info("{name}")')]
+                if "mRID" in columns:
+                    self._tables[name] = columns
+        return self._tables
+
+    def references(self):
+        """
+        Dictionary mapping each table to its reference columns, as
+        {column: referenced table}. Columns named after the qualified child
+        tag (e.g. "ACLineSegment.BaseVoltage") count as the schema column.
+        """
+        if self._references is None:
+            self._references = {table: {} for table in self.tables()}
+            if self.schema_file and os.path.isfile(self.schema_file):
+                foreign_keys = {}
+                for table, fk in load_schema(self.schema_file).foreign_keys():
+                    if len(fk.columns) == 1 and fk.columns[0] != "mRID":
+                        foreign_keys.setdefault(table, {})[fk.columns[0]] = fk.ref_table
+                for table, columns in self.tables().items():
+                    table_fks = foreign_keys.get(table, {})
+                    for column in columns:
+                        ref_table = table_fks.get(column.rsplit(".", 1)[-1])
+                        if ref_table is not None:
+                            self._references[table][column] = ref_table
+        return self._references
+
+    def counts(self, exact=False):
+        """
+        Yields (table, row count, exact). Unless exact is set, the counts
+        kept by ANALYZE in sqlite_stat1 are used where available, which
+        costs nothing even on very large tables.
+        """
+        estimates = {}
+        if not exact:
+            try:
+                for table, stat in self.conn.execute(
+                        "SELECT tbl, stat FROM sqlite_stat1 WHERE idx IS NULL "
+                        "OR idx LIKE 'sqlite_autoindex_%'"):
+                    estimates[table] = int(stat.split()[0])
+            except sqlite3.OperationalError:
+                pass  # Not analyzed
+        for table in self.tables():
+            if table in estimates:
+                yield table, estimates[table], False
+            else:
+                (count,) = self.conn.execute(f'SELECT COUNT(*) FROM "{table}"').fetchone()
+                yield table, count, True
+
+    def lookup(self, mRID, table=None):
+        """
+        Finds an object by mRID, in table or else in every table.
+
+        Returns:
+            (table, row dict) or (None, None) if no table holds it.
+        """
+        candidates = [table] if table else list(self.tables())
+        known = self._table_of.get(mRID)
+        if known in candidates:
+            candidates.remove(known)
+            candidates.insert(0, known)
+        for candidate in candidates:
+            cursor = self.conn.execute(f'SELECT * FROM "{candidate}" WHERE "mRID" = ?', (mRID,))
+            row = cursor.fetchone()
+            if row is not None:
+                self._table_of[mRID] = candidate
+                names = [description[0] for description in cursor.description]
+                return candidate, dict(zip(names, row))
+        return None, None
+
+    def referrers(self, table, mRID):
+        """Yields (table, column, mRID) for every row referencing the object."""
+        for other, columns in self.references().items():
+            for column, ref_table in columns.items():
+                if ref_table != table:
+                    continue
+                cursor = self.conn.execute(
+                    f'SELECT "mRID" FROM "{other}" WHERE "{column}" = ?', (mRID,))
+                for (referrer,) in cursor:
+                    self._table_of[referrer] = other
+                    yield other, column, referrer
 
+    def follow(self, mRID, hops=1, incoming=False):
+        """
+        Walks the references of an object depth-first, up to hops away,
+        visiting each object once.
+
+        Yields:
+            (depth, direction, via column, table, mRID) per reference, in
+            tree order, direction being '->' for references the object
+            holds and '<-' for rows referring to it; the start object comes
+            first with direction None.
+        """
+        table, row = self.lookup(mRID)
+        if table is None:
+            return
+        yield 0, None, None, table, mRID
+        if hops > 0:
+            yield from self._follow(table, mRID, row, 1, hops, incoming, {mRID})
+
+    def _follow(self, table, mRID, row, depth, hops, incoming, seen):
+        if row is None:
+            _table, row = self.lookup(mRID, table)
+        for column, ref_table in self.references().get(table, {}).items():
+            target = row.get(column) if row else None
+            if target is None:
+                continue
+            target = str(target)
+            found, target_row = self.lookup(target, ref_table if ref_table in self.tables()
+                                            else None)
+            yield depth, "->", column, found or ref_table, target
+            if found is not None and target not in seen and depth < hops:
+                seen.add(target)
+                yield from self._follow(found, target, target_row, depth + 1, hops,
+                                        incoming, seen)
+        if incoming:
+            for other, column, referrer in self.referrers(table, mRID):
+                yield depth, "<-", column, other, referrer
+                if referrer not in seen and depth < hops:
+                    seen.add(referrer)
+                    yield from self._follow(other, referrer, None, depth + 1, hops,
+                                            incoming, seen)
+
+    def page(self, table, after=0, limit=50):
+        """
+        Returns one page of a table: the column names and up to limit
+        (rowid, *values) rows with rowid > after.
+        """
+        columns = self.tables()[table]
+        cursor = self.conn.execute(
+            f'SELECT rowid, * FROM "{table}" WHERE rowid > ? ORDER BY rowid LIMIT ?',
+            (after, limit))
+        return columns, cursor.fetchall()
+
+    def iter_rows(self, table):
+        """Streams every row of a table from a cursor."""
+        return self.conn.execute(f'SELECT * FROM "{table}"')
+
+def _format_row(columns, values, show_nulls=False):
+    return "  ".join(f"{column}={value!r}" for column, value in zip(columns, values)
+                     if show_nulls or value is not None)
+
+def command_schema(args, _db):
     # Check if the schema file exists
-    try:
-        with open(schema_file, 'r', encoding='utf-8') as f:
-            pass
-    except FileNotFoundError:
-        print(f"Error: Schema file '{schema_file}' not found.")
-        return
+    if not os.path.isfile(args.schema):
+        print(f"Error: Schema file '{args.schema}' not found.")
+        return 1
 
     # Parse the SQL schema
-    print(f"Reading and parsing the schema file: '{schema_file}'\n")
-    tables = parse_sql_schema(schema_file)
+    print(f"Reading and parsing the schema file: '{args.schema}'\n")
+    tables = parse_sql_schema(args.schema)
 
     # Print the tables and their columns
     print_tables_and_columns(tables)
+    return 0
+
+def command_counts(args, db):
+    total = 0
+    for table, count, exact in db.counts(args.exact):
+        total += count
+        print(f"{table:<40} {count:>12,}{'' if exact else '  (ANALYZE estimate)'}")
+    print(f"{'total':<40} {total:>12,}")
+    return 0
+
+def command_lookup(args, db):
+    table, row = db.lookup(args.mrid, args.table)
+    if table is None:
+        print(f"No object with mRID '{args.mrid}'.")
+        return 1
+    print(f"{table} {args.mrid}")
+    for column, value in row.items():
+        if value is not None or args.nulls:
+            print(f"  {column}: {value!r}")
+    return 0
+
+def command_refs(args, db):
+    found = False
+    for depth, direction, column, table, mRID in db.follow(args.mrid, args.hops, args.incoming):
+        found = True
+        indent = "  " * depth
+        if direction is None:
+            print(f"{table} {mRID}")
+        elif direction == "->":
+            print(f"{indent}{column} -> {table} {mRID}")
+        else:
+            print(f"{indent}<- {table}.{column} {mRID}")
+    if not found:
+        print(f"No object with mRID '{args.mrid}'.")
+        return 1
+    return 0
+
+def command_dump(args, db):
+    if args.table not in db.tables():
+        print(f"Error: no table '{args.table}' in '{args.db}'.")
+        return 1
+    if args.all:
+        columns = db.tables()[args.table]
+        for values in db.iter_rows(args.table):
+            print(_format_row(columns, values, args.nulls))
+        return 0
+
+    columns, rows = db.page(args.table, args.after, args.limit)
+    for rowid, *values in rows:
+        print(f"[{rowid}] {_format_row(columns, values, args.nulls)}")
+    if len(rows) == args.limit:
+        print(f"-- next page: dump {args.table} --after {rows[-1][0]} --limit {args.limit}")
+    return 0
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Inspect the CIM schema and the database loaded by fill_sql.py.")
+    parser.add_argument("--db", default=DEFAULT_DB_FILE,
+                        help="SQLite database to inspect (opened read-only)")
+    parser.add_argument("--schema", default=DEFAULT_SCHEMA_FILE,
+                        help="SQL schema, for the table list and the reference columns")
+    commands = parser.add_subparsers(dest="command")
+
+    commands.add_parser("schema", help="List the tables and columns of the schema (default)")
+
+    counts = commands.add_parser("counts", help="Row counts per table")
+    counts.add_argument("--exact", action="store_true",
+                        help="Count every table instead of using the ANALYZE statistics")
+
+    lookup = commands.add_parser("lookup", help="Show the object with an mRID")
+    lookup.add_argument("mrid")
+    lookup.add_argument("--table", help="Only look in this table")
+    lookup.add_argument("--nulls", action="store_true", help="Also show empty columns")
+
+    refs = commands.add_parser("refs", help="Follow the references of an object")
+    refs.add_argument("mrid")
+    refs.add_argument("--hops", type=int, default=1, help="How many references away to go")
+    refs.add_argument("--incoming", action="store_true",
+                      help="Also follow the rows that refer to each object")
+
+    dump = commands.add_parser("dump", help="Print a table a page at a time")
+    dump.add_argument("table")
+    dump.add_argument("--after", type=int, default=0,
+                      help="Start after this rowid (printed at the end of each page)")
+    dump.add_argument("--limit", type=int, default=50, help="Rows per page")
+    dump.add_argument("--all", action="store_true", help="Stream the whole table")
+    dump.add_argument("--nulls", action="store_true", help="Also show empty columns")
+    return parser.parse_args(argv)
+
+COMMANDS = {
+    "schema": command_schema,
+    "counts": command_counts,
+    "lookup": command_lookup,
+    "refs": command_refs,
+    "dump": command_dump,
+}
+
+def main(argv=None):
+    args = parse_args(argv)
+    command = args.command or "schema"
+    if command != "schema" and not os.path.isfile(args.db):
+        print(f"Error: Database file '{args.db}' not found.")
+        return 1
+
+    db = ModelDatabase(args.db, args.schema)
+    try:
+        return COMMANDS[command](args, db)
+    except BrokenPipeError:
+        # Output piped into head or similar
+        return 0
+    finally:
+        db.close()
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
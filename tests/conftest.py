@@ -0,0 +1,25 @@
+import os
+import sys
+
+import pytest
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+import benchmark  # noqa: E402
+from cim_schema import load_schema  # noqa: E402
+
+SCHEMA_FILE = os.path.join(REPO_DIR, "TestProfile.sql")
+
+
+@pytest.fixture(scope="session")
+def schema_file():
+    return SCHEMA_FILE
+
+
+@pytest.fixture(scope="session")
+def model_file(tmp_path_factory):
+    """A small synthetic model covering every table of TestProfile.sql."""
+    path = str(tmp_path_factory.mktemp("model") / "model.xml")
+    benchmark.generate_model(path, load_schema(SCHEMA_FILE), 3000)
+    return path
@@ -0,0 +1,23 @@
+import pytest
+
+import fill_sql
+
+
+@pytest.mark.parametrize("ignore_errors", [False, True])
+def test_failing_rows_are_skipped_inside_multi_row_statements(tmp_path, schema_file,
+                                                              ignore_errors):
+    _tables, create_script = fill_sql.parse_sql_schema(schema_file)
+    conn = fill_sql.create_sqlite_db(str(tmp_path / "model.db"), create_script)
+    layout = fill_sql.row_layout("BaseVoltage", ("mRID",))
+    rows = [(f"bv{i}",) for i in range(1000)]
+    rows[100] = rows[10]  # fails inside a multi-row INSERT
+    rows[-1] = rows[20]   # fails in the rows left over for the single-row INSERT
+
+    inserter = fill_sql.BulkInserter(conn, batch_size=len(rows), ignore_errors=ignore_errors)
+    inserter.add_many(layout, rows)
+    inserter.flush()
+
+    assert (inserter.rows_inserted, inserter.rows_skipped) == (998, 2)
+    stored = {mRID for (mRID,) in conn.execute('SELECT "mRID" FROM "BaseVoltage"')}
+    assert stored == {mRID for (mRID,) in rows}
+    conn.close()
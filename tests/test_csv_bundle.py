@@ -0,0 +1,68 @@
+import csv
+import os
+import sqlite3
+
+import pytest
+
+import fill_sql
+
+
+def _normalize(value):
+    if value is None or value == "":
+        return None
+    if isinstance(value, str):
+        try:
+            return float(value)
+        except ValueError:
+            return value
+    return float(value)
+
+
+def _db_rows(conn, table, columns):
+    """Returns {mRID: {column: value}} with the DB columns mapped onto the CSV columns."""
+    cursor = conn.execute(f'SELECT * FROM "{table}"')
+    names = [d[0] for d in cursor.description]
+    targets = [fill_sql.ColumnPlan.resolve(name, columns) for name in names]
+    rows = {}
+    for record in cursor:
+        row = {}
+        for target, value in zip(targets, record):
+            if target is not None and value is not None:
+                row[target] = _normalize(value)
+        rows[row["mRID"]] = row
+    return rows
+
+
+def _csv_rows(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        return {row["mRID"]: {column: _normalize(value) for column, value in row.items()
+                              if value != ""}
+                for row in reader}
+
+
+@pytest.mark.parametrize("column_plan", ["dynamic", "schema", "prescan"])
+def test_csv_bundle_matches_database(tmp_path, schema_file, model_file, column_plan):
+    db_file = str(tmp_path / "model.db")
+    csv_dir = str(tmp_path / "csv")
+    fill_sql.main([model_file, "--schema", schema_file, "--db", db_file,
+                   "--dump-format", "csv", "--csv-dir", csv_dir,
+                   "--column-plan", column_plan, "--no-indexes"])
+
+    conn = sqlite3.connect(db_file)
+    try:
+        tables = [name for name in os.listdir(csv_dir) if name.endswith(".csv")]
+        assert tables
+        attributes = 0
+        for name in tables:
+            table = name[:-len(".csv")]
+            with open(os.path.join(csv_dir, name), newline="", encoding="utf-8") as f:
+                columns = next(csv.reader(f))
+            expected = _db_rows(conn, table, columns)
+            actual = _csv_rows(os.path.join(csv_dir, name))
+            assert actual == expected, table
+            attributes += sum(len(row) - 1 for row in actual.values())
+        # Not just the mRIDs
+        assert attributes > 0
+    finally:
+        conn.close()
@@ -0,0 +1,26 @@
+import json
+import os
+
+import pytest
+
+import fill_sql
+from conftest import REPO_DIR
+
+OWL_FILE = os.path.join(REPO_DIR, "data", "TestProfile.owl")
+
+
+@pytest.mark.parametrize("run", ["parsed", "cached"])
+def test_owl_keeps_stdout_for_timings(tmp_path, monkeypatch, capsys, schema_file,
+                                      model_file, run):
+    pytest.importorskip("rdflib")
+    # The parsed-ontology cache goes into the working directory
+    monkeypatch.chdir(tmp_path)
+    if run == "cached":
+        fill_sql.ClassHierarchy.from_owl(OWL_FILE)
+    capsys.readouterr()
+
+    fill_sql.main([model_file, "--schema", schema_file, "--owl", OWL_FILE,
+                   "--db", str(tmp_path / "model.db"), "--dump-format", "none",
+                   "--timings-json", "-"])
+    report = json.loads(capsys.readouterr().out)
+    assert "owl" in report["stages"]
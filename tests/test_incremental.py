@@ -0,0 +1,26 @@
+import pytest
+
+import fill_sql
+
+
+def _summary(capsys, argv):
+    fill_sql.main(argv)
+    out = capsys.readouterr().out
+    return [line.strip() for line in out.splitlines() if line.startswith("  ")]
+
+
+@pytest.mark.parametrize("column_plan", ["dynamic", "schema"])
+@pytest.mark.parametrize("value_types", ["schema", "guess"])
+def test_reimporting_the_loaded_model_changes_nothing(tmp_path, capsys, schema_file,
+                                                      model_file, column_plan, value_types):
+    options = ["--schema", schema_file, "--db", str(tmp_path / "model.db"),
+               "--column-plan", column_plan, "--value-types", value_types]
+    fill_sql.main([model_file, "--dump-format", "none"] + options)
+    capsys.readouterr()
+
+    # The first run compares with the stored rows, the second with the row hashes
+    for _run in range(2):
+        summary = _summary(capsys, [model_file, "--incremental"] + options)
+        assert summary
+        for line in summary:
+            assert " 0 inserted, 0 updated, 0 deleted," in line, line
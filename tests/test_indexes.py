@@ -0,0 +1,23 @@
+import sqlite3
+
+import pytest
+
+import fill_sql
+
+
+@pytest.mark.parametrize("column_plan, column", [("dynamic", "ACLineSegment.BaseVoltage"),
+                                                 ("schema", "BaseVoltage")])
+def test_reference_lookups_use_an_index(tmp_path, schema_file, model_file, column_plan, column):
+    db_file = str(tmp_path / "model.db")
+    fill_sql.main([model_file, "--schema", schema_file, "--db", db_file,
+                   "--dump-format", "none", "--column-plan", column_plan])
+    conn = sqlite3.connect(db_file)
+    try:
+        indexed = {conn.execute(f'PRAGMA index_info("{name}")').fetchone()[2]
+                   for _seq, name, *_rest in conn.execute('PRAGMA index_list("ACLineSegment")')}
+        assert column in indexed
+        plan = conn.execute(f'EXPLAIN QUERY PLAN SELECT "mRID" FROM "ACLineSegment" '
+                            f'WHERE "{column}" = ?', ("_BaseVoltage_0",)).fetchall()
+        assert "USING INDEX" in " ".join(detail for *_ids, detail in plan)
+    finally:
+        conn.close()
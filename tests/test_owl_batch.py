@@ -0,0 +1,132 @@
+import os
+
+import pytest
+
+import fill_sql
+
+pytest.importorskip("rdflib")
+owl = fill_sql._load_owl_module()
+
+HEADER = """<?xml version="1.0"?>
+<rdf:RDF xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#"
+         xmlns:rdfs="http://www.w3.org/2000/01/rdf-schema#"
+         xmlns:owl="http://www.w3.org/2002/07/owl#"
+         xml:base="{base}">
+  <owl:Ontology rdf:about="">
+{imports}  </owl:Ontology>
+"""
+
+BASE = """
+  <owl:Class rdf:about="#IdentifiedObject">
+    <rdfs:subClassOf>
+      <owl:Restriction>
+        <owl:onProperty rdf:resource="#IdentifiedObject.name"/>
+        <owl:allValuesFrom rdf:resource="http://www.w3.org/2001/XMLSchema#string"/>
+      </owl:Restriction>
+    </rdfs:subClassOf>
+  </owl:Class>
+  <owl:Class rdf:about="#Equipment">
+    <rdfs:subClassOf rdf:resource="#IdentifiedObject"/>
+  </owl:Class>
+  <owl:Class rdf:about="#BaseVoltage">
+    <rdfs:subClassOf rdf:resource="#IdentifiedObject"/>
+  </owl:Class>
+</rdf:RDF>
+"""
+
+PROFILE = """
+  <owl:Class rdf:about="#{name}">
+    <rdfs:subClassOf rdf:resource="http://example.com/base#Equipment"/>
+    <rdfs:subClassOf>
+      <owl:Restriction>
+        <owl:onProperty rdf:resource="http://example.com/base#IdentifiedObject.name"/>
+        <owl:allValuesFrom rdf:resource="http://www.w3.org/2001/XMLSchema#string"/>
+      </owl:Restriction>
+    </rdfs:subClassOf>
+    <rdfs:subClassOf>
+      <owl:Restriction>
+        <owl:onProperty rdf:resource="#{name}.length"/>
+        <owl:allValuesFrom rdf:resource="http://www.w3.org/2001/XMLSchema#double"/>
+      </owl:Restriction>
+    </rdfs:subClassOf>
+    <rdfs:subClassOf>
+      <owl:Restriction>
+        <owl:onProperty rdf:resource="#{name}.BaseVoltage"/>
+        <owl:allValuesFrom rdf:resource="http://example.com/base#BaseVoltage"/>
+      </owl:Restriction>
+    </rdfs:subClassOf>
+  </owl:Class>
+</rdf:RDF>
+"""
+
+
+def _write(path, base, body, imports=()):
+    lines = "".join(f'    <owl:imports rdf:resource="{iri}"/>\n' for iri in imports)
+    path.write_text(HEADER.format(base=base, imports=lines) + body, encoding="utf-8")
+    return str(path)
+
+
+@pytest.fixture
+def profiles(tmp_path):
+    base = _write(tmp_path / "Base.owl", "http://example.com/base", BASE)
+    eq = _write(tmp_path / "EQ.owl", "http://example.com/eq", PROFILE.format(name="ACLineSegment"),
+                ["http://example.com/base", "http://example.com/elsewhere"])
+    sc = _write(tmp_path / "SC.owl", "http://example.com/sc", PROFILE.format(name="SeriesCompensator"),
+                ["http://example.com/base"])
+    return base, eq, sc
+
+
+def test_read_ontology_header(profiles):
+    base, eq, _sc = profiles
+    assert owl.read_ontology_header(base) == ("http://example.com/base", [])
+    assert owl.read_ontology_header(eq) == ("http://example.com/eq", [
+        "http://example.com/base", "http://example.com/elsewhere"])
+
+
+@pytest.mark.parametrize("cached", [True, False])
+def test_batch_resolves_profiles_against_imported_bases(tmp_path, monkeypatch, profiles, cached):
+    monkeypatch.chdir(tmp_path)
+    base, eq, sc = profiles
+    cache_dir = str(tmp_path / "cache") if cached else None
+    results = owl.generate_batch([eq, sc, base], str(tmp_path / "out"), cache_dir, jobs=2)
+    assert [stats["classes"] for stats in results] == [1, 1, 3]
+
+    with open(tmp_path / "out" / "EQ.cs", encoding="utf-8") as f:
+        code = f.read()
+    assert "public class ACLineSegment : Equipment" in code
+    assert "public double Length { get; set; }" in code
+    assert "public BaseVoltage BaseVoltage { get; set; }" in code
+    # Declared on IdentifiedObject, in the base
+    assert " Name " not in code
+    assert "class Equipment" not in code
+
+    if cached:
+        # The base was parsed once, by itself, and read from the cache after that
+        entries = sorted(name.split("-")[0] for name in os.listdir(cache_dir))
+        assert entries == ["Base", "EQ", "SC"]
+
+
+def test_profile_without_its_imports_is_unchanged(tmp_path, profiles):
+    _base, eq, _sc = profiles
+    owl.generate_batch([eq], str(tmp_path / "out"), None)
+    with open(tmp_path / "out" / "EQ.cs", encoding="utf-8") as f:
+        code = f.read()
+    assert "public class ACLineSegment\n" in code
+    assert "public string Name { get; set; }" in code
+
+
+def test_import_cycle_is_rejected(tmp_path):
+    a = _write(tmp_path / "A.owl", "http://example.com/a", "</rdf:RDF>\n", ["http://example.com/b"])
+    b = _write(tmp_path / "B.owl", "http://example.com/b", "</rdf:RDF>\n", ["http://example.com/a"])
+    with pytest.raises(ValueError, match="import each other"):
+        owl.generate_batch([a, b], str(tmp_path / "out"), None)
+
+
+def test_batch_split_dir(tmp_path, monkeypatch, profiles):
+    monkeypatch.chdir(tmp_path)
+    base, eq, _sc = profiles
+    assert owl.main([eq, base, "--no-cache", "--split-dir", "split"]) == 0
+    assert sorted(os.listdir(tmp_path / "split")) == ["Base", "EQ"]
+    assert "ACLineSegment.cs" in os.listdir(tmp_path / "split" / "EQ")
+    assert not os.path.exists(tmp_path / "generated")
+    assert owl.main([eq, base, "--no-cache", "--split-dir", "split", "--output-dir", "out"]) == 1
@@ -0,0 +1,46 @@
+import sqlite3
+
+import pytest
+
+import fill_sql
+from cim_schema import load_schema
+
+
+@pytest.fixture
+def broken_model(tmp_path, model_file):
+    """The generated model with its BaseVoltage references pointed at a missing object."""
+    path = tmp_path / "broken.xml"
+    with open(model_file, encoding="utf-8") as f:
+        text = f.read()
+    path.write_text(text.replace('rdf:resource="#_BaseVoltage_', 'rdf:resource="#_Missing_'),
+                    encoding="utf-8")
+    return str(path)
+
+
+def _load(tmp_path, schema_file, xml_file, column_plan):
+    db_file = str(tmp_path / f"{column_plan}.db")
+    fill_sql.main([xml_file, "--schema", schema_file, "--db", db_file,
+                   "--dump-format", "none", "--column-plan", column_plan])
+    return sqlite3.connect(db_file)
+
+
+@pytest.mark.parametrize("column_plan", ["dynamic", "schema"])
+def test_valid_model_has_no_violations(tmp_path, schema_file, model_file, column_plan):
+    conn = _load(tmp_path, schema_file, model_file, column_plan)
+    try:
+        assert fill_sql.check_references(conn, load_schema(schema_file)) == {}
+    finally:
+        conn.close()
+
+
+@pytest.mark.parametrize("column_plan", ["dynamic", "schema"])
+def test_missing_references_are_found(tmp_path, schema_file, broken_model, column_plan):
+    conn = _load(tmp_path, schema_file, broken_model, column_plan)
+    try:
+        violations = fill_sql.check_references(conn, load_schema(schema_file))
+        assert violations
+        assert {ref_table for _table, _column, ref_table in violations} == {"BaseVoltage"}
+        assert all(column.rsplit(".", 1)[-1] == "BaseVoltage"
+                   for _table, column, _ref_table in violations)
+    finally:
+        conn.close()
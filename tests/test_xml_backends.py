@@ -0,0 +1,100 @@
+import gzip
+import shutil
+
+import pytest
+
+import fill_sql
+from cim_schema import load_schema
+
+NESTED_MODEL = """<?xml version="1.0" encoding="UTF-8"?>
+<rdf:RDF xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#"
+         xmlns:cim="http://iec.ch/TC57/2013/CIM-schema-cim16#">
+  <cim:ACLineSegment rdf:ID="_line">
+    <cim:IdentifiedObject.name>Line &amp; cable</cim:IdentifiedObject.name>
+    <cim:Conductor.length>12.5</cim:Conductor.length>
+    <cim:ConductingEquipment.BaseVoltage>
+      <cim:BaseVoltage rdf:ID="_bv">
+        <cim:BaseVoltage.nominalVoltage>110</cim:BaseVoltage.nominalVoltage>
+      </cim:BaseVoltage>
+    </cim:ConductingEquipment.BaseVoltage>
+    <cim:Equipment.EquipmentContainer rdf:resource="#_vl"/>
+  </cim:ACLineSegment>
+  <cim:VoltageLevel rdf:about="#_vl">
+    <cim:IdentifiedObject.name>VL 1</cim:IdentifiedObject.name>
+  </cim:VoltageLevel>
+</rdf:RDF>
+"""
+
+
+def _backends():
+    backends = []
+    for backend in fill_sql.XML_BACKENDS:
+        if backend == "lxml":
+            backend = pytest.param(backend, marks=pytest.mark.skipif(
+                not _has_lxml(), reason="lxml is not installed"))
+        backends.append(backend)
+    return backends
+
+
+def _has_lxml():
+    try:
+        fill_sql.resolve_xml_backend("lxml")
+    except RuntimeError:
+        return False
+    return True
+
+
+def _rows(xml_file, tables, backend, plan=None, converter=None):
+    """Rows as (table, [(column, value, type)]) with the None values left out."""
+    return [(layout.table, [(column, value, type(value).__name__)
+                            for column, value in zip(layout.columns, row) if value is not None])
+            for layout, row in fill_sql.iter_rows_from_xml(xml_file, tables, plan,
+                                                           converter=converter,
+                                                           backend=backend)]
+
+
+@pytest.fixture(scope="module")
+def tables(schema_file):
+    return fill_sql.parse_sql_schema(schema_file)[0]
+
+
+@pytest.fixture
+def nested_model(tmp_path):
+    path = tmp_path / "nested.xml"
+    path.write_text(NESTED_MODEL, encoding="utf-8")
+    return str(path)
+
+
+@pytest.mark.parametrize("backend", _backends())
+@pytest.mark.parametrize("column_plan", ["dynamic", "schema"])
+@pytest.mark.parametrize("value_types", ["schema", "guess"])
+def test_backends_yield_the_same_rows(schema_file, model_file, tables, backend,
+                                      column_plan, value_types):
+    plan = fill_sql.build_column_plan(tables) if column_plan == "schema" else None
+    converter = None
+    if value_types == "schema":
+        converter = fill_sql.ValueConverter(load_schema(schema_file), plan)
+    expected = _rows(model_file, tables, "etree", plan, converter)
+    assert expected
+    assert _rows(model_file, tables, backend, plan, converter) == expected
+
+
+@pytest.mark.parametrize("backend", _backends())
+def test_backends_agree_on_nested_objects(nested_model, tables, backend):
+    rows = _rows(nested_model, tables, backend)
+    assert rows == _rows(nested_model, tables, "etree")
+    assert sorted(table for table, _values in rows) == ["ACLineSegment", "BaseVoltage",
+                                                        "VoltageLevel"]
+    line = dict((column, value) for column, value, _type in
+                next(values for table, values in rows if table == "ACLineSegment"))
+    assert line["IdentifiedObject.name"] == "Line & cable"
+    assert line["Equipment.EquipmentContainer"] == "_vl"
+
+
+@pytest.mark.parametrize("backend", _backends())
+def test_gzip_model(tmp_path, model_file, tables, backend):
+    # The name does not end in .gz: compression is recognised by content
+    path = tmp_path / "model.xml"
+    with open(model_file, "rb") as src, gzip.open(path, "wb") as dst:
+        shutil.copyfileobj(src, dst)
+    assert _rows(str(path), tables, backend) == _rows(model_file, tables, backend)